@@ -0,0 +1,129 @@
+"""
+Benchmark: DOM capture for healing prompts.
+
+Compares the legacy path (driver.page_source + BeautifulSoup minification) with the
+in-browser serializer ('browser' HTML and 'json' tree modes) on the tests/*.html pages.
+Pages can be inflated in the browser to simulate multi-MB SPAs.
+
+Usage:
+    python benchmarks/bench_dom_capture.py
+    python benchmarks/bench_dom_capture.py --inflate 50 --repeat 10 --output results/bench_dom_capture.json
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import statistics
+import tracemalloc
+from pathlib import Path
+
+# Ensure libraries path is in sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'libraries'))
+from DomSerializer import DomSerializer
+
+TESTS_DIR = os.path.join(os.path.dirname(__file__), '..', 'tests')
+
+# Clones the body's children N times to grow the page without changing its structure
+INFLATE_JS = """
+    var copies = arguments[0];
+    var originals = Array.prototype.slice.call(document.body.children);
+    for (var i = 0; i < copies; i++) {
+        originals.forEach(function (el) { document.body.appendChild(el.cloneNode(true)); });
+    }
+    return document.getElementsByTagName('*').length;
+"""
+
+
+def create_driver(headless=True):
+    from selenium import webdriver
+
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=1920,1080")
+    return webdriver.Chrome(options=options)
+
+
+def measure(capture, repeat):
+    """
+    Runs a capture function `repeat` times.
+    Returns median/min wall time (ms), Python peak memory (KB) and output size (chars).
+    """
+    timings = []
+    peak_kb = 0
+    size = 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        content = capture()
+        timings.append((time.perf_counter() - start) * 1000)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_kb = max(peak_kb, peak / 1024)
+        size = len(content)
+    return {
+        "median_ms": round(statistics.median(timings), 2),
+        "min_ms": round(min(timings), 2),
+        "python_peak_kb": round(peak_kb, 1),
+        "output_chars": size
+    }
+
+
+def bench_page(driver, page_path, inflate, repeat):
+    driver.get(Path(page_path).resolve().as_uri())
+    node_count = driver.execute_script(INFLATE_JS, inflate) if inflate else driver.execute_script("return document.getElementsByTagName('*').length")
+
+    results = {
+        "page": os.path.basename(page_path),
+        "nodes": node_count,
+        "page_source_chars": len(driver.page_source),
+        "modes": {}
+    }
+    results["modes"]["page_source"] = measure(lambda: DomSerializer.minify_page_source(driver.page_source), repeat)
+    for mode in ("browser", "json"):
+        serializer = DomSerializer(mode=mode)
+        results["modes"][mode] = measure(lambda: serializer.capture(driver)[0], repeat)
+    return results
+
+
+def print_report(all_results):
+    print(f"\n{'page':<22}{'nodes':>8}  {'mode':<12}{'median ms':>10}{'min ms':>10}{'py peak KB':>12}{'chars':>10}")
+    print("-" * 84)
+    for page in all_results:
+        for mode, stats in page["modes"].items():
+            print(f"{page['page']:<22}{page['nodes']:>8}  {mode:<12}{stats['median_ms']:>10}{stats['min_ms']:>10}"
+                  f"{stats['python_peak_kb']:>12}{stats['output_chars']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DOM capture modes")
+    parser.add_argument("--pages", nargs="*", help="HTML files to load (default: tests/*.html)")
+    parser.add_argument("--inflate", type=int, default=0, help="Clone the body's children N times before measuring")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per mode")
+    parser.add_argument("--headed", action="store_true", help="Run with a visible browser")
+    parser.add_argument("--output", type=str, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    pages = args.pages or sorted(glob.glob(os.path.join(TESTS_DIR, "*.html")))
+    driver = create_driver(headless=not args.headed)
+    try:
+        all_results = [bench_page(driver, page, args.inflate, args.repeat) for page in pages]
+    finally:
+        driver.quit()
+
+    print_report(all_results)
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({"inflate": args.inflate, "repeat": args.repeat, "results": all_results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
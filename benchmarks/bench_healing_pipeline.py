@@ -0,0 +1,458 @@
+"""
+Benchmark: end-to-end healing pipeline, fully offline.
+
+Serves tests/dynamic_page.html, tests/mock_app.html and synthetic pages (10k-100k nodes) from a
+local HTTP server, drives headless Chrome and heals with a stub LLM (configurable latency,
+canned answers), so no network or API key is needed. Runs in a temporary working directory:
+page objects, snapshots and JSON updates never touch the repository.
+
+Targets are discovered on each page (visible elements with a unique id/name/test id). For each
+page it measures:
+- lookup_ok:   a lookup with the correct locator (original wait + first snapshot)
+- lookup_cached: the same lookup served by the element handle cache
+- heal_llm:    a broken locator healed by the stub LLM (tier 2), with per-phase timings
+- heal_local:  the same broken locator healed by local similarity (tier 1)
+- stage micro-benchmarks with Python peak memory: DOM capture per mode, DOM context building,
+  candidate validation, snapshot save and JSON update
+
+Results are keyed by page and stage so runs of different releases can be compared.
+
+Usage:
+    python benchmarks/bench_healing_pipeline.py --output results/bench_healing.json
+    python benchmarks/bench_healing_pipeline.py --sizes 10000 50000 100000 --llm-latency 1.5 --repeat 5
+    python benchmarks/bench_healing_pipeline.py --baseline results/bench_v1.json --output results/bench_v2.json
+    python benchmarks/bench_healing_pipeline.py --compare results/bench_v1.json results/bench_v2.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import statistics
+import subprocess
+import tracemalloc
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+# Ensure libraries path is in sys.path
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.append(os.path.join(REPO_DIR, 'libraries'))
+from GenAIRescuer import GenAIRescuer
+from DomSerializer import DomSerializer
+from DomContextBuilder import DomContextBuilder
+from HealingMetrics import get_metrics
+from LLMBackend import StubBackend, ResilientBackend
+from LocatorUpdater import update_json_locators
+from bench_dom_capture import create_driver
+
+TESTS_DIR = os.path.join(REPO_DIR, 'tests')
+DEFAULT_PAGES = ['dynamic_page.html', 'mock_app.html']
+
+# Picks up to `limit` visible interactive elements that a single locator identifies uniquely
+DISCOVER_TARGETS_JS = """
+    var limit = arguments[0];
+    function visible(el) {
+        var rect = el.getBoundingClientRect();
+        var style = window.getComputedStyle(el);
+        return rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden' && style.display !== 'none';
+    }
+    function unique(css) {
+        try { return document.querySelectorAll(css).length === 1; } catch (e) { return false; }
+    }
+    var found = [];
+    var nodes = document.querySelectorAll('button, a, input, select, textarea');
+    for (var i = 0; i < nodes.length && found.length < limit; i++) {
+        var el = nodes[i];
+        if (!visible(el)) continue;
+        var locator = null;
+        if (el.id && unique('#' + CSS.escape(el.id))) {
+            locator = {type: 'id', value: el.id};
+        } else if (el.getAttribute('name') && unique('[name="' + el.getAttribute('name') + '"]')) {
+            locator = {type: 'name', value: el.getAttribute('name')};
+        } else if (el.getAttribute('data-testid') && unique('[data-testid="' + el.getAttribute('data-testid') + '"]')) {
+            locator = {type: 'css', value: '[data-testid="' + el.getAttribute('data-testid') + '"]'};
+        }
+        if (locator) found.push(locator);
+    }
+    return found;
+"""
+
+JS_HEAP_JS = "return (window.performance && performance.memory) ? performance.memory.usedJSHeapSize : null;"
+
+
+def synthetic_page(nodes):
+    """
+    A deterministic page of roughly `nodes` elements: product cards (every tenth hidden),
+    a navigation bar and a checkout form in the middle holding the benchmark targets.
+    """
+    card = ('<section class="card c{i}"{hidden}><h3 class="title">Item {i}</h3><p class="desc">Description of item {i}</p>'
+            '<a class="link" href="#item-{i}">Open</a><button class="btn buy" data-sku="{i}">Buy</button></section>')
+    cards = max(1, nodes // 5)
+    body = ['<nav id="top-nav"><a href="#home" id="home-link">Home</a><a href="#cart" id="cart-link">Cart</a></nav><main>']
+    for i in range(cards):
+        if i == cards // 2:
+            body.append('<form id="checkout-form"><label for="coupon">Coupon</label><input id="coupon-input" name="coupon" placeholder="Coupon code">'
+                        '<button id="checkout-btn" data-testid="checkout" type="button">Checkout</button></form>')
+        body.append(card.format(i=i, hidden=' style="display:none"' if i % 10 == 9 else ''))
+    body.append('</main>')
+    return f"<!DOCTYPE html><html><head><title>Synthetic {nodes}</title></head><body>{''.join(body)}</body></html>"
+
+
+class PageHandler(SimpleHTTPRequestHandler):
+    """
+    Serves tests/*.html and /synthetic/<nodes>.html.
+    """
+
+    def do_GET(self):
+        if self.path.startswith('/synthetic/'):
+            nodes = int(self.path.rsplit('/', 1)[-1].split('.')[0])
+            payload = synthetic_page(nodes).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(PageHandler, directory=TESTS_DIR))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class BenchRescuer(GenAIRescuer):
+    """
+    GenAIRescuer outside of a Robot run: the driver and settings are given instead of
+    being read from SeleniumLibrary and Robot variables.
+    """
+
+    def __init__(self, driver, settings):
+        super().__init__()
+        self.driver = driver
+        self.settings = settings
+
+    def _get_driver(self):
+        return self.driver
+
+    def _get_setting(self, name, default=None):
+        return self.settings.get(name, default)
+
+
+def summarize(timings, peak_kb=None, **extra):
+    ordered = sorted(timings)
+    result = {
+        'median_ms': round(statistics.median(ordered), 2),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))], 2),
+        'min_ms': round(ordered[0], 2),
+        'runs': len(ordered)
+    }
+    if peak_kb is not None:
+        result['py_peak_kb'] = round(peak_kb, 1)
+    result.update(extra)
+    return result
+
+
+def measure(fn, repeat):
+    """
+    Times `fn` `repeat` times, then runs it once more under tracemalloc for its Python peak memory.
+    Returns (summary, last result).
+    """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return summarize(timings, peak / 1024), result
+
+
+def write_page_object(page_name, locators):
+    with open(os.path.join('locators', f"{page_name}.json"), 'w') as f:
+        json.dump(locators, f, indent=2)
+
+
+def stub_answer(target):
+    """
+    Canned LLM answer: a candidate that matches nothing, then the correct locator.
+    """
+    wrong = {'type': 'id', 'value': f"{target['value']}-legacy"}
+    right = {'type': 'css_selector' if target['type'] == 'css' else target['type'], 'value': target['value']}
+    return json.dumps([wrong, right])
+
+
+def bench_heal(rescuer, page_name, element_name, repeat, local_threshold):
+    """
+    Heals the broken locator `repeat` times and returns latency plus median time per phase.
+    """
+    metrics = get_metrics()
+    rescuer.settings['LOCAL_HEAL_THRESHOLD'] = local_threshold
+    timings, phases, sources = [], {}, set()
+    for _ in range(repeat):
+        mark = metrics.mark()
+        heals_before = {source: stats['heals'] for source, stats in rescuer.heal_stats.items()}
+        start = time.perf_counter()
+        try:
+            rescuer.get_webelements_with_healing(page_name, element_name)
+        except Exception as e:
+            return {'error': str(e)}
+        timings.append((time.perf_counter() - start) * 1000)
+        sources.update(source for source, stats in rescuer.heal_stats.items() if stats['heals'] > heals_before.get(source, 0))
+        run_phases = {}
+        for event in metrics.events_since(mark):
+            run_phases[event['phase']] = run_phases.get(event['phase'], 0.0) + event['duration_ms']
+        for phase, duration in run_phases.items():
+            phases.setdefault(phase, []).append(duration)
+    return summarize(timings, sources=sorted(sources),
+                     phases={phase: round(statistics.median(values), 2) for phase, values in phases.items()})
+
+
+def bench_page(driver, url, label, args):
+    driver.get(url)
+    node_count = driver.execute_script("return document.getElementsByTagName('*').length")
+    targets = driver.execute_script(DISCOVER_TARGETS_JS, args.targets)
+    page_name = f"bench_{label}"
+    results = {'url_path': url.split('/', 3)[-1], 'nodes': node_count, 'js_heap_bytes': driver.execute_script(JS_HEAP_JS),
+               'targets': len(targets), 'stages': {}}
+    print(f"{label}: {node_count} nodes, {len(targets)} target(s)")
+    if not targets:
+        return results
+
+    settings = {
+        'MAX_DYNAMIC_WAIT': args.max_wait,
+        'BROKEN_LOCATOR_QUIET_WINDOW': args.quiet_window,
+        'AUTO_UPDATE_LOCATORS': 'False',
+        'ASYNC_SNAPSHOTS': 'False',
+        'HEALED_LOCATOR_CACHE': 'off',
+        'LLM_RESPONSE_CACHE': 'False',
+        'LLM_STREAMING': str(not args.no_streaming),
+        'ENABLE_VISION_HEALING': str(args.vision),
+        'HEALING_METRICS': 'False',
+        'DOM_CAPTURE_MODE': args.dom_mode,
+        'ELEMENT_HANDLE_CACHE': 'False',
+        'LOCATOR_RESOLUTION_MODE': args.resolution_mode,
+        'SNAPSHOT_STORE': args.snapshot_store
+    }
+    rescuer = BenchRescuer(driver, settings)
+    answers = {}
+    rescuer.llm = ResilientBackend(
+        StubBackend(responder=lambda inputs: answers['current'], delay=args.llm_latency),
+        timeout=max(30.0, args.llm_latency * 4), max_retries=0
+    )
+    stages = results['stages']
+    stage_runs = {}
+
+    for index, target in enumerate(targets):
+        element_name = f"target_{index}"
+        answers['current'] = stub_answer(target)
+
+        # Correct locator: original wait + first snapshot (created only once per element)
+        write_page_object(page_name, {element_name: target})
+        rescuer.locators.invalidate(page_name)
+        stage_runs.setdefault('lookup_ok', []).append(measure(lambda: rescuer.get_webelements_with_healing(page_name, element_name), 1)[0])
+        element = rescuer.get_webelements_with_healing(page_name, element_name)[0]
+
+        # Repeated lookup served by the element handle cache
+        settings['ELEMENT_HANDLE_CACHE'] = 'True'
+        rescuer.get_webelements_with_healing(page_name, element_name)
+        stage_runs.setdefault('lookup_cached', []).append(measure(lambda: rescuer.get_webelements_with_healing(page_name, element_name), args.repeat)[0])
+        settings['ELEMENT_HANDLE_CACHE'] = 'False'
+
+        # Stage micro-benchmarks on this page state
+        html, dom_format = DomSerializer(mode='browser').capture(driver)
+        snapshot_html = rescuer._load_dom_snapshot(page_name, element_name)
+        builder = DomContextBuilder.from_budget(15000)
+        candidates = [{'type': rescuer.mapper.normalize_genai_type(c['type']), 'value': c['value']} for c in json.loads(answers['current'])]
+        stage_runs.setdefault('dom_context', []).append(measure(lambda: builder.build(html, 'id:missing', snapshot_html, element_name), args.repeat)[0])
+        stage_runs.setdefault('validation', []).append(measure(lambda: rescuer.mapper.evaluate_candidates(driver, candidates), args.repeat)[0])
+        stage_runs.setdefault('snapshot', []).append(measure(lambda: rescuer._save_dom_snapshot(page_name, element_name, element), args.repeat)[0])
+        stage_runs.setdefault('json_update', []).append(
+            measure(lambda: update_json_locators(page_name, {element_name: (target['type'], target['value'])}), args.repeat)[0])
+
+        # Broken locator: tier 2 (stub LLM) and tier 1 (local similarity to the snapshot)
+        write_page_object(page_name, {element_name: {'type': 'id', 'value': f"{element_name}-missing"}})
+        rescuer.locators.invalidate(page_name)
+        stage_runs.setdefault('heal_llm', []).append(bench_heal(rescuer, page_name, element_name, args.repeat, 'off'))
+        stage_runs.setdefault('heal_local', []).append(bench_heal(rescuer, page_name, element_name, args.repeat, args.local_threshold))
+
+    for mode in ('browser', 'json', 'page_source'):
+        serializer = DomSerializer(mode=mode)
+        summary, content = measure(lambda: serializer.capture(driver)[0], args.repeat)
+        summary['output_chars'] = len(content)
+        stages[f"dom_capture_{mode}"] = summary
+
+    # Stages measured per target are reported as the median over targets
+    for stage, runs in stage_runs.items():
+        ok = [run for run in runs if 'error' not in run]
+        if not ok:
+            stages[stage] = {'error': runs[0]['error']}
+            continue
+        merged = {key: round(statistics.median(run[key] for run in ok), 2)
+                  for key in ('median_ms', 'p95_ms', 'min_ms', 'py_peak_kb') if all(key in run for run in ok)}
+        if any('phases' in run for run in ok):
+            phase_names = sorted(set(phase for run in ok for phase in run.get('phases', {})))
+            merged['phases'] = {phase: round(statistics.median(run['phases'].get(phase, 0.0) for run in ok), 2) for phase in phase_names}
+            merged['sources'] = sorted(set(source for run in ok for source in run.get('sources', [])))
+        if len(ok) < len(runs):
+            merged['errors'] = len(runs) - len(ok)
+        stages[stage] = merged
+    return results
+
+
+def flatten(results):
+    """
+    {"page/stage/metric": value} for the comparable numeric metrics.
+    """
+    flat = {}
+    for page, data in results.get('results', {}).items():
+        for stage, stats in data.get('stages', {}).items():
+            for metric in ('median_ms', 'py_peak_kb'):
+                if isinstance(stats.get(metric), (int, float)):
+                    flat[f"{page}/{stage}/{metric}"] = stats[metric]
+            for phase, value in (stats.get('phases') or {}).items():
+                flat[f"{page}/{stage}/phase:{phase}"] = value
+    return flat
+
+
+def compare(baseline, current, threshold, min_delta_ms, min_delta_kb):
+    """
+    Prints metric deltas and returns the list of regressions.
+    """
+    old, new = flatten(baseline), flatten(current)
+    regressions = []
+    print(f"\n{'metric':<62}{'baseline':>12}{'current':>12}{'change':>9}")
+    print("-" * 95)
+    for key in sorted(set(old) | set(new)):
+        if key not in old or key not in new:
+            print(f"{key:<62}{old.get(key, '-'):>12}{new.get(key, '-'):>12}{'':>9}")
+            continue
+        before, after = old[key], new[key]
+        change = (after - before) / before if before else 0.0
+        min_delta = min_delta_kb if key.endswith('py_peak_kb') else min_delta_ms
+        regressed = change > threshold and after - before > min_delta
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{key:<62}{before:>12}{after:>12}{change:>+8.0%}{flag}")
+        if regressed:
+            regressions.append(key)
+    print(f"\n{len(regressions)} regression(s) above {threshold:.0%}.")
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True, text=True).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run(args):
+    server, base_url = start_server()
+    pages = [(os.path.splitext(page)[0], f"{base_url}/{page}") for page in (args.pages or DEFAULT_PAGES)]
+    pages += [(f"synthetic_{size}", f"{base_url}/synthetic/{size}.html") for size in args.sizes]
+
+    workdir = tempfile.mkdtemp(prefix="bench_healing_")
+    cwd = os.getcwd()
+    os.makedirs(os.path.join(workdir, 'locators'))
+    os.chdir(workdir)
+    driver = create_driver(headless=not args.headed)
+    try:
+        results = {label: bench_page(driver, url, label, args) for label, url in pages}
+        browser_version = driver.capabilities.get('browserVersion')
+    finally:
+        driver.quit()
+        server.shutdown()
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'browser_version': browser_version
+        },
+        'config': {key: getattr(args, key) for key in ('repeat', 'targets', 'sizes', 'llm_latency', 'no_streaming',
+                                                       'vision', 'dom_mode', 'resolution_mode', 'snapshot_store', 'quiet_window', 'local_threshold')},
+        'results': results
+    }
+
+
+def print_report(data):
+    print(f"\n{'page':<22}{'nodes':>8}  {'stage':<24}{'median ms':>10}{'p95 ms':>10}{'py peak KB':>12}")
+    print("-" * 88)
+    for page, result in data['results'].items():
+        for stage, stats in result['stages'].items():
+            if 'error' in stats:
+                print(f"{page:<22}{result['nodes']:>8}  {stage:<24}  error: {stats['error'][:60]}")
+                continue
+            print(f"{page:<22}{result['nodes']:>8}  {stage:<24}{stats.get('median_ms', '-'):>10}{stats.get('p95_ms', '-'):>10}"
+                  f"{stats.get('py_peak_kb', '-'):>12}")
+            if stats.get('phases'):
+                print(f"{'':<32}phases: " + ", ".join(f"{phase} {ms}" for phase, ms in stats['phases'].items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the healing pipeline (local pages, headless Chrome, stub LLM)")
+    parser.add_argument("--pages", nargs="*", help=f"Pages from tests/ to serve (default: {' '.join(DEFAULT_PAGES)})")
+    parser.add_argument("--sizes", nargs="*", type=int, default=[10000, 100000], help="Synthetic page sizes in nodes")
+    parser.add_argument("--targets", type=int, default=3, help="Elements healed per page")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions per stage")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Stub LLM response time in seconds")
+    parser.add_argument("--no-streaming", action="store_true", help="Disable streamed LLM answers")
+    parser.add_argument("--vision", action="store_true", help="Include screenshots in the LLM request")
+    parser.add_argument("--dom-mode", default="browser", choices=["browser", "json", "page_source"], help="DOM capture mode used for healing")
+    parser.add_argument("--resolution-mode", default="script", choices=["script", "webdriver"], help="How the original locator is waited for")
+    parser.add_argument("--snapshot-store", default="files", choices=["files", "packed"], help="Snapshot store backend")
+    parser.add_argument("--quiet-window", default="0.5s", help="Broken locator quiet window (Robot time string)")
+    parser.add_argument("--max-wait", default="5s", help="Original locator wait (Robot time string)")
+    parser.add_argument("--local-threshold", default="0.75", help="Similarity threshold of the local tier")
+    parser.add_argument("--headed", action="store_true", help="Run with a visible browser")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare this run against an earlier JSON result")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="Only compare two result files")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown reported as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="Ignore slowdowns smaller than this (ms)")
+    parser.add_argument("--min-delta-kb", type=float, default=256.0, help="Ignore memory growth smaller than this (KB)")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+        regressions = compare(baseline, current, args.threshold, args.min_delta_ms, args.min_delta_kb)
+        sys.exit(1 if regressions else 0)
+
+    data = run(args)
+    print_report(data)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(data, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(baseline, data, args.threshold, args.min_delta_ms, args.min_delta_kb):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark: GenAIRescuer import and construction time.
+
+Every pabot worker and every `robot --dryrun` imports the library, but most runs never heal.
+Runs `python -X importtime` in a fresh interpreter (Robot Framework itself is imported first,
+as it is during a run) and reports:
+- the cumulative import time of GenAIRescuer and the slowest modules it pulls in
+- the time to construct the library
+- heavy dependencies that were loaded although no heal happened
+
+Usage:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --repeat 10 --top 15 --output results/bench_import_time.json
+    python benchmarks/bench_import_time.py --max-ms 60    # exit code 1 on regression (CI)
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+LIBRARIES_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'libraries'))
+
+# Only needed once a heal actually happens
+HEAVY_MODULES = ['google.generativeai', 'bs4', 'PIL.Image', 'dotenv', 'git', 'requests']
+
+PROBE = """
+import sys, json, time
+import robot.libraries.BuiltIn
+sys.path.insert(0, {libraries!r})
+start = time.perf_counter()
+import GenAIRescuer
+imported = time.perf_counter()
+GenAIRescuer.GenAIRescuer()
+constructed = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - start) * 1000,
+    'init_ms': (constructed - imported) * 1000,
+    'loaded': [m for m in {heavy!r} if m in sys.modules]
+}}))
+"""
+
+
+def parse_importtime(stderr, root='GenAIRescuer'):
+    """
+    Parses `-X importtime` output and returns {module: (self_us, cumulative_us)} for the modules
+    first imported by `root`. Python prints a module after everything it imports, so these are
+    the lines between the previous top-level import and the root's own line.
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        except ValueError:
+            continue
+        top_level = not name.startswith('  ')
+        name = name.strip()
+        modules[name] = (int(self_us), int(cumulative_us))
+        if top_level:
+            if name == root:
+                return modules
+            modules = {}
+    return modules
+
+
+def run_probe():
+    code = PROBE.format(libraries=LIBRARIES_DIR, heavy=HEAVY_MODULES)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True, cwd=os.path.dirname(LIBRARIES_DIR))
+    if proc.returncode != 0:
+        raise RuntimeError(f"Probe failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['modules'] = parse_importtime(proc.stderr)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure GenAIRescuer import and construction time.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters to run (median is reported)")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest modules to list")
+    parser.add_argument("--max-ms", type=float, help="Fail if the median import + init time exceeds this")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    runs = [run_probe() for _ in range(max(1, args.repeat))]
+    import_ms = statistics.median(run['import_ms'] for run in runs)
+    init_ms = statistics.median(run['init_ms'] for run in runs)
+    total_ms = import_ms + init_ms
+
+    # Slowest modules pulled in by the library in the last run
+    modules = runs[-1]['modules']
+    slowest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+    loaded = sorted(set(m for run in runs for m in run['loaded']))
+
+    print(f"GenAIRescuer import: {import_ms:.1f} ms, construction: {init_ms:.1f} ms (median of {len(runs)} runs)")
+    print("Slowest modules (self time):")
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"  {name:<40} {self_us / 1000:8.1f} ms self  {cumulative_us / 1000:8.1f} ms cumulative")
+    if loaded:
+        print(f"Heavy dependencies loaded without healing: {', '.join(loaded)}")
+    else:
+        print("Heavy dependencies loaded without healing: none")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump({
+                'import_ms': round(import_ms, 2),
+                'init_ms': round(init_ms, 2),
+                'total_ms': round(total_ms, 2),
+                'heavy_loaded': loaded,
+                'slowest': [{'module': name, 'self_us': s, 'cumulative_us': c} for name, (s, c) in slowest]
+            }, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"FAIL: {total_ms:.1f} ms exceeds the {args.max_ms} ms budget.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,439 @@
+"""
+DomContextBuilder - Relevance-Ranked DOM Extraction for LLM Prompts
+
+Large single-page apps easily exceed the DOM budget of a healing prompt. Blind truncation
+(`dom[:15000]`) often cuts the target element off entirely. This module instead scores every
+element of the minified DOM against what we know about the target:
+- tokens of the failed locator and of the element name
+- attributes and text of the target in the last known good snapshot
+- tags/attributes of its stored ancestry
+
+and packs the highest-scoring subtrees, each prefixed with its ancestor path, into a
+configurable character budget. A DOM captured as a compact JSON tree (DomSerializer 'json' mode)
+is packed the same way into a JSON object of whole subtrees, so the excerpt stays valid JSON.
+"""
+
+import re
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Roughly 4 characters per token for HTML-ish text
+CHARS_PER_TOKEN = 4
+
+# Budget used when ${LLM_DOM_BUDGET} cannot be parsed
+DEFAULT_BUDGET_CHARS = 15000
+
+# Attributes that carry identifying information (scored and shown in ancestor paths)
+SIGNIFICANT_ATTRIBUTES = (
+    'id', 'name', 'class', 'type', 'role', 'placeholder', 'aria-label', 'title',
+    'alt', 'for', 'href', 'value', 'data-testid', 'data-test', 'data-qa', 'data-cy'
+)
+
+# Tokens too common to tell elements apart
+STOP_TOKENS = {'div', 'span', 'html', 'body', 'the', 'and', 'css', 'xpath', 'id', 'name', 'class', 'tag', 'link', 'true', 'false'}
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def _json_length(value):
+    return len(_dumps(value))
+
+
+def tokenize(text):
+    """
+    Splits identifiers and text into lowercase tokens (snake, kebab and camelCase aware).
+    """
+    if not text:
+        return set()
+    text = re.sub(r'([a-z0-9])([A-Z])', r'\1 \2', str(text))
+    return {t for t in re.split(r'[^A-Za-z0-9]+', text.lower()) if len(t) > 1 and t not in STOP_TOKENS}
+
+
+class DomContextBuilder:
+    """
+    Builds a budget-limited, relevance-ranked DOM excerpt for the healing prompt.
+    """
+
+    # Score weights per evidence source
+    WEIGHT_LOCATOR = 3.0
+    WEIGHT_ELEMENT_NAME = 2.0
+    WEIGHT_SNAPSHOT_TARGET = 2.0
+    WEIGHT_SNAPSHOT_ANCESTRY = 0.5
+    WEIGHT_SAME_TAG = 1.0
+
+    def __init__(self, budget_chars=DEFAULT_BUDGET_CHARS):
+        try:
+            self.budget_chars = int(budget_chars)
+        except (TypeError, ValueError):
+            self.budget_chars = 0
+        if self.budget_chars <= 0:
+            logger.warning(f"DomContextBuilder: Invalid DOM budget '{budget_chars}'. Using {DEFAULT_BUDGET_CHARS} characters.")
+            self.budget_chars = DEFAULT_BUDGET_CHARS
+
+    @classmethod
+    def from_budget(cls, budget):
+        """
+        Creates a builder from a budget setting: a character count ('15000')
+        or a token count ('4000 tokens'). Anything else falls back to DEFAULT_BUDGET_CHARS.
+        """
+        value = str(budget).strip().lower()
+        if value.endswith('tokens'):
+            try:
+                return cls(budget_chars=int(value[:-len('tokens')].strip()) * CHARS_PER_TOKEN)
+            except ValueError:
+                logger.warning(f"DomContextBuilder: Invalid DOM budget '{budget}'. Using {DEFAULT_BUDGET_CHARS} characters.")
+                return cls()
+        return cls(budget_chars=value)
+
+    def build(self, html, old_locator, last_known_good=None, element_name=None, dom_format='html'):
+        """
+        Returns `html` unchanged if it fits the budget, otherwise an excerpt of the most
+        relevant subtrees with their ancestor paths.
+        With dom_format 'json', `html` is a JSON tree and the excerpt is the JSON object
+        {"excerpt_of": length, "blocks": [{"path": ancestor path, "score": score, "node": subtree}]}.
+        """
+        if not html or len(html) <= self.budget_chars:
+            return html
+        profile = self._target_profile(old_locator, last_known_good, element_name)
+        return self._build_json(html, profile) if dom_format == 'json' else self._build(html, profile)
+
+    def build_many(self, html, targets, dom_format='html'):
+        """
+        Like build(), but ranks the DOM against several targets at once (batch healing).
+
+        Args:
+            targets (list): dicts with 'old_locator', 'last_known_good' and 'element_name'
+        """
+        if not html or len(html) <= self.budget_chars:
+            return html
+
+        profile = {'locator': set(), 'element_name': set(), 'target': set(), 'ancestry': set(), 'tags': set()}
+        for target in targets:
+            single = self._target_profile(target.get('old_locator'), target.get('last_known_good'), target.get('element_name'))
+            for key in profile:
+                profile[key] |= single[key]
+        return self._build_json(html, profile) if dom_format == 'json' else self._build(html, profile)
+
+    def _build(self, html, profile):
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, 'html.parser')
+        lengths = self._serialized_lengths(soup)
+
+        scored = []
+        for el in soup.find_all(True):
+            score = self._score(el, profile)
+            if score > 0:
+                scored.append((score, el))
+
+        if not scored:
+            logger.info("DomContextBuilder: No relevant elements found. Falling back to truncation.")
+            return html[:self.budget_chars]
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+
+        header = f"<!-- Relevance-ranked excerpt of a {len(html)} character DOM. Each block is preceded by its ancestor path. -->\n"
+        parts = [header]
+        used = len(header)
+        chosen = []
+        # ids of the chosen blocks and of all their ancestors, for overlap checks in O(depth)
+        chosen_ids, chosen_ancestor_ids = set(), set()
+        per_block_cap = max(self.budget_chars // 4, 500)
+
+        def overlaps(node):
+            return (id(node) in chosen_ids or id(node) in chosen_ancestor_ids
+                    or any(id(parent) in chosen_ids for parent in node.parents))
+
+        for score, el in scored:
+            if overlaps(el):
+                continue
+            block_root = self._block_root(el, per_block_cap, lengths)
+            if overlaps(block_root):
+                continue
+            # Skip blocks that cannot fit before serializing them
+            if used > len(header) and used + min(lengths[id(block_root)], per_block_cap) > self.budget_chars:
+                continue
+
+            block_html = str(block_root)
+            if len(block_html) > per_block_cap:
+                block_html = block_html[:per_block_cap] + "<!-- truncated -->"
+            block = f"<!-- path: {self._ancestor_path(block_root)} (score {score:.1f}) -->\n{block_html}\n"
+
+            if used + len(block) > self.budget_chars:
+                if used > len(header):
+                    continue
+                block = block[:self.budget_chars - used]
+            parts.append(block)
+            used += len(block)
+            chosen.append(block_root)
+            chosen_ids.add(id(block_root))
+            chosen_ancestor_ids.update(id(parent) for parent in block_root.parents)
+            if used >= self.budget_chars:
+                break
+
+        logger.info(f"DomContextBuilder: Packed {len(chosen)} subtrees ({used} chars) from a {len(html)} character DOM.")
+        return "".join(parts)
+
+    def _build_json(self, text, profile):
+        """
+        JSON counterpart of _build(): packs whole {"t", "a", "c"} subtrees. A block larger than its
+        share of the budget keeps its first children that fit instead of being cut mid-string.
+        """
+        try:
+            root = json.loads(text)
+        except ValueError as e:
+            logger.warning(f"DomContextBuilder: The DOM is not valid JSON ({e}). Falling back to truncation.")
+            return text[:self.budget_chars]
+        if not isinstance(root, dict):
+            return text[:self.budget_chars]
+
+        # Pre-order walk: every node comes before its descendants
+        nodes, parents = [], {}
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            for child in node.get('c', ()):
+                if isinstance(child, dict):
+                    parents[id(child)] = node
+                    stack.append(child)
+        lengths = self._json_lengths(nodes)
+
+        def ancestors(node):
+            while id(node) in parents:
+                node = parents[id(node)]
+                yield node
+
+        scored = []
+        for node in nodes:
+            score = self._score_json(node, profile)
+            if score > 0:
+                scored.append((score, node))
+        scored.sort(key=lambda item: item[0], reverse=True)
+
+        excerpt = {'excerpt_of': len(text), 'blocks': []}
+        used = _json_length(excerpt)
+        per_block_cap = max(self.budget_chars // 4, 500)
+        chosen_ids, chosen_ancestor_ids = set(), set()
+
+        def overlaps(node):
+            return (id(node) in chosen_ids or id(node) in chosen_ancestor_ids
+                    or any(id(parent) in chosen_ids for parent in ancestors(node)))
+
+        if not scored:
+            logger.info("DomContextBuilder: No relevant elements found. Keeping the top of the JSON tree.")
+            scored = [(0, root)]
+
+        for score, node in scored:
+            if overlaps(node):
+                continue
+            parent = parents.get(id(node))
+            if parent is not None and parent.get('t') not in ('body', 'html') and lengths[id(parent)] <= per_block_cap:
+                node = parent
+            if overlaps(node):
+                continue
+            if excerpt['blocks'] and used + 1 + min(lengths[id(node)], per_block_cap) > self.budget_chars:
+                continue
+
+            path = " > ".join(self._json_path_part(n) for n in reversed([node] + list(ancestors(node))))
+            block = {'path': path, 'score': round(score, 1), 'node': None}
+            separator = 1 if excerpt['blocks'] else 0
+            # The fallback block (top of the tree) may use the whole budget
+            room = min(per_block_cap if score else self.budget_chars, self.budget_chars - used - separator)
+            room -= _json_length(block) - len('null')
+            block['node'] = self._trim_json(node, room, lengths)
+            if block['node'] is None:
+                continue
+            excerpt['blocks'].append(block)
+            used += separator + _json_length(block)
+            chosen_ids.add(id(node))
+            chosen_ancestor_ids.update(id(parent) for parent in ancestors(node))
+
+        logger.info(f"DomContextBuilder: Packed {len(excerpt['blocks'])} JSON subtrees ({used} chars) from a {len(text)} character DOM.")
+        return _dumps(excerpt)
+
+    @staticmethod
+    def _json_lengths(nodes):
+        """
+        Compact serialized length of every JSON node, keyed by id(node); `nodes` lists parents before children.
+        """
+        lengths = {}
+        for node in reversed(nodes):
+            length = _json_length({key: value for key, value in node.items() if key != 'c'})
+            children = node.get('c')
+            if children:
+                # ,"c":[ ... ]
+                length += len(',"c":[]') + len(children) - 1
+                length += sum(lengths[id(child)] if isinstance(child, dict) else _json_length(child) for child in children)
+            lengths[id(node)] = length
+        return lengths
+
+    def _trim_json(self, node, cap, lengths):
+        """
+        Returns the node if it fits `cap` characters, otherwise a copy with the first children that fit
+        (the first one that does not is trimmed the same way), or None if not even the tag fits.
+        """
+        length = lengths[id(node)] if isinstance(node, dict) else _json_length(node)
+        if length <= cap:
+            return node
+        if not isinstance(node, dict):
+            return None
+        trimmed = {key: value for key, value in node.items() if key != 'c'}
+        used = _json_length(trimmed)
+        if used > cap:
+            return None
+        children = []
+        used += len(',"c":[]')
+        for child in node.get('c', ()):
+            room = cap - used - (1 if children else 0)
+            part = self._trim_json(child, room, lengths)
+            if part is None:
+                break
+            children.append(part)
+            used += _json_length(part) + (1 if len(children) > 1 else 0)
+            if part is not child:
+                break
+        if children:
+            trimmed['c'] = children
+        return trimmed
+
+    @staticmethod
+    def _json_path_part(node):
+        part = str(node.get('t', ''))
+        attrs = node.get('a') or {}
+        if attrs.get('id'):
+            part += f"#{attrs['id']}"
+        classes = str(attrs.get('class') or '').split()
+        if classes:
+            part += "".join(f".{c}" for c in classes[:2])
+        return part
+
+    def _score_json(self, node, profile):
+        attrs = node.get('a') or {}
+        own_text = " ".join(child.strip() for child in node.get('c', ()) if isinstance(child, str) and child.strip())
+        tokens = tokenize(own_text[:200])
+        for attr in SIGNIFICANT_ATTRIBUTES:
+            if attrs.get(attr):
+                tokens |= tokenize(attrs[attr])
+        return self._score_tokens(tokens, node.get('t'), profile)
+
+    def _target_profile(self, old_locator, last_known_good, element_name):
+        locator_value = str(old_locator or "")
+        if ':' in locator_value:
+            locator_value = locator_value.split(':', 1)[1]
+
+        profile = {
+            'locator': tokenize(locator_value),
+            'element_name': tokenize(element_name),
+            'target': set(),
+            'ancestry': set(),
+            'tags': set()
+        }
+
+        if last_known_good:
+            from bs4 import BeautifulSoup, Tag
+            snapshot = BeautifulSoup(last_known_good, 'html.parser')
+            target = self._snapshot_target(snapshot)
+            if target is not None:
+                profile['tags'] = {target.name}
+                profile['target'] = self._element_tokens(target) | tokenize(target.get_text(" ", strip=True))
+                for parent in target.parents:
+                    if isinstance(parent, Tag) and parent.name != '[document]':
+                        profile['ancestry'] |= self._element_tokens(parent)
+        return profile
+
+    @staticmethod
+    def _snapshot_target(snapshot, depth=3):
+        """
+        The snapshot is a vertical slice: `depth` shallow-cloned parents wrapping the target,
+        so the target sits `depth` single-child levels below the root.
+        """
+        node = snapshot.find(True)
+        for _ in range(depth):
+            if node is None:
+                break
+            children = node.find_all(True, recursive=False)
+            if len(children) != 1:
+                break
+            node = children[0]
+        return node
+
+    @staticmethod
+    def _element_tokens(el):
+        tokens = set()
+        for attr in SIGNIFICANT_ATTRIBUTES:
+            value = el.get(attr)
+            if value:
+                tokens |= tokenize(" ".join(value) if isinstance(value, list) else value)
+        return tokens
+
+    def _score(self, el, profile):
+        own_text = " ".join(s.strip() for s in el.find_all(string=True, recursive=False) if s.strip())
+        return self._score_tokens(self._element_tokens(el) | tokenize(own_text[:200]), el.name, profile)
+
+    def _score_tokens(self, tokens, tag, profile):
+        if not tokens:
+            return 0
+
+        score = (
+            self.WEIGHT_LOCATOR * len(tokens & profile['locator'])
+            + self.WEIGHT_ELEMENT_NAME * len(tokens & profile['element_name'])
+            + self.WEIGHT_SNAPSHOT_TARGET * len(tokens & profile['target'])
+            + self.WEIGHT_SNAPSHOT_ANCESTRY * len(tokens & profile['ancestry'])
+        )
+        if score and tag in profile['tags']:
+            score += self.WEIGHT_SAME_TAG
+        return score
+
+    @staticmethod
+    def _serialized_lengths(soup):
+        """
+        Approximate len(str(node)) of every node, keyed by id(node), in one bottom-up pass
+        instead of serializing each subtree again.
+        """
+        from bs4 import Tag
+        lengths = {}
+        for node in reversed(list(soup.descendants)):
+            if not isinstance(node, Tag):
+                lengths[id(node)] = len(node.output_ready())
+                continue
+            # <name attr="value" ...> plus children and </name>, or <name .../> for void elements
+            length = len(node.name) + 2
+            for key, value in node.attrs.items():
+                length += 1 + len(key)
+                if value is not None:
+                    length += 3 + len(" ".join(value) if isinstance(value, list) else str(value))
+            if node.is_empty_element:
+                length += 1
+            else:
+                length += sum(lengths[id(child)] for child in node.children) + len(node.name) + 3
+            lengths[id(node)] = length
+        return lengths
+
+    @staticmethod
+    def _block_root(el, cap, lengths):
+        """
+        Widens the block to the parent (siblings such as labels help the LLM) when it stays small.
+        """
+        from bs4 import Tag
+        parent = el.parent
+        if isinstance(parent, Tag) and parent.name not in ('body', 'html', '[document]') and lengths[id(parent)] <= cap:
+            return parent
+        return el
+
+    @staticmethod
+    def _ancestor_path(el):
+        from bs4 import Tag
+        path = []
+        for node in [el] + [p for p in el.parents if isinstance(p, Tag) and p.name != '[document]']:
+            part = node.name
+            if node.get('id'):
+                part += f"#{node.get('id')}"
+            classes = node.get('class')
+            if classes:
+                part += "".join(f".{c}" for c in classes[:2])
+            path.append(part)
+        return " > ".join(reversed(path))
@@ -0,0 +1,146 @@
+"""
+DomSerializer - Compact DOM Capture for Healing Prompts
+
+The legacy capture path pulls the full `driver.page_source` over the WebDriver wire and
+parses it with BeautifulSoup's pure-Python parser just to drop scripts and styles.
+This module prunes and serializes the DOM inside the browser with a single execute_script:
+- heavy/irrelevant subtrees (script, style, svg, ...) and display:none subtrees are skipped
+- only significant attributes are kept (ids, names, classes, roles, aria-*, data-*, ...)
+- text is whitespace-collapsed and length-capped
+
+Capture modes:
+- 'page_source': legacy path (page_source + BeautifulSoup minification)
+- 'browser':     pruned HTML serialized in the browser
+- 'json':        compact JSON tree serialized in the browser ({"t": tag, "a": attrs, "c": children})
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DomSerializer:
+    """
+    Captures a minified representation of the current page's <body>.
+    """
+
+    MODES = ('page_source', 'browser', 'json')
+
+    # Tags removed by the legacy BeautifulSoup minification (plus a few more that never hold targets)
+    HEAVY_TAGS = ("script", "style", "noscript", "svg", "meta", "link", "template", "canvas")
+
+    SERIALIZE_JS = """
+        var mode = arguments[0], maxText = arguments[1];
+        var SKIP = {};
+        arguments[2].forEach(function (tag) { SKIP[tag.toUpperCase()] = true; });
+        var VOID = { AREA: 1, BASE: 1, BR: 1, COL: 1, EMBED: 1, HR: 1, IMG: 1, INPUT: 1, SOURCE: 1, TRACK: 1, WBR: 1 };
+        var KEEP = { id: 1, name: 1, 'class': 1, type: 1, role: 1, placeholder: 1, title: 1, alt: 1, 'for': 1,
+                     href: 1, value: 1, action: 1, method: 1, disabled: 1, checked: 1, selected: 1, readonly: 1, label: 1 };
+        var keepAttr = function (name) {
+            return KEEP[name] || name.indexOf('aria-') === 0 || name.indexOf('data-') === 0;
+        };
+        var escapeHtml = function (text) {
+            return text.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+        };
+        var cleanText = function (text) {
+            text = text.replace(/\\s+/g, ' ');
+            return text.length > maxText ? text.substring(0, maxText) + '...' : text;
+        };
+        var isDisplayNone = function (el) {
+            if (el.hidden) { return true; }
+            var style = window.getComputedStyle(el);
+            return style.display === 'none' || (el.tagName === 'INPUT' && el.type === 'hidden');
+        };
+        var attributes = function (el) {
+            var attrs = {};
+            for (var i = 0; i < el.attributes.length; i++) {
+                var attr = el.attributes[i];
+                if (keepAttr(attr.name)) { attrs[attr.name] = attr.value.length > maxText ? attr.value.substring(0, maxText) : attr.value; }
+            }
+            return attrs;
+        };
+
+        var toHtml = function (node, out) {
+            if (node.nodeType === 3) {
+                var text = cleanText(node.nodeValue);
+                if (text.trim()) { out.push(escapeHtml(text)); }
+                return;
+            }
+            if (node.nodeType !== 1 || SKIP[node.tagName.toUpperCase()] || isDisplayNone(node)) { return; }
+            var tag = node.tagName.toLowerCase();
+            out.push('<' + tag);
+            var attrs = attributes(node);
+            for (var name in attrs) { out.push(' ' + name + '="' + escapeHtml(attrs[name]) + '"'); }
+            out.push('>');
+            if (VOID[node.tagName.toUpperCase()]) { return; }
+            for (var child = node.firstChild; child; child = child.nextSibling) { toHtml(child, out); }
+            out.push('</' + tag + '>');
+        };
+
+        var toJson = function (node) {
+            if (node.nodeType === 3) {
+                var text = cleanText(node.nodeValue).trim();
+                return text ? text : null;
+            }
+            if (node.nodeType !== 1 || SKIP[node.tagName.toUpperCase()] || isDisplayNone(node)) { return null; }
+            var result = { t: node.tagName.toLowerCase() };
+            var attrs = attributes(node);
+            for (var key in attrs) { result.a = attrs; break; }
+            var children = [];
+            for (var child = node.firstChild; child; child = child.nextSibling) {
+                var converted = toJson(child);
+                if (converted !== null) { children.push(converted); }
+            }
+            if (children.length) { result.c = children; }
+            return result;
+        };
+
+        var root = document.body || document.documentElement;
+        if (mode === 'json') { return JSON.stringify(toJson(root)); }
+        var out = [];
+        toHtml(root, out);
+        return out.join('');
+    """
+
+    def __init__(self, mode='browser', max_text_length=200):
+        mode = str(mode).lower()
+        if mode not in self.MODES:
+            logger.warning(f"Unknown DOM capture mode '{mode}'. Using 'browser'.")
+            mode = 'browser'
+        self.mode = mode
+        self.max_text_length = int(max_text_length)
+
+    def capture(self, driver):
+        """
+        Returns the minified DOM of the current page in the configured mode.
+        Falls back to the legacy page_source path if the in-browser serializer fails.
+
+        Returns:
+            tuple: (content, dom_format) where dom_format is 'json' for the JSON tree, 'html' otherwise
+        """
+        if self.mode != 'page_source':
+            try:
+                content = driver.execute_script(self.SERIALIZE_JS, self.mode, self.max_text_length, list(self.HEAVY_TAGS))
+                return content, ('json' if self.mode == 'json' else 'html')
+            except Exception as e:
+                logger.warning(f"DomSerializer: In-browser serialization failed ({e}). Falling back to page_source.")
+        return self.minify_page_source(driver.page_source), 'html'
+
+    @classmethod
+    def minify_page_source(cls, page_source):
+        """
+        Parses HTML, removes scripts/styles/comments to reduce context size.
+        """
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(page_source, 'html.parser')
+
+        # Compare old vs new: Remove heavy tags
+        for tag in soup(["script", "style", "noscript", "svg", "meta", "link"]):
+            tag.decompose()
+
+        # Get body (or relevant container)
+        body = soup.body
+        if body:
+            return str(body)
+        return str(soup)
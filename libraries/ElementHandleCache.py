@@ -0,0 +1,180 @@
+"""
+ElementHandleCache - Live WebElement Reuse Across Consecutive Smart Keywords
+
+A sequence like Smart Wait Until Element Is Visible -> Smart Click -> Smart Get Text on the same
+element would otherwise locate it from scratch every time (find, visibility checks, scroll,
+snapshot check). This cache keeps the WebElements found for (session, page, element, locator)
+together with the identity of the document they were found in:
+
+- document id: a random token stored on `window` on first use; a navigation creates a new
+  document without it, so every entry of the old document is dropped
+- DOM generation: a counter bumped by a MutationObserver whenever element nodes are added or
+  removed; a structural change means the locator could now match something else
+
+A cached entry is confirmed with a single execute_script call that checks the document id and
+generation, re-runs the locator that found them (the healed locator for a healed element, so the
+entry survives while the original locator stays broken) and requires it to return exactly the cached
+elements in the same order (attribute and text changes do not bump the generation but can change what matches, e.g.
+`css:.tab.active` or `//span[text()='Done']`), checks that every element is visible, and scrolls
+the first one into view. Entries are dropped on StaleElementReferenceException, navigation, DOM
+generation change, a different locator result or when an element is hidden.
+"""
+
+import logging
+from collections import OrderedDict
+
+try:
+    from libraries.LocatorMapper import LocatorMapper
+except ImportError:
+    from LocatorMapper import LocatorMapper
+
+logger = logging.getLogger(__name__)
+
+# Installs the document id and DOM generation counter once per document and returns both
+DOCUMENT_STATE_JS = """
+    var install = function () {
+        if (!window.__healingDocId) {
+            window.__healingDocId = String(Date.now()) + '-' + Math.random().toString(36).slice(2);
+            window.__healingDomGen = 0;
+            new MutationObserver(function (mutations) {
+                var hasElement = function (nodes) {
+                    for (var j = 0; j < nodes.length; j++) { if (nodes[j].nodeType === 1) { return true; } }
+                    return false;
+                };
+                for (var i = 0; i < mutations.length; i++) {
+                    if (hasElement(mutations[i].addedNodes) || hasElement(mutations[i].removedNodes)) {
+                        window.__healingDomGen++;
+                        return;
+                    }
+                }
+            }).observe(document, { childList: true, subtree: true });
+        }
+        return { doc: window.__healingDocId, gen: window.__healingDomGen };
+    };
+"""
+
+
+class ElementHandleCache:
+    """
+    LRU cache of live WebElement lists per (session, page, element, locator type, locator value).
+    """
+
+    STATE_JS = DOCUMENT_STATE_JS + "return install();"
+
+    # arguments[0]: cached elements, arguments[1]: expected document id, arguments[2]: expected generation,
+    # arguments[3], arguments[4]: locator type and value
+    CONFIRM_JS = LocatorMapper.LOCATOR_RESOLVER_JS + DOCUMENT_STATE_JS + """
+        var state = install(), elements = arguments[0];
+        if (state.doc !== arguments[1]) { return { status: 'navigated' }; }
+        if (state.gen !== arguments[2]) { return { status: 'mutated' }; }
+        var matches;
+        try {
+            matches = resolveLocator(arguments[3], arguments[4]);
+        } catch (e) {
+            return { status: 'error' };
+        }
+        if (matches.length !== elements.length) { return { status: 'changed' }; }
+        for (var i = 0; i < elements.length; i++) {
+            if (matches[i] !== elements[i]) { return { status: 'changed' }; }
+            if (!isElementVisible(elements[i])) { return { status: 'hidden' }; }
+        }
+        elements[0].scrollIntoView({ block: 'center', inline: 'nearest' });
+        return { status: 'ok' };
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max(1, int(max_entries))
+        self._entries = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'stale': 0, 'navigated': 0, 'mutated': 0, 'changed': 0}
+
+    @staticmethod
+    def _key(driver, page_name, element_name, loc_type, loc_value):
+        return (getattr(driver, 'session_id', None), page_name, element_name, loc_type, loc_value)
+
+    def get(self, driver, page_name, element_name, loc_type, loc_value):
+        """
+        Returns the cached elements if they are still valid on the current document, otherwise None.
+        Invalid entries are dropped; a navigation drops every entry of the old document.
+        """
+        from selenium.common.exceptions import StaleElementReferenceException
+
+        key = self._key(driver, page_name, element_name, loc_type, loc_value)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+
+        found_type, found_value = entry['found_by']
+        try:
+            result = driver.execute_script(self.CONFIRM_JS, entry['elements'], entry['doc'], entry['gen'], found_type, found_value) or {}
+            status = result.get('status')
+        except StaleElementReferenceException:
+            status = 'detached'
+        except Exception as e:
+            logger.debug(f"ElementHandleCache: Could not confirm {page_name}.{element_name}: {e}")
+            status = 'error'
+
+        if status == 'ok':
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry['elements']
+
+        self.stats['misses'] += 1
+        if status == 'navigated':
+            self.stats['navigated'] += 1
+            self._drop_document(entry['doc'])
+        else:
+            self.stats[status if status in ('mutated', 'changed') else 'stale'] += 1
+            self._entries.pop(key, None)
+        logger.debug(f"ElementHandleCache: Dropped {page_name}.{element_name} ({status}).")
+        return None
+
+    def put(self, driver, page_name, element_name, loc_type, loc_value, elements, found_by=None):
+        """
+        Stores elements looked up with the locator, tagged with the current document id and DOM generation.
+        found_by is the (type, value) that actually found them when it differs from the looked-up locator
+        (a healed or overriding locator); entries are confirmed with it.
+        """
+        self.put_many(driver, [(page_name, element_name, loc_type, loc_value, elements, found_by)])
+
+    def put_many(self, driver, items):
+        """
+        Stores [(page, element, type, value, elements[, found_by])] with a single document state lookup.
+        """
+        items = [item for item in items if item[4]]
+        if not items:
+            return
+        try:
+            state = driver.execute_script(self.STATE_JS) or {}
+        except Exception as e:
+            logger.debug(f"ElementHandleCache: Could not read the document state: {e}")
+            return
+        if not state.get('doc'):
+            return
+
+        for page_name, element_name, loc_type, loc_value, elements, *found_by in items:
+            key = self._key(driver, page_name, element_name, loc_type, loc_value)
+            self._entries[key] = {'elements': list(elements), 'doc': state['doc'], 'gen': state.get('gen'),
+                                  'found_by': tuple(found_by[0]) if found_by and found_by[0] else (loc_type, loc_value)}
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, page_name=None):
+        """
+        Drops the entries of one page, or all entries.
+        """
+        if page_name is None:
+            self._entries.clear()
+            return
+        for key in [key for key in self._entries if key[1] == page_name]:
+            del self._entries[key]
+
+    def _drop_document(self, doc):
+        for key in [key for key, entry in self._entries.items() if entry['doc'] == doc]:
+            del self._entries[key]
+
+    @property
+    def hit_rate(self):
+        lookups = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / lookups if lookups else 0.0
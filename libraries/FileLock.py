@@ -0,0 +1,102 @@
+"""
+FileLock - Cross-Process Advisory File Locking
+
+Serializes writers from parallel Robot processes (e.g. pabot workers) that share files such as
+the healing log or the Page Object JSON files. Uses fcntl.flock on POSIX and msvcrt.locking
+on Windows, on a sidecar `<path>.lock` file so the protected file itself can be atomically replaced
+(see write_json_atomic).
+"""
+
+import os
+import json
+import time
+import logging
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+
+class FileLock:
+    """
+    Exclusive lock for a file path, usable as a context manager:
+
+        with FileLock("healing_log.jsonl"):
+            ...
+    """
+
+    def __init__(self, path, timeout=30):
+        self.lock_path = f"{path}.lock"
+        self.timeout = timeout
+        self._handle = None
+
+    def acquire(self):
+        lock_dir = os.path.dirname(self.lock_path)
+        if lock_dir:
+            os.makedirs(lock_dir, exist_ok=True)
+        self._handle = open(self.lock_path, 'a+')
+
+        # Poll with non-blocking attempts so a stuck holder cannot block us past the timeout
+        # (msvcrt.locking itself only retries for ~10s)
+        deadline = time.time() + self.timeout
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(self._handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    self._handle.seek(0)
+                    msvcrt.locking(self._handle.fileno(), msvcrt.LK_NBLCK, 1)
+                return self
+            except OSError:
+                if time.time() >= deadline:
+                    self._handle.close()
+                    self._handle = None
+                    raise TimeoutError(f"Could not lock {self.lock_path} within {self.timeout}s")
+                time.sleep(0.05)
+
+    def release(self):
+        if self._handle is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._handle.fileno(), fcntl.LOCK_UN)
+            else:
+                self._handle.seek(0)
+                msvcrt.locking(self._handle.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._handle.close()
+            self._handle = None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+def write_json_atomic(file_path, data):
+    """
+    Writes JSON to a temp file in the same directory and renames it over the target,
+    so readers never see a partially written file.
+    """
+    dir_name = os.path.dirname(file_path) or "."
+    os.makedirs(dir_name, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(file_path)}.", suffix=".tmp", dir=dir_name)
+    try:
+        if os.path.exists(file_path):
+            # mkstemp creates 0600 files; keep the original permissions
+            os.chmod(tmp_path, os.stat(file_path).st_mode & 0o777)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -1,37 +1,62 @@
 import os
 import sys
 import json
+import time
 import logging
 from datetime import datetime
-from robot.libraries.BuiltIn import BuiltIn
+from robot.libraries.BuiltIn import BuiltIn, RobotNotRunningError
 from robot.api.deco import keyword
-from bs4 import BeautifulSoup, Comment
-import google.generativeai as genai
-from dotenv import load_dotenv
-from PIL import Image, ImageDraw
+from robot.api import logger as robot_logger
 import io
 import base64
 
 # Try absolute import first (if libraries is in path), then relative
 try:
-    from libraries.LocatorUpdater import update_json_locator
+    from libraries.LocatorUpdater import update_json_locators
     from libraries.LocatorMapper import LocatorMapper
+    from libraries.LocatorRepository import LocatorRepository
+    from libraries.HealedLocatorCache import HealedLocatorCache, DEFAULT_CACHE_FILE
+    from libraries.LLMResponseCache import LLMResponseCache
+    from libraries.DomContextBuilder import DomContextBuilder
+    from libraries.DomSerializer import DomSerializer
+    from libraries.SnapshotWriter import SnapshotWriter
+    from libraries import SnapshotImages
+    from libraries import HealingLog
+    from libraries.LocalHealer import LocalHealer
+    from libraries.LLMBackend import create_backend, CircuitOpenError
+    from libraries.JsonArrayStream import JsonArrayStream
+    from libraries.HealingMetrics import HealingMetrics, get_metrics
+    from libraries.HealingCoordinator import HealingCoordinator, DEFAULT_DB_FILE, LEADER, SHARED, FAILED
+    from libraries.ElementHandleCache import ElementHandleCache
+    from libraries.SnapshotStore import create_store
 except ImportError:
     try:
-        from LocatorUpdater import update_json_locator
+        from LocatorUpdater import update_json_locators
         from LocatorMapper import LocatorMapper
+        from LocatorRepository import LocatorRepository
+        from HealedLocatorCache import HealedLocatorCache, DEFAULT_CACHE_FILE
+        from LLMResponseCache import LLMResponseCache
+        from DomContextBuilder import DomContextBuilder
+        from DomSerializer import DomSerializer
+        from SnapshotWriter import SnapshotWriter
+        import SnapshotImages
+        import HealingLog
+        from LocalHealer import LocalHealer
+        from LLMBackend import create_backend, CircuitOpenError
+        from JsonArrayStream import JsonArrayStream
+        from HealingMetrics import HealingMetrics, get_metrics
+        from HealingCoordinator import HealingCoordinator, DEFAULT_DB_FILE, LEADER, SHARED, FAILED
+        from ElementHandleCache import ElementHandleCache
+        from SnapshotStore import create_store
     except ImportError:
         # Fallback if neither works (should not happen if path set correctly)
-         def update_json_locator(*args):
+         def update_json_locators(*args):
              logger.error("Could not import LocatorUpdater. Agentic update failed.")
-             return False
+             return []
          class LocatorMapper:
              def __init__(self):
                  logger.error("Could not import LocatorMapper. Using fallback.")
 
-# Load env vars from .env file if present
-load_dotenv()
-
 # Configure logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG) # Catch all logs
@@ -50,6 +75,24 @@ if not has_console_handler:
 
 logger.propagate = False # Prevent double logging if root logger is captured by Robot
 
+# Bump whenever the healing prompt changes so cached LLM responses for the old prompt are not reused
+PROMPT_VERSION = "3"
+
+class _LibraryListener:
+    """
+    Robot Framework listener attached to the library instance.
+    Kept separate from GenAIRescuer so its methods are not exposed as keywords.
+    """
+
+    ROBOT_LISTENER_API_VERSION = 3
+
+    def __init__(self, library):
+        self.library = library
+
+    def close(self):
+        self.library._on_library_close()
+
+
 class GenAIRescuer:
     """
     A Robot Framework library that uses GenAI (LLM) to heal failed Selenium locators.
@@ -57,31 +100,292 @@ class GenAIRescuer:
     
     ROBOT_LIBRARY_SCOPE = 'GLOBAL'
 
-    def __init__(self):
-        self.api_key = os.getenv("GEMINI_API_KEY")
-        if not self.api_key:
-            logger.warning("GEMINI_API_KEY not found. Level 3 healing will fail.")
-        else:
-            genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel('gemini-2.5-flash')
+    def __init__(self, preload_locators=False):
+        # LLM backend with timeouts, rate limiting, retries and a circuit breaker (created on first use, configured via LLM_* env vars)
+        self.llm = None
         
         # Initialize centralized locator mapper
         self.mapper = LocatorMapper()
 
-    @keyword
-    def load_locator(self, page_name, element_name):
+        # In-memory page object cache (re-reads a page file only when it changes on disk)
+        self.locators = LocatorRepository(self.mapper)
+        if str(preload_locators).lower() == 'true':
+            self.locators.preload()
+
+        # Run-scoped healed locator overrides (created on first use, configured via ${HEALED_LOCATOR_CACHE})
+        self.healed_cache = None
+
+        # Persistent LLM response cache (created on first use, configured via ${LLM_RESPONSE_CACHE*})
+        self.llm_cache = None
+        self._last_llm_cache_key = None
+
+        # Heals and latency per healing tier/source, reported when the library closes
+        self.heal_stats = {}
+
+        # Per-phase timings and counters (export paths resolved on first use, configured via ${HEALING_METRICS*})
+        self.metrics = get_metrics()
+        self.metrics_outputs = None
+
+        # Live WebElements reused by consecutive lookups of the same element (created on first use, configured via ${ELEMENT_HANDLE_CACHE})
+        self.element_cache = None
+
+        # Cross-process single-flight healing (created on first use, configured via ${HEALING_COORDINATOR})
+        self.coordinator = None
+
+        # Last known good snapshots (created on first use, configured via ${SNAPSHOT_STORE})
+        self.snapshot_store = None
+        # Snapshots rewritten after structural drift in this run; each element is refreshed at most once per run
+        self.refreshed_snapshots = set()
+
+        # Background snapshot writer (created on first use, configured via ${ASYNC_SNAPSHOTS})
+        self.snapshot_writer = None
+        self.ROBOT_LIBRARY_LISTENER = _LibraryListener(self)
+
+    def _on_library_close(self):
         """
-        Reads the locator from locators/{page_name}.json
-        Returns a dict: {'type': '...', 'value': '...'}
+        Called by Robot Framework when the library goes out of scope: flush pending snapshots and report coordinator stats.
+        """
+        if self.snapshot_writer:
+            self.snapshot_writer.flush()
+            logger.debug(f"GenAIRescuer: Snapshot writer flushed ({self.snapshot_writer.written} written, {self.snapshot_writer.dropped} dropped).")
+        if self.heal_stats:
+            logger.info(f"GenAIRescuer: Healing tiers used: {self.heal_stats}")
+        if self.llm and self.llm.stats['calls']:
+            logger.info(f"GenAIRescuer: LLM backend stats: {self.llm.stats} (circuit {self.llm.breaker.state})")
+        if self.element_cache:
+            logger.info(f"GenAIRescuer: Element handle cache stats: {self.element_cache.stats} (hit rate {self.element_cache.hit_rate:.0%})")
+        if self.coordinator:
+            logger.info(f"GenAIRescuer: Healing coordinator stats: {self.coordinator.stats()}")
+        if self.metrics_outputs:
+            self._export_metrics()
+
+    def _get_driver(self):
+        """
+        Returns the WebDriver of the current SeleniumLibrary browser.
+        """
+        return BuiltIn().get_library_instance('SeleniumLibrary').driver
+
+    def _get_setting(self, name, default=None):
+        """
+        Reads a Robot Framework variable, falling back to the default outside of a Robot run.
         """
-        file_path = os.path.join("locators", f"{page_name}.json")
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-            return data.get(element_name)
+            return BuiltIn().get_variable_value('${%s}' % name, default)
+        except RobotNotRunningError:
+            return default
+
+    def _get_time_setting(self, name, default):
+        """
+        Reads a Robot Framework time variable (e.g. '60s', '1 min') and returns seconds.
+        Values like 'off', 'none' or 'false' return None.
+        """
+        value = self._get_setting(name, default)
+        if value is None or str(value).strip().lower() in ('', 'off', 'none', 'false'):
+            return None
+        try:
+            from robot.utils import timestr_to_secs
+            return timestr_to_secs(value)
+        except Exception:
+            logger.warning(f"GenAIRescuer: Invalid time value '{value}' for ${{{name}}}. Using '{default}'.")
+            from robot.utils import timestr_to_secs
+            return timestr_to_secs(default)
+
+    def _get_metrics_outputs(self):
+        """
+        Resolves the metrics export files once, while Robot variables are available:
+        JSON and CSV from ${HEALING_METRICS_FILE} (without extension) unless ${HEALING_METRICS} is disabled,
+        and a Prometheus textfile if ${HEALING_METRICS_PROMETHEUS} is set.
+        """
+        if self.metrics_outputs is None:
+            outputs = {}
+            if str(self._get_setting('HEALING_METRICS', 'True')).lower() == 'true':
+                base = self._get_setting('HEALING_METRICS_FILE') or os.path.join(self._get_setting('OUTPUT DIR', '.'), 'healing_metrics')
+                outputs['json'] = f"{base}.json"
+                outputs['csv'] = f"{base}.csv"
+            prometheus = self._get_setting('HEALING_METRICS_PROMETHEUS', 'off')
+            if prometheus and str(prometheus).strip().lower() not in ('off', 'none', 'false'):
+                outputs['prometheus'] = prometheus
+            self.metrics_outputs = outputs
+        return self.metrics_outputs
+
+    def _export_metrics(self):
+        """
+        Writes the run's healing metrics to the configured files.
+        """
+        summary = self.metrics.summary()
+        logger.info(f"GenAIRescuer: Healing phases: {summary['phases']}")
+        logger.info(f"GenAIRescuer: Healing counters: {summary['counters']}")
+        writers = {'json': self.metrics.write_json, 'csv': self.metrics.write_csv, 'prometheus': self.metrics.write_prometheus}
+        for kind, path in self.metrics_outputs.items():
+            try:
+                writers[kind](path)
+                logger.info(f"GenAIRescuer: Healing metrics ({kind}) written to {path}")
+            except Exception as e:
+                logger.warning(f"GenAIRescuer: Failed to write healing metrics to {path}: {e}")
+
+    def _report_heal_phases(self, page_name, element_name, mark, heal_start, failed):
+        """
+        Records the heal's total time and writes its phase breakdown to the Robot log.
+        """
+        self.metrics.record('heal_total', (time.perf_counter() - heal_start) * 1000, page=page_name, element=element_name)
+        if failed:
+            self.metrics.incr('heal_failures')
+        message = (f"GenAIRescuer: Healing of {page_name}.{element_name} {'failed' if failed else 'succeeded'}. "
+                   f"Phases: {HealingMetrics.format_events(self.metrics.events_since(mark))}")
+        logger.info(message)
+        robot_logger.info(message)
+
+    def _get_llm(self):
+        """
+        Returns the LLM backend, loading .env and creating it on first use so runs that never heal skip it.
+        """
+        if self.llm is None:
+            from dotenv import load_dotenv
+            load_dotenv()
+            self.llm = create_backend()
+        return self.llm
+
+    def _get_healed_cache(self):
+        """
+        Returns the healed locator override cache, creating it from ${HEALED_LOCATOR_CACHE}
+        ('memory', 'file' or 'off') and ${HEALED_LOCATOR_CACHE_FILE} on first use.
+        """
+        if self.healed_cache is None:
+            mode = self._get_setting('HEALED_LOCATOR_CACHE', 'memory')
+            file_path = self._get_setting('HEALED_LOCATOR_CACHE_FILE', DEFAULT_CACHE_FILE)
+            self.healed_cache = HealedLocatorCache(persistence=mode, file_path=file_path)
+        return self.healed_cache
+
+    def _get_llm_cache(self):
+        """
+        Returns the LLM response cache, or None if disabled via ${LLM_RESPONSE_CACHE}.
+        """
+        if str(self._get_setting('LLM_RESPONSE_CACHE', 'True')).lower() != 'true':
+            return None
+        if self.llm_cache is None:
+            ttl = self._get_time_setting('LLM_RESPONSE_CACHE_TTL', '7 days')
+            max_entries = self._get_setting('LLM_RESPONSE_CACHE_MAX_ENTRIES', 500)
+            self.llm_cache = LLMResponseCache(max_entries=max_entries, ttl=ttl)
+        return self.llm_cache
+
+    def _get_snapshot_store(self):
+        """
+        Returns the snapshot store: loose files or one pack per page, from ${SNAPSHOT_STORE} ('files' or 'packed').
+        """
+        if self.snapshot_store is None:
+            self.snapshot_store = create_store(self._get_setting('SNAPSHOT_STORE', 'files'))
+        return self.snapshot_store
+
+    def _get_snapshot_writer(self):
+        """
+        Returns the background snapshot writer, or None if ${ASYNC_SNAPSHOTS} is disabled.
+        """
+        if str(self._get_setting('ASYNC_SNAPSHOTS', 'True')).lower() != 'true':
+            return None
+        if self.snapshot_writer is None:
+            max_queue = self._get_setting('SNAPSHOT_QUEUE_SIZE', 32)
+            self.snapshot_writer = SnapshotWriter(self._write_snapshot, max_queue=max_queue)
+        return self.snapshot_writer
+
+    def _get_element_cache(self):
+        """
+        Returns the element handle cache, or None if disabled via ${ELEMENT_HANDLE_CACHE}.
+        """
+        if str(self._get_setting('ELEMENT_HANDLE_CACHE', 'True')).lower() != 'true':
+            return None
+        if self.element_cache is None:
+            self.element_cache = ElementHandleCache()
+        return self.element_cache
+
+    def _remember_elements(self, driver, page_name, element_name, l_type, l_value, elements, found_by=None):
+        """
+        Keeps the elements looked up with the original locator for the next lookup of the same element. Returns them.
+        found_by is the (type, value) of the healed locator that actually found them, if any.
+        """
+        element_cache = self._get_element_cache()
+        if element_cache:
+            element_cache.put(driver, page_name, element_name, l_type, l_value, elements, found_by=found_by)
+        return elements
+
+    def _get_coordinator(self):
+        """
+        Returns the cross-process healing coordinator, or None unless ${HEALING_COORDINATOR} is 'sqlite'.
+        """
+        if str(self._get_setting('HEALING_COORDINATOR', 'off')).lower() != 'sqlite':
+            return None
+        if self.coordinator is None:
+            db_path = self._get_setting('HEALING_COORDINATOR_DB', DEFAULT_DB_FILE)
+            self.coordinator = HealingCoordinator(db_path=db_path)
+        return self.coordinator
+
+    def _find_visible_elements(self, driver, locator, timeout, quiet_window=None, with_fingerprint=False):
+        """
+        Waits until all matches of the locator (an entry compiled by the locator repository) are visible
+        and scrolls the first one into view.
+        ${LOCATOR_RESOLUTION_MODE} 'script' does find, visibility and an instant scroll in one injected
+        async script per poll slice; 'webdriver' uses Selenium's waits and a separate smooth scroll.
+        With a quiet window, returns [] once the locator matches nothing on a settled page.
+        Returns (elements, fingerprint): with with_fingerprint, the structural fingerprint of the first
+        element (computed by the same script in 'script' mode, one extra script otherwise), else None.
+        """
+        fingerprint = None
+        l_type, l_value = locator['type'], locator.get('value')
+        selenium_by = locator['selenium_by'][0] if locator['selenium_by'] else None
+        if str(self._get_setting('LOCATOR_RESOLUTION_MODE', 'script')).lower() == 'script':
+            elements, fingerprint = self.mapper.resolve_visible(driver, l_type, l_value, timeout=timeout, quiet_window=quiet_window,
+                                                                with_fingerprint=True, selenium_by=selenium_by)
+        else:
+            if quiet_window:
+                elements = self.mapper.wait_for_all_visible_or_broken(driver, l_type, l_value, timeout=timeout, quiet_window=quiet_window,
+                                                                      selenium_by=selenium_by)
+            else:
+                elements = self.mapper.wait_for_all_visible(driver, l_type, l_value, timeout=timeout, selenium_by=selenium_by)
+            if elements:
+                self.mapper.scroll_into_view(driver, elements[0])
+        if not with_fingerprint:
+            return elements, None
+        if elements and not fingerprint:
+            fingerprint = self.mapper.structural_fingerprint(driver, elements[0])
+        return elements, fingerprint
+
+    def _try_healed_override(self, driver, page_name, element_name, l_type, l_value, max_wait):
+        """
+        Tries a locator healed earlier for this element before waiting on the original one.
+        Evicts the override if it no longer matches any visible element.
+        Returns (elements, (type, value) of the override), or None.
+        """
+        healed_cache = self._get_healed_cache()
+        override = healed_cache.get(page_name, element_name, l_type, l_value)
+        if not override:
+            return None
+
+        override = self.locators.compile_entry(override)
+        rf_override = override['rf_locator']
+        logger.info(f"GenAIRescuer: Trying previously healed locator '{rf_override}' for {page_name}.{element_name}...")
+        try:
+            # The healed locator matched before, so a short wait is enough to confirm it
+            found_els, _ = self._find_visible_elements(driver, override, timeout=min(5, max_wait))
+            if found_els:
+                self.metrics.incr('healed_cache_hits')
+                return found_els, (override['type'], override['value'])
         except Exception as e:
-            logger.error(f"Failed to load locator {element_name} from {page_name}.json: {e}")
+            logger.debug(f"GenAIRescuer: Healed locator '{rf_override}' did not match: {e}")
+
+        logger.info(f"GenAIRescuer: Previously healed locator '{rf_override}' stopped matching. Evicting it.")
+        healed_cache.evict(page_name, element_name, l_type, l_value)
+        return None
+
+    @keyword
+    def load_locator(self, page_name, element_name):
+        """
+        Reads the locator from locators/{page_name}.json (cached in memory until the file changes).
+        Returns a dict: {'type': '...', 'value': '...', 'rf_locator': '...', 'selenium_by': (by, value)}
+        """
+        entry = self.locators.get(page_name, element_name)
+        if entry is None:
+            logger.error(f"Failed to load locator {element_name} from {page_name}.json")
             return None
+        return dict(entry)
 
     @keyword
     def get_webelement_with_healing(self, page_name, element_name):
@@ -109,11 +413,10 @@ class GenAIRescuer:
         prioritizes them, and validates against the live page.
         Returns a list of WebElements if found, otherwise raises an exception.
         """
-        sl = BuiltIn().get_library_instance('SeleniumLibrary')
-        driver = sl.driver
+        driver = self._get_driver()
         
         # Fetch dynamic wait timeout from Robot Framework
-        max_wait_str = BuiltIn().get_variable_value('${MAX_DYNAMIC_WAIT}', '60s')
+        max_wait_str = self._get_setting('MAX_DYNAMIC_WAIT', '60s')
         # Convert RF time string (e.g., '60s', '1 min') to seconds
         try:
             from robot.utils import timestr_to_secs
@@ -121,38 +424,419 @@ class GenAIRescuer:
         except:
             max_wait = 60
             
-        # 1. Load Original Locator
-        loc_data = self.load_locator(page_name, element_name)
+        # 1. Load Original Locator (precompiled by the locator repository)
+        loc_data = self.locators.get(page_name, element_name)
         if not loc_data:
              raise Exception(f"Locator '{element_name}' not found in '{page_name}.json'")
         
-        l_type = loc_data.get('type', 'xpath')
+        l_type = loc_data['type']
         l_value = loc_data.get('value')
-        
-        # Use centralized mapper to construct RF locator
-        rf_locator = self.mapper.json_to_robot_framework(l_type, l_value)
+        rf_locator = loc_data['rf_locator']
+
+        # 1a. Reuse the elements of the previous lookup while they are attached, visible and the DOM structure is unchanged
+        element_cache = self._get_element_cache()
+        if element_cache:
+            cached_els = element_cache.get(driver, page_name, element_name, l_type, l_value)
+            self.metrics.incr('element_cache_hits' if cached_els else 'element_cache_misses')
+            if cached_els:
+                return cached_els
+
+        # 1b. Try a locator healed earlier in this run (or a previous run with file persistence)
+        healed = self._try_healed_override(driver, page_name, element_name, l_type, l_value, max_wait)
+        if healed:
+            return self._remember_elements(driver, page_name, element_name, l_type, l_value, healed[0], found_by=healed[1])
         
         # 1. Try Original Locator with Visibility Wait
+        # With a quiet window configured (opt-in), stop waiting as soon as the locator matches nothing on a settled page.
+        quiet_window = self._get_time_setting('BROKEN_LOCATOR_QUIET_WINDOW', 'off')
+        self._get_metrics_outputs()
+        metrics_mark = self.metrics.mark()
         try:
             logger.info(f"GenAIRescuer: Waiting up to {max_wait}s for '{rf_locator}' to be visible...")
-            init_found_els = self.mapper.wait_for_all_visible(driver, l_type, l_value, timeout=max_wait)
+            with self.metrics.span('original_wait', page=page_name, element=element_name):
+                # Also scrolls the first found element into view and fingerprints its structure (for snapshot refresh)
+                init_found_els, fingerprint = self._find_visible_elements(driver, loc_data, max_wait, quiet_window=quiet_window,
+                                                                          with_fingerprint=self._snapshot_refresh_enabled())
             if init_found_els:
-                # Scroll the first found element into view
-                self.mapper.scroll_into_view(driver, init_found_els[0])
-                
                 # --- NEW: Save snapshot for Differential Healing ---
-                # OPTIMIZATION: Only save if we don't have a snapshot yet.
-                if not self._snapshot_exists(page_name, element_name):
-                    self._save_dom_snapshot(page_name, element_name, init_found_els[0])
+                # OPTIMIZATION: Only save if we don't have a snapshot yet, or the element's structure drifted.
+                if self._snapshot_needs_refresh(page_name, element_name, fingerprint):
+                    self._save_dom_snapshot(page_name, element_name, init_found_els[0], match_count=len(init_found_els))
                 
-                return init_found_els
+                return self._remember_elements(driver, page_name, element_name, l_type, l_value, init_found_els)
             logger.info(f"GenAIRescuer: No visible elements found using existing locator '{rf_locator}' ({page_name}.{element_name}). Engaging AI Healing...")
         except Exception as e:
             logger.info(f"GenAIRescuer: Visibility wait failed or error using existing locator '{rf_locator}': {e}. Engaging AI Healing...")
 
-        # 2. Capture & Query
-        html_content = self._get_minified_dom(driver.page_source)
-        
+        return self._heal_element(driver, page_name, element_name, loc_data, max_wait, metrics_mark)
+
+    def _heal_element(self, driver, page_name, element_name, loc_data, max_wait, metrics_mark, try_local=True):
+        """
+        Heals one element whose original locator has already been waited for: local similarity (tier 1),
+        the coordinator, then the LLM. Records the healed locator and returns the elements it finds,
+        or raises if nothing matched. try_local=False skips tier 1 when the caller already ran it.
+        """
+        l_type = loc_data['type']
+        l_value = loc_data.get('value')
+        rf_locator = loc_data['rf_locator']
+
+        heal_start = time.perf_counter()
+        heal_failed = False
+        try:
+            # 2. Tier 1: deterministic similarity to the last known good snapshot, no LLM involved
+            local_winner = self._heal_locally(driver, page_name, element_name) if try_local else None
+            if local_winner:
+                self._accept_healed_locators(driver, page_name, element_name, {element_name: (l_type, l_value) + local_winner},
+                                             source='Local', heal_start=heal_start)
+                return self._remember_elements(driver, page_name, element_name, l_type, l_value, local_winner[2],
+                                               found_by=local_winner[:2])
+
+            # 3. Tier 2: capture the DOM for the LLM
+            html_content, dom_format = self._capture_dom(driver)
+
+            # 3a. With a coordinator, only one worker heals a given (page, element, DOM); the others reuse its result
+            coordinator = self._get_coordinator()
+            flight = None
+            if coordinator:
+                with self.metrics.span('coordinator_wait', page=page_name, element=element_name):
+                    role, payload = coordinator.acquire(page_name, element_name, coordinator.dom_hash(html_content), wait_timeout=max_wait)
+                self.metrics.incr('coordinator', role=role)
+                if role == LEADER:
+                    flight = payload
+                elif role == SHARED:
+                    found_els = self._try_shared_locator(driver, payload)
+                    if found_els:
+                        self._accept_healed_locators(driver, page_name, element_name,
+                                                     {element_name: (l_type, l_value, payload['type'], payload['value'], found_els)},
+                                                     source='Shared', heal_start=heal_start)
+                        return self._remember_elements(driver, page_name, element_name, l_type, l_value, found_els,
+                                                       found_by=(payload['type'], payload['value']))
+                    logger.info("GenAIRescuer: Locator healed by another worker does not match here. Healing in this worker...")
+                elif role == FAILED:
+                    raise Exception(f"GenAIRescuer: Healing failed for '{rf_locator}' in the worker that healed it concurrently. Need Human Intervention.❤️")
+
+            winner = None
+            healed = {}
+            tried = 0
+            source = 'GenAI'
+            try:
+                # 3b. Batch mode: heal every broken element of the page with one LLM request
+                if str(self._get_setting('BATCH_HEALING', 'False')).lower() == 'true':
+                    healed = self._batch_heal(driver, page_name, element_name, html_content, dom_format)
+                if healed:
+                    source = 'GenAIBatch'
+                if element_name in healed:
+                    winner = healed[element_name][2:]
+                else:
+                    winner, tried = self._heal_with_llm(driver, page_name, element_name, rf_locator, html_content, dom_format)
+                    if winner and self._last_llm_cache_key and not healed:
+                        source = 'LLMCache'
+            finally:
+                if flight:
+                    coordinator.release(flight, {'type': winner[0], 'value': winner[1]} if winner else None)
+
+            if winner:
+                healed[element_name] = (l_type, l_value) + tuple(winner)
+            if healed:
+                self._accept_healed_locators(driver, page_name, element_name, healed, source=source, heal_start=heal_start)
+            if winner:
+                return self._remember_elements(driver, page_name, element_name, l_type, l_value, winner[2], found_by=winner[:2])
+
+            # 5. Fail if all fail
+            raise Exception(f"GenAIRescuer: Healing failed. Tried {tried} Locators but none matched or became visible on the live page. Need Human Intervention.❤️")
+        except Exception:
+            heal_failed = True
+            raise
+        finally:
+            self._report_heal_phases(page_name, element_name, metrics_mark, heal_start, heal_failed)
+
+    @keyword
+    def get_webelements_batch(self, page_name, *element_names):
+        """
+        Resolves many elements with one browser-side lookup instead of one Get WebElement With Healing each.
+        Without element names, every element of locators/{page_name}.json is resolved; 'OtherPage.element'
+        picks an element from another page object.
+
+        All locators are waited for together (one browser call per poll, bounded by MAX_DYNAMIC_WAIT and
+        BROKEN_LOCATOR_QUIET_WINDOW). The broken ones are healed together: tier 1 per element, then one LLM
+        request per page for the rest. Elements still unresolved after the batched wait (hidden matches, failed
+        batch heals) are healed one at a time without waiting for their original locator again; unsupported
+        locator types and lookup errors go through Get WebElements With Healing.
+        Unlike the single-element keyword, found elements are not scrolled into view; Selenium scrolls when
+        interacting with them.
+
+        Returns a dict {element_name: WebElement} in the requested order.
+        """
+        driver = self._get_driver()
+        max_wait = self._get_time_setting('MAX_DYNAMIC_WAIT', '60s') or 60
+        quiet_window = self._get_time_setting('BROKEN_LOCATOR_QUIET_WINDOW', 'off')
+        self._get_metrics_outputs()
+
+        # 1. Collect (key, page, element, compiled entry) from the cached page objects
+        targets = []
+        if not element_names:
+            entries = self.locators.get_page(page_name)
+            if entries is None:
+                raise Exception(f"Locator file '{page_name}.json' not found or unreadable.")
+            targets = [(name, page_name, name, entry) for name, entry in entries.items()]
+        for key in element_names:
+            page, name = page_name, key
+            entry = self.locators.get(page, name)
+            if entry is None and '.' in key:
+                page, name = key.split('.', 1)
+                entry = self.locators.get(page, name)
+            if not entry:
+                raise Exception(f"Locator '{name}' not found in '{page}.json'")
+            targets.append((key, page, name, entry))
+
+        # 2. One batched wait for all of them, trying locators healed earlier in the run first
+        healed_cache = self._get_healed_cache()
+        checks, fallback = [], []
+        for target in targets:
+            _, page, name, entry = target
+            override = healed_cache.get(page, name, entry['type'], entry.get('value'))
+            locator = self.locators.compile_entry(override) if override else entry
+            if locator['selenium_by']:
+                checks.append((target, {'type': locator['type'], 'value': locator['value']}, bool(override)))
+            else:
+                fallback.append(target)
+
+        refresh = self._snapshot_refresh_enabled()
+        logger.info(f"GenAIRescuer: Waiting up to {max_wait}s for {len(checks)} elements in one batch...")
+        with self.metrics.span('batch_lookup', page=page_name):
+            results = self.mapper.wait_for_locators(driver, [check[1] for check in checks], timeout=max_wait, quiet_window=quiet_window)
+
+        found = {}
+        broken = {}
+        remember = []
+        evicted = []
+        waited = []
+        for (target, locator, is_override), res in zip(checks, results):
+            key, page, name, entry = target
+            if res.get('allVisible'):
+                found[key] = res['elements'][0]
+                remember.append((page, name, entry['type'], entry.get('value'), res['elements'], (locator['type'], locator.get('value'))))
+                if self._snapshot_needs_refresh(page, name, res.get('fingerprint') if refresh else None):
+                    self._save_dom_snapshot(page, name, found[key], match_count=len(res['elements']))
+            elif is_override:
+                logger.info(f"GenAIRescuer: Previously healed locator for {page}.{name} stopped matching. Evicting it.")
+                healed_cache.evict(page, name, entry['type'], entry.get('value'))
+                if entry['selenium_by']:
+                    evicted.append(target)
+                else:
+                    fallback.append(target)
+            elif res.get('count', 0) == 0 and not res.get('error'):
+                broken.setdefault(page, []).append(target)
+            elif not res.get('error'):
+                waited.append((target, True))
+            else:
+                fallback.append(target)
+
+        # 2a. The original locators of evicted overrides were not waited for; the page settled during the batched wait,
+        # so a single poll tells which ones are broken
+        if evicted:
+            originals = [{'type': entry['type'], 'value': entry.get('value')} for _, _, _, entry in evicted]
+            for target, res in zip(evicted, self.mapper.wait_for_locators(driver, originals, timeout=0)):
+                key, page, name, entry = target
+                if res.get('allVisible'):
+                    found[key] = res['elements'][0]
+                    remember.append((page, name, entry['type'], entry.get('value'), res['elements']))
+                    if self._snapshot_needs_refresh(page, name, res.get('fingerprint') if refresh else None):
+                        self._save_dom_snapshot(page, name, found[key], match_count=len(res['elements']))
+                elif res.get('count', 0) == 0 and not res.get('error'):
+                    broken.setdefault(page, []).append(target)
+                else:
+                    fallback.append(target)
+        self.metrics.incr('batch_lookup_hits', len(found))
+        self.metrics.incr('batch_lookup_misses', len(targets) - len(found))
+
+        # 3. Heal the broken elements of each page together
+        for page, page_targets in broken.items():
+            healed = self._heal_batch_misses(driver, page, [(name, entry) for _, _, name, entry in page_targets])
+            for target in page_targets:
+                if target[2] in healed:
+                    new_type, new_value, elements = healed[target[2]]
+                    found[target[0]] = elements[0]
+                    remember.append((page, target[2], target[3]['type'], target[3].get('value'), elements, (new_type, new_value)))
+                else:
+                    # Tier 1 already failed for it
+                    waited.append((target, False))
+
+        element_cache = self._get_element_cache()
+        if element_cache:
+            element_cache.put_many(driver, remember)
+
+        # 4. Elements the batched wait already gave up on are healed one by one (coordinator, LLM) without a second wait;
+        # whatever the batch could not check goes through the single-element path
+        in_batch = len(found)
+        for (key, page, name, entry), try_local in waited:
+            found[key] = self._heal_element(driver, page, name, entry, max_wait, self.metrics.mark(), try_local=try_local)[0]
+        for key, page, name, _ in fallback:
+            found[key] = self.get_webelement_with_healing(page, name)
+
+        logger.info(f"GenAIRescuer: Batch lookup of {len(targets)} elements: {in_batch} resolved in the batch, "
+                    f"{len(waited) + len(fallback)} one by one.")
+        return {target[0]: found[target[0]] for target in targets}
+
+    def _heal_batch_misses(self, driver, page_name, broken):
+        """
+        Heals the broken elements of one page found by a batch lookup: tier 1 per element,
+        then a single LLM request for the rest (a lone remaining element is left to the caller).
+
+        Args:
+            broken (list): [(element_name, compiled_entry)]
+
+        Returns:
+            dict: {element_name: (new_type, new_value, elements)} for every element healed
+        """
+        metrics_mark = self.metrics.mark()
+        heal_start = time.perf_counter()
+        healed_els = {}
+        heal_failed = False
+        try:
+            remaining = []
+            for name, entry in broken:
+                local_winner = self._heal_locally(driver, page_name, name)
+                if local_winner:
+                    self._accept_healed_locators(driver, page_name, name, {name: (entry['type'], entry.get('value')) + local_winner},
+                                                 source='Local', heal_start=heal_start)
+                    healed_els[name] = local_winner
+                else:
+                    remaining.append((name, entry))
+
+            if len(remaining) > 1:
+                healed = self._heal_page_batch(driver, page_name, remaining, heal_start)
+                for name, (_, _, new_type, new_value, elements) in healed.items():
+                    healed_els[name] = (new_type, new_value, elements)
+                heal_failed = len(healed) < len(remaining)
+        except Exception:
+            heal_failed = True
+            raise
+        finally:
+            self._report_heal_phases(page_name, ", ".join(name for name, _ in broken), metrics_mark, heal_start, heal_failed)
+        return healed_els
+
+    def _heal_page_batch(self, driver, page_name, broken, heal_start):
+        """
+        Heals several broken elements of one page with a single LLM request, then records every
+        healed locator and saves a fresh snapshot of each healed element.
+        If some elements stay broken, the LLM answer is dropped from the cache so it is not served again.
+
+        Args:
+            broken (list): [(element_name, compiled_entry)]
+            heal_start (float): time.perf_counter() when healing started, for latency reporting
+
+        Returns:
+            dict: {name: (orig_type, orig_value, new_type, new_value, elements)} for every element healed
+        """
+        html_content, dom_format = self._capture_dom(driver)
+        healed = self._heal_page_elements(driver, page_name, broken, html_content, dom_format)
+        if healed:
+            self._accept_healed_locators(driver, page_name, None, healed, source='GenAIBatch', heal_start=heal_start)
+            for name, (_, _, _, _, elements) in healed.items():
+                self._save_dom_snapshot(page_name, name, elements[0], match_count=len(elements))
+        if len(healed) < len(broken) and self._last_llm_cache_key:
+            # Do not serve this answer again; the single-element path asks the LLM afresh
+            self._get_llm_cache().invalidate(self._last_llm_cache_key)
+        return healed
+
+    def _heal_locally(self, driver, page_name, element_name):
+        """
+        Tier-1 healing: scores the live DOM against the element's last known good snapshot.
+        Returns (normalized_type, value, elements) for a confident match, or None (disabled with ${LOCAL_HEAL_THRESHOLD} off).
+        Skipped for locators that matched several elements: the local tier finds a single element,
+        which would change the result of Get WebElements With Healing.
+        """
+        threshold = self._get_setting('LOCAL_HEAL_THRESHOLD', 0.75)
+        if threshold is None or str(threshold).strip().lower() in ('', 'off', 'none', 'false'):
+            return None
+        snapshot = self._load_dom_snapshot(page_name, element_name)
+        if not snapshot:
+            return None
+        try:
+            matches = (self._get_snapshot_store().load_meta(page_name, element_name) or {}).get('matches', 1)
+        except Exception as e:
+            logger.debug(f"GenAIRescuer: Failed to load snapshot metadata for {page_name}.{element_name}: {e}")
+            matches = 1
+        if matches > 1:
+            logger.info(f"GenAIRescuer: {page_name}.{element_name} matched {matches} elements when last found. Skipping local healing...")
+            return None
+
+        try:
+            with self.metrics.span('local_heal', page=page_name, element=element_name):
+                match = LocalHealer(threshold=threshold).heal(driver, snapshot)
+        except Exception as e:
+            logger.warning(f"GenAIRescuer: Local similarity healing failed: {e}")
+            return None
+        if not match:
+            logger.info(f"GenAIRescuer: No confident local match for {page_name}.{element_name}. Escalating to the LLM...")
+            return None
+        self.metrics.incr('candidates_tried')
+
+        best = match['locators'][0]
+        return best['type'], best['value'], [match['element']]
+
+    @keyword
+    def verify_page_locators(self, page_name, heal=False, fail_on_broken=False):
+        """
+        Pre-flight check of a page object: resolves every locator of locators/{page_name}.json
+        against the current page in a single browser call and logs count/visibility per element.
+
+        With heal=True, all broken elements are healed with one LLM request before any test step
+        touches them; healed locators go to the Page Object JSON (AUTO_UPDATE_LOCATORS) or to the
+        run-scoped overrides that the Smart keywords try first.
+        With fail_on_broken=True, the keyword fails if elements are still broken afterwards.
+
+        Returns a list of dicts: {'name', 'locator', 'count', 'visible', 'status', 'healed'}
+        where status is ok, hidden, broken, error, unsupported or healed.
+        """
+        driver = self._get_driver()
+        self._get_metrics_outputs()
+        heal = str(heal).lower() == 'true'
+        fail_on_broken = str(fail_on_broken).lower() == 'true'
+
+        rows = self._check_page_locators(driver, page_name)
+        broken = [row for row in rows if row['status'] == 'broken']
+
+        if heal and broken:
+            metrics_mark = self.metrics.mark()
+            heal_start = time.perf_counter()
+            healed = {}
+            try:
+                healed = self._heal_page_batch(driver, page_name, [(row['name'], row['entry']) for row in broken], heal_start)
+            finally:
+                self._report_heal_phases(page_name, ", ".join(row['name'] for row in broken), metrics_mark, heal_start,
+                                         len(healed) < len(broken))
+            for row in broken:
+                if row['name'] in healed:
+                    _, _, new_type, new_value, elements = healed[row['name']]
+                    row.update({
+                        'locator': self.mapper.json_to_robot_framework(new_type, new_value),
+                        'count': len(elements),
+                        'visible': len(elements),
+                        'status': 'healed',
+                        'healed': True
+                    })
+
+        report = [{key: row[key] for key in ('name', 'locator', 'count', 'visible', 'status', 'healed')} for row in rows]
+        summary = {}
+        for row in report:
+            summary[row['status']] = summary.get(row['status'], 0) + 1
+        logger.info(f"GenAIRescuer: Verified {len(report)} locators of {page_name}: {summary}")
+        for row in report:
+            if row['status'] != 'ok':
+                logger.info(f"GenAIRescuer:   {row['name']:<30} {row['status']:<12} {row['locator']} (matches: {row['count']}, visible: {row['visible']})")
+
+        still_broken = [row['name'] for row in report if row['status'] == 'broken']
+        if fail_on_broken and still_broken:
+            raise Exception(f"GenAIRescuer: {len(still_broken)} locator(s) of '{page_name}' match nothing: {', '.join(still_broken)}")
+        return report
+
+    def _heal_with_llm(self, driver, page_name, element_name, rf_locator, html_content, dom_format):
+        """
+        Queries the LLM for candidates and validates them against the live page.
+        Returns ((normalized_type, value, elements) or None, number of candidates tried).
+        """
         # --- NEW: Load snapshot for Differential Healing ---
         last_known_html = self._load_dom_snapshot(page_name, element_name)
         
@@ -160,35 +844,94 @@ class GenAIRescuer:
         last_known_image = None
         current_image = None
         
-        enable_vision = BuiltIn().get_variable_value('${ENABLE_VISION_HEALING}', 'False')
+        enable_vision = self._get_setting('ENABLE_VISION_HEALING', 'False')
         if str(enable_vision).lower() == 'true':
+            vision_start = time.perf_counter()
             try:
+                from PIL import Image
+
+                # Images sent to the LLM are capped at ${VISION_MAX_IMAGE_SIDE} pixels
+                max_side = self._get_setting('VISION_MAX_IMAGE_SIDE', 1024)
+
                 # 1. Capture Current Broken State
                 png_data = driver.get_screenshot_as_png()
-                current_image = Image.open(io.BytesIO(png_data))
+                current_image = SnapshotImages.limit_resolution(Image.open(io.BytesIO(png_data)), max_side)
                 
-                # 2. Load Last Known Good State (if available)
-                snapshot_dir = os.path.join("locators", "dom_snapshots", page_name)
-                success_img_path = os.path.join(snapshot_dir, f"{element_name}_success.png")
+                # 2. Load Last Known Good State (if available, any stored image format)
+                success_img_data = self._get_snapshot_store().load_image(page_name, element_name)
                 
-                if os.path.exists(success_img_path):
+                if success_img_data:
                     try:
-                        last_known_image = Image.open(success_img_path)
-                        logger.info(f"GenAIRescuer: Loaded reference screenshot from {success_img_path}")
+                        last_known_image = SnapshotImages.limit_resolution(Image.open(io.BytesIO(success_img_data)), max_side)
+                        logger.info(f"GenAIRescuer: Loaded reference screenshot of {page_name}.{element_name}")
                     except Exception as img_err:
                          logger.warning(f"GenAIRescuer: Failed to load reference screenshot: {img_err}")
                 
                 logger.info("GenAIRescuer: Prepared images for Multi-Modal analysis.")
             except Exception as e:
                 logger.warning(f"GenAIRescuer: Vision capture failed: {e}")
+            self.metrics.record('vision_capture', (time.perf_counter() - vision_start) * 1000, page=page_name, element=element_name)
+
+        # Streamed candidates are validated as they arrive; the first unique visible match ends the request
+        early = []
+
+        def validate_early(candidate):
+            winner = self._validate_streamed_candidate(driver, candidate)
+            if winner:
+                early.append(winner)
+            return winner is not None
 
         logger.info(f"GenAIRescuer: Captured HTML Content Successfully")
-        candidates = self._query_llm(rf_locator, html_content, last_known_html, last_known_image, current_image)
+        candidates = self._query_llm(rf_locator, html_content, last_known_html, last_known_image, current_image, element_name=element_name, dom_format=dom_format, on_candidate=validate_early)
         logger.info(f"GenAIRescuer: LLM returned Locators Successfully. Locators: {json.dumps(candidates, indent=2)}")
+        if early:
+            return early[0], len(candidates)
         if not candidates:
             raise Exception(f"GenAIRescuer: Failed to heal/generate new locator for '{rf_locator}'. No suggestions from LLM.")
 
         # 3. Sort Candidates/Locators
+        candidates = self._prepare_candidates(candidates)
+        
+        logger.info(f"GenAIRescuer: Testing {len(candidates)} candidates in priority order...")
+
+        # 4. Validation: evaluate every candidate in one browser round trip, fall back to timed waits
+        winner, pending = self._select_validated_candidate(driver, candidates)
+        if winner is None:
+            winner = self._wait_for_candidates(driver, pending)
+
+        # A cached answer that no longer matches the page is dropped and the LLM asked again
+        if winner is None and self._last_llm_cache_key:
+            logger.info("GenAIRescuer: Cached LLM candidates no longer match the page. Re-querying the LLM...")
+            self.llm_cache.invalidate(self._last_llm_cache_key)
+            candidates = self._query_llm(rf_locator, html_content, last_known_html, last_known_image, current_image, element_name=element_name, dom_format=dom_format, use_cache=False, on_candidate=validate_early)
+            if early:
+                return early[0], len(candidates)
+            if candidates:
+                candidates = self._prepare_candidates(candidates)
+                winner, pending = self._select_validated_candidate(driver, candidates)
+                if winner is None:
+                    winner = self._wait_for_candidates(driver, pending)
+
+        return winner, len(candidates or [])
+
+    def _try_shared_locator(self, driver, shared):
+        """
+        Confirms a locator healed by another worker on this worker's page.
+        Returns the list of visible elements, or None.
+        """
+        self.metrics.incr('candidates_tried')
+        try:
+            with self.metrics.span('validation'):
+                found_els = self.mapper.wait_for_all_visible(driver, shared['type'], shared['value'], timeout=5)
+            return found_els or None
+        except Exception as e:
+            logger.debug(f"GenAIRescuer: Shared locator {shared} did not match: {e}")
+            return None
+
+    def _prepare_candidates(self, candidates):
+        """
+        Coerces an LLM answer into a list of candidate dicts sorted by locator priority.
+        """
         if isinstance(candidates, str): 
              try:
                  candidates = json.loads(candidates)
@@ -197,11 +940,80 @@ class GenAIRescuer:
         if not isinstance(candidates, list):
              candidates = [candidates]
 
-        candidates = self.mapper.sort_locator_candidates(candidates)
-        
-        logger.info(f"GenAIRescuer: Testing {len(candidates)} candidates in priority order...")
+        return self.mapper.sort_locator_candidates(candidates)
 
-        # 4. Validation Loop
+    def _select_validated_candidate(self, driver, candidates):
+        """
+        Evaluates all candidates in a single execute_script call.
+        Returns (winner, pending): the best unique, visible candidate as (normalized_type, value, elements)
+        or None, and the candidates worth a timed wait, i.e. those that matched only partly visible elements.
+        Invalid candidates and ones matching nothing are dropped. If the evaluation itself fails, every
+        candidate is pending.
+        """
+        normalized = []
+        for cand in candidates:
+            normalized.append({
+                'type': self.mapper.normalize_genai_type(cand.get('type', 'xpath')),
+                'value': cand.get('value')
+            })
+
+        self.metrics.incr('candidates_tried', len(normalized))
+        try:
+            with self.metrics.span('validation'):
+                results = self.mapper.evaluate_candidates(driver, normalized)
+        except Exception as e:
+            logger.debug(f"GenAIRescuer: Batched candidate validation failed: {e}")
+            return None, normalized
+
+        for cand, res in zip(normalized, results):
+            rf_locator = self.mapper.json_to_robot_framework(cand['type'], cand['value'])
+            logger.debug(f"GenAIRescuer: Candidate {rf_locator} -> matches: {res.get('count')}, visible: {res.get('visibleCount')}"
+                         + (f", error: {res.get('error')}" if res.get('error') else ""))
+
+        best = self.mapper.select_best_candidate(normalized, results)
+        if not best:
+            pending = [cand for cand, res in zip(normalized, results) if res and not res.get('error') and res.get('count', 0) > 0]
+            logger.info(f"GenAIRescuer: No candidate has visible matches yet. "
+                        f"{len(pending)}/{len(normalized)} match hidden elements; falling back to timed waits for those...")
+            return None, pending
+
+        cand, res = best
+        logger.info(f"GenAIRescuer: Selected candidate {self.mapper.json_to_robot_framework(cand['type'], cand['value'])} "
+                    f"({res.get('count')} visible match(es)).")
+        return (cand['type'], cand['value'], res['elements']), []
+
+    def _validate_streamed_candidate(self, driver, candidate):
+        """
+        Checks a single candidate as soon as it has been streamed.
+        Returns (normalized_type, value, elements) if it has a unique visible match, otherwise None.
+        """
+        if not isinstance(candidate, dict) or not candidate.get('value'):
+            return None
+        cand = {
+            'type': self.mapper.normalize_genai_type(candidate.get('type', 'xpath')),
+            'value': candidate.get('value')
+        }
+        rf_locator = self.mapper.json_to_robot_framework(cand['type'], cand['value'])
+        self.metrics.incr('candidates_tried')
+        try:
+            with self.metrics.span('validation'):
+                res = self.mapper.evaluate_candidates(driver, [cand])[0]
+        except Exception as e:
+            logger.debug(f"GenAIRescuer: Streamed candidate {rf_locator} could not be evaluated: {e}")
+            return None
+
+        logger.debug(f"GenAIRescuer: Streamed candidate {rf_locator} -> matches: {res.get('count')}, visible: {res.get('visibleCount')}"
+                     + (f", error: {res.get('error')}" if res.get('error') else ""))
+        if res.get('unique') and res.get('allVisible'):
+            logger.info(f"GenAIRescuer: Streamed candidate {rf_locator} is a unique visible match. Cancelling the rest of the LLM response.")
+            return cand['type'], cand['value'], res['elements']
+        return None
+
+    def _wait_for_candidates(self, driver, candidates):
+        """
+        Tries candidates one at a time with a short visibility wait each.
+        Returns (normalized_type, value, elements) for the first one that becomes visible, or None.
+        """
         for cand in candidates:
             new_loc_type = cand.get('type', 'xpath')
             new_loc_val = cand.get('value')
@@ -215,61 +1027,268 @@ class GenAIRescuer:
                 # For healing candidates, we use a smaller wait per candidate to avoid hanging too long
                 # but long enough to see if it's there. Let's use 5s or a fraction of max_wait.
                 heal_wait = min(5, 10)
-                found_els = self.mapper.wait_for_all_visible(driver, normalized_type, new_loc_val, timeout=heal_wait)
-                if not found_els:
-                    continue
+                with self.metrics.span('validation_wait'):
+                    found_els = self.mapper.wait_for_all_visible(driver, normalized_type, new_loc_val, timeout=heal_wait)
+                if found_els:
+                    return normalized_type, new_loc_val, found_els
+            except Exception as e:
+                logger.debug(f"GenAIRescuer: Error finding/waiting for elements for locator {rf_locator}: {e}")
+        return None
 
-                # Scroll into view
-                self.mapper.scroll_into_view(driver, found_els[0])
+    def _accept_healed_locators(self, driver, page_name, element_name, healed, source='GenAI', heal_start=None):
+        """
+        Records validated healed locators of one page.
+        The element being looked up (element_name, may be None) is scrolled to and gets a fresh snapshot;
+        all JSON updates are applied in a single write.
 
-                # Log success
-                self._log_healing(page_name, element_name, l_type, l_value, normalized_type, new_loc_val)
+        Args:
+            healed (dict): {name: (orig_type, orig_value, new_type, new_value, elements)}
+            source (str): Healing tier that produced the locators (Local, Shared, LLMCache, GenAI, GenAIBatch)
+            heal_start (float): time.perf_counter() when healing started, for latency reporting
+        """
+        latency_ms = round((time.perf_counter() - heal_start) * 1000, 1) if heal_start is not None else None
+        tier = 1 if source == 'Local' else 2
+        stats = self.heal_stats.setdefault(source, {'heals': 0, 'total_ms': 0.0})
+        stats['heals'] += 1
+        stats['total_ms'] += latency_ms or 0
+        self.metrics.incr('heals', len(healed), source=source)
+        self.metrics.incr('candidates_accepted', len(healed))
+        logger.info(f"GenAIRescuer: Healed {', '.join(healed)} on {page_name} via tier {tier} ({source})"
+                    + (f" in {latency_ms} ms." if latency_ms is not None else "."))
 
-                # --- NEW: Save snapshot for Differential Healing ---
-                self._save_dom_snapshot(page_name, element_name, found_els[0])
-                
-                # AGENTIC UPDATE
-                auto_update = BuiltIn().get_variable_value('${AUTO_UPDATE_LOCATORS}')
-                if auto_update == 'True' or auto_update is True:
-                    logger.info(f"GenAIRescuer: Agentic Update - Modifying {page_name}.json file...")   
-                    if update_json_locator(page_name, element_name, normalized_type, new_loc_val):
-                        logger.info(f"GenAIRescuer: Successfully updated Page Object '{page_name}.{element_name}' with new locator.")
-                    else:
-                        logger.error(f"GenAIRescuer: Failed to perform Agentic Update for '{page_name}.{element_name}'.")
+        if element_name in healed:
+            found_els = healed[element_name][4]
+            # Scroll into view
+            self.mapper.scroll_into_view(driver, found_els[0])
 
-                return found_els
+        # Log success
+        for name, (l_type, l_value, normalized_type, new_loc_val, _) in healed.items():
+            self._log_healing(page_name, name, l_type, l_value, normalized_type, new_loc_val, source=source, latency_ms=latency_ms)
 
-            except Exception as e:
-                logger.debug(f"GenAIRescuer: Error finding/waiting for elements for locator {rf_locator}: {e}")
+        # --- NEW: Save snapshot for Differential Healing ---
+        if element_name in healed:
+            self._save_dom_snapshot(page_name, element_name, found_els[0], match_count=len(found_els))
+        
+        # AGENTIC UPDATE
+        updated = []
+        auto_update = self._get_setting('AUTO_UPDATE_LOCATORS')
+        if auto_update == 'True' or auto_update is True:
+            logger.info(f"GenAIRescuer: Agentic Update - Modifying {page_name}.json file...")   
+            updated = update_json_locators(page_name, {name: (h[2], h[3]) for name, h in healed.items()})
+            if updated:
+                self.locators.invalidate(page_name)
+                logger.info(f"GenAIRescuer: Successfully updated Page Object '{page_name}' ({', '.join(updated)}) with new locators.")
+            if len(updated) < len(healed):
+                logger.error(f"GenAIRescuer: Failed to perform Agentic Update for '{page_name}' ({', '.join(n for n in healed if n not in updated)}).")
+
+        # Without a JSON update the original locator stays broken: remember the healed one for later lookups
+        for name, (l_type, l_value, normalized_type, new_loc_val, _) in healed.items():
+            if name not in updated:
+                self._get_healed_cache().put(page_name, name, l_type, l_value, normalized_type, new_loc_val)
+
+    def _check_page_locators(self, driver, page_name, exclude=None):
+        """
+        Resolves every entry of a page object in a single execute_script call.
+        Elements healed earlier in the run are checked with their healed locator.
+
+        Returns:
+            list[dict]: One row per element:
+                {'name', 'locator', 'healed', 'count', 'visible', 'status', 'error', 'entry'}
+                with status 'ok', 'hidden' (matches, not all visible), 'broken' (no match),
+                'error' (invalid locator) or 'unsupported' (e.g. relative locators)
+        """
+        entries = self.locators.get_page(page_name)
+        if entries is None:
+            raise Exception(f"Locator file '{page_name}.json' not found or unreadable.")
+        healed_cache = self._get_healed_cache()
+
+        rows, checks = [], []
+        for name, entry in entries.items():
+            if name == exclude:
                 continue
+            override = healed_cache.get(page_name, name, entry['type'], entry.get('value'))
+            locator = self.locators.compile_entry(override) if override else entry
+            row = {
+                'name': name,
+                'locator': locator['rf_locator'],
+                'healed': bool(override),
+                'count': None,
+                'visible': None,
+                'status': 'unsupported',
+                'error': None,
+                'entry': entry
+            }
+            rows.append(row)
+            if locator['selenium_by']:
+                checks.append((row, {'type': locator['type'], 'value': locator['value']}))
+
+        if checks:
+            results = self.mapper.evaluate_candidates(driver, [check[1] for check in checks])
+            for (row, _), res in zip(checks, results):
+                res = res or {}
+                row['count'] = res.get('count', 0)
+                row['visible'] = res.get('visibleCount', 0)
+                row['error'] = res.get('error')
+                if row['error']:
+                    row['status'] = 'error'
+                elif row['count'] == 0:
+                    row['status'] = 'broken'
+                else:
+                    row['status'] = 'ok' if res.get('allVisible') else 'hidden'
+        return rows
 
-        # 5. Fail if all fail
-        raise Exception(f"GenAIRescuer: Healing failed. Tried {len(candidates)} Locators but none matched or became visible on the live page. Need Human Intervention.❤️")
+    def _find_broken_page_elements(self, driver, page_name, element_name):
+        """
+        Checks every other entry of the page object in one browser call.
+        Returns [(name, compiled_entry)] for entries that match nothing, starting with element_name.
+        """
+        broken = [(element_name, self.locators.get(page_name, element_name))]
+        try:
+            rows = self._check_page_locators(driver, page_name, exclude=element_name)
+        except Exception as e:
+            logger.debug(f"GenAIRescuer: Page-level locator check failed: {e}")
+            return broken
+        broken += [(row['name'], row['entry']) for row in rows if row['status'] == 'broken']
 
+        max_elements = int(self._get_setting('BATCH_HEALING_MAX_ELEMENTS', 10))
+        return broken[:max(1, max_elements)]
 
-    def _get_minified_dom(self, page_source):
+    def _batch_heal(self, driver, page_name, element_name, html_content, dom_format):
         """
-        Parses HTML, removes scripts/styles/comments to reduce context size.
+        Heals all broken elements of a page with a single LLM request and validates the
+        answers together in one browser call.
+        Returns {name: (orig_type, orig_value, new_type, new_value, elements)} for every element healed.
         """
-        soup = BeautifulSoup(page_source, 'html.parser')
-        
-        # Compare old vs new: Remove heavy tags
-        for tag in soup(["script", "style", "noscript", "svg", "meta", "link"]):
-            tag.decompose()
-            
-        # Get body (or relevant container)
-        body = soup.body
-        if body:
-            return str(body)
-        return str(soup)
+        broken = self._find_broken_page_elements(driver, page_name, element_name)
+        if len(broken) < 2:
+            logger.info(f"GenAIRescuer: Only '{element_name}' is broken on {page_name}. Healing it alone...")
+            return {}
+
+        healed = self._heal_page_elements(driver, page_name, broken, html_content, dom_format)
+        if element_name not in healed and self._last_llm_cache_key:
+            # Do not serve this answer again; the single-element path asks the LLM afresh
+            self.llm_cache.invalidate(self._last_llm_cache_key)
+        return healed
+
+    def _heal_page_elements(self, driver, page_name, broken, html_content, dom_format):
+        """
+        Sends the broken elements of a page in one structured prompt and validates all
+        returned candidates in one browser call. Targets are healed in order and a candidate
+        matching an element already healed for an earlier target is rejected.
+
+        Args:
+            broken (list): [(element_name, compiled_entry)]
 
-    def _query_llm(self, old_locator, dom_snippet, last_known_good=None, last_known_image=None, current_image=None):
+        Returns:
+            dict: {name: (orig_type, orig_value, new_type, new_value, elements)} for every element healed
+        """
+        targets = [{
+            'element_name': name,
+            'old_locator': entry['rf_locator'],
+            'last_known_good': self._load_dom_snapshot(page_name, name)
+        } for name, entry in broken]
+        logger.info(f"GenAIRescuer: Batch healing {len(targets)} broken elements on {page_name}: {', '.join(t['element_name'] for t in targets)}")
+
+        answer = self._query_llm_batch(targets, html_content, dom_format)
+        if not isinstance(answer, dict):
+            logger.info("GenAIRescuer: Batch healing returned no usable answer.")
+            return {}
+
+        # Validate all candidates of all elements in one round trip
+        flat, owners = [], []
+        for target in targets:
+            candidates = answer.get(target['element_name']) or []
+            for cand in self._prepare_candidates(candidates):
+                if not isinstance(cand, dict) or not cand.get('value'):
+                    continue
+                flat.append({'type': self.mapper.normalize_genai_type(cand.get('type', 'xpath')), 'value': cand.get('value')})
+                owners.append(target['element_name'])
+        self.metrics.incr('candidates_tried', len(flat))
+        try:
+            with self.metrics.span('validation', page=page_name):
+                results = self.mapper.evaluate_candidates(driver, flat)
+        except Exception as e:
+            logger.warning(f"GenAIRescuer: Batch candidate validation failed: {e}")
+            return {}
+
+        # An element claimed by one target cannot heal another, whatever the LLM answered
+        entries = dict(broken)
+        healed = {}
+        claimed = set()
+        for target in targets:
+            name = target['element_name']
+            indexes = []
+            for i, owner in enumerate(owners):
+                if owner != name:
+                    continue
+                if claimed.intersection(el.id for el in results[i].get('elements') or []):
+                    logger.info(f"GenAIRescuer: Rejected candidate {self.mapper.json_to_robot_framework(flat[i]['type'], flat[i]['value'])} "
+                                f"for {name}: it matches an element already healed in this batch.")
+                    continue
+                indexes.append(i)
+            best = self.mapper.select_best_candidate([flat[i] for i in indexes], [results[i] for i in indexes])
+            if best:
+                cand, res = best
+                claimed.update(el.id for el in res['elements'])
+                healed[name] = (entries[name]['type'], entries[name].get('value'), cand['type'], cand['value'], res['elements'])
+
+        logger.info(f"GenAIRescuer: Batch healing validated {len(healed)}/{len(targets)} elements on {page_name}.")
+        return healed
+
+    def _capture_dom(self, driver):
+        """
+        Captures the minified current DOM using ${DOM_CAPTURE_MODE}:
+        'browser' (pruned in the browser, default), 'json' (compact JSON tree) or 'page_source' (legacy).
+        Returns (content, dom_format).
+        """
+        mode = self._get_setting('DOM_CAPTURE_MODE', 'browser')
+        with self.metrics.span('dom_capture'):
+            return DomSerializer(mode=mode).capture(driver)
+
+    @staticmethod
+    def _dom_description(dom_format, excerpt):
+        """
+        Prompt line introducing the DOM context: HTML, a JSON tree, or relevance-ranked JSON subtrees.
+        """
+        if dom_format != 'json':
+            return "The current HTML structure (Current Broken DOM) is:\n"
+        tree = "compact JSON tree ({\"t\": tag, \"a\": attributes, \"c\": children})"
+        if excerpt:
+            return (f"The current DOM (Current Broken DOM) is too large to send whole. It is given as its most relevant subtrees, "
+                    f"{{\"blocks\": [{{\"path\": ancestor path, \"node\": subtree}}]}}, each subtree a {tree}:\n")
+        return f"The current DOM (Current Broken DOM) is given as a {tree}:\n"
+
+    def _query_llm(self, old_locator, dom_snippet, last_known_good=None, last_known_image=None, current_image=None, element_name=None, dom_format='html', use_cache=True, on_candidate=None):
         """
         Sends the prompt to the LLM (Text + Optional Images).
+        Answers are cached on disk by content hash; a cache hit skips the network call.
+        DOMs larger than ${LLM_DOM_BUDGET} (characters, or 'N tokens') are reduced to their most relevant subtrees.
+        With ${LLM_STREAMING} and an on_candidate callback, each candidate is passed to the callback as it is
+        streamed and the answer is cut short once the callback returns True.
         """
-        if not self.api_key:
+        self._last_llm_cache_key = None
+        llm_cache = self._get_llm_cache()
+        cache_key = None
+        if llm_cache:
+            cache_key = llm_cache.make_key(old_locator, dom_snippet, last_known_good, self._get_llm().model_name, PROMPT_VERSION)
+            if use_cache:
+                cached = llm_cache.get(cache_key)
+                if cached:
+                    self._last_llm_cache_key = cache_key
+                    self.metrics.incr('llm_cache_hits')
+                    logger.info(f"GenAIRescuer: LLM response cache hit ({cache_key[:12]}). Skipping LLM call. Stats: {llm_cache.stats()}")
+                    return cached
+                self.metrics.incr('llm_cache_misses')
+
+        if not self._get_llm().available:
             return None
 
+        budget = self._get_setting('LLM_DOM_BUDGET', 15000)
+        context_builder = DomContextBuilder.from_budget(budget)
+        with self.metrics.span('dom_context', element=element_name):
+            dom_context = context_builder.build(dom_snippet, old_locator, last_known_good, element_name, dom_format=dom_format)
+        dom_description = self._dom_description(dom_format, dom_context is not dom_snippet)
+
         snapshot_context = ""
         if last_known_good:
             snapshot_context = f"\nIn the previous version, the element looked like this:\n```html\n{last_known_good}\n```\nAnalyze the 'Last Known Good' HTML to understand the element's role, behavior, and visual appearance.\n"
@@ -278,7 +1297,7 @@ class GenAIRescuer:
         if last_known_image and current_image:
             image_context = (
                 "\nI have provided two images:\n"
-                "1. **Reference Image**: Shows the valid element from a previous successful run. The target element is **highlighted with a RED or BLACK outline**.\n"
+                "1. **Reference Image**: Shows the valid element from a previous successful run, cropped to the area around it. The target element is **highlighted with a RED or BLACK outline**.\n"
                 "2. **Current Image**: Shows the current page state where the locator failed (no highlight).\n"
                 "Compare these images to understand how the page visual structure has changed.\n"
             )
@@ -291,8 +1310,8 @@ class GenAIRescuer:
             f"Your task is to identify the CORRECT element in the new DOM by cross-referencing structural hierarchy and visual position.\n"
             f"{snapshot_context}"
             f"{image_context}"
-            f"The current HTML structure (Current Broken DOM) is:\n"
-            f"```html\n{dom_snippet[:15000]}\n```\n\n"
+            f"{dom_description}"
+            f"```{dom_format}\n{dom_context}\n```\n\n"
             f"**CRITICAL INSTRUCTIONS FOR LOCATING THE ELEMENT:**\n"
             f"1. **STRICT PARENT CHECK**: The 'Last Known Good' HTML provided (if any) contains the target element AND its direct parents (ancestors). "
             f"Any candidate element you find in the 'Current Broken DOM' MUST be nested inside a similar parent hierarchy. "
@@ -318,46 +1337,183 @@ class GenAIRescuer:
             f"Ensure the JSON is well-formed and contains only the array."
         )
 
-        import re
+        inputs = [prompt]
+        if last_known_image:
+             inputs.append(last_known_image)
+        if current_image:
+             inputs.append(current_image)
+        with self.metrics.span('llm_call', element=element_name):
+            if on_candidate and str(self._get_setting('LLM_STREAMING', 'True')).lower() == 'true':
+                # A cancelled stream caches the candidates received so far, which include the validated one
+                locators_json = self._stream_llm(inputs, on_candidate)
+            else:
+                locators_json = self._call_llm(inputs)
+        if cache_key and locators_json:
+            llm_cache.put(cache_key, locators_json, model_name=self._get_llm().model_name)
+        return locators_json
+
+    def _query_llm_batch(self, targets, dom_snippet, dom_format='html'):
+        """
+        Asks the LLM for candidates for several broken elements of one page in a single prompt.
+        Returns {element_name: [candidates]} or None. Answers are cached like single-element ones.
+        """
+        self._last_llm_cache_key = None
+        llm_cache = self._get_llm_cache()
+        cache_key = None
+        if llm_cache:
+            combined_locator = "\n".join(f"{t['element_name']}={t['old_locator']}" for t in targets)
+            combined_snapshots = "\n".join(t['last_known_good'] or "" for t in targets)
+            cache_key = llm_cache.make_key(combined_locator, dom_snippet, combined_snapshots, self._get_llm().model_name, f"{PROMPT_VERSION}-batch")
+            cached = llm_cache.get(cache_key)
+            if cached:
+                self._last_llm_cache_key = cache_key
+                self.metrics.incr('llm_cache_hits')
+                logger.info(f"GenAIRescuer: LLM response cache hit ({cache_key[:12]}) for batch heal. Skipping LLM call.")
+                return cached
+            self.metrics.incr('llm_cache_misses')
+
+        if not self._get_llm().available:
+            return None
+
+        context_builder = DomContextBuilder.from_budget(self._get_setting('LLM_DOM_BUDGET', 15000))
+        with self.metrics.span('dom_context'):
+            dom_context = context_builder.build_many(dom_snippet, targets, dom_format=dom_format)
+        dom_description = self._dom_description(dom_format, dom_context is not dom_snippet)
+
+        element_context = ""
+        for target in targets:
+            element_context += f"\n### {target['element_name']}\nFailed locator: '{target['old_locator']}'\n"
+            if target['last_known_good']:
+                element_context += f"Last Known Good HTML (element and its parents):\n```html\n{target['last_known_good']}\n```\n"
+
+        prompt = (
+            f"You are an expert Selenium automation engineer. A frontend release broke several locators of the same page at once.\n"
+            f"For EACH element below, identify the CORRECT element in the new DOM by cross-referencing its structural hierarchy.\n"
+            f"{element_context}\n"
+            f"{dom_description}"
+            f"```{dom_format}\n{dom_context}\n```\n\n"
+            f"**CRITICAL INSTRUCTIONS:**\n"
+            f"1. **STRICT PARENT CHECK**: A candidate MUST be nested inside a parent hierarchy similar to the element's 'Last Known Good' HTML. "
+            f"Do NOT select an element with the same attributes in a different container.\n"
+            f"2. Each element is a different target; never return the same locator for two elements.\n"
+            f"3. If an element is not present in the current DOM, return an empty array for it.\n\n"
+            f"For each element, list alternative Selenium locators prioritized from fastest to slowest, using the types "
+            f"'id', 'link_text', 'partial_link_text', 'class_name', 'tag_name', 'css_selector', 'xpath', 'name'.\n"
+            f"Return a single JSON object mapping each element name to its array of locators. "
+            f"Example: {{\"submit_btn\": [{{\"type\": \"id\", \"value\": \"submit\"}}], \"email_input\": [{{\"type\": \"css_selector\", \"value\": \"input[type=email]\"}}]}}. "
+            f"Ensure the JSON is well-formed and contains only the object."
+        )
+
+        with self.metrics.span('llm_call'):
+            answer = self._call_llm([prompt])
+        if not isinstance(answer, dict):
+            return None
+        if cache_key:
+            llm_cache.put(cache_key, answer, model_name=self._get_llm().model_name)
+        return answer
+
+    def _call_llm(self, inputs):
+        """
+        Sends the prompt (and optional images) to the model and parses the JSON in its answer.
+        Returns the parsed JSON, or None on failure.
+        """
+        llm = self._get_llm()
         try:
-            inputs = [prompt]
-            if last_known_image:
-                 inputs.append(last_known_image)
-            if current_image:
-                 inputs.append(current_image)
-            logger.info(f"Calling gemini now....")    
-            response = self.model.generate_content(inputs)
+            logger.info(f"Calling {llm.backend.name} ({llm.model_name}) now....")    
+            response = llm.generate(inputs)
             response_text = response.text.strip()
-            logger.info(f"Gemini response: {response_text}")
+            self.metrics.incr('llm_calls')
+            self.metrics.incr('llm_prompt_tokens', response.prompt_tokens or 0)
+            self.metrics.incr('llm_output_tokens', response.output_tokens or 0)
+            logger.info(f"LLM response ({response.prompt_tokens} prompt / {response.output_tokens} output tokens): {response_text}")
+        except CircuitOpenError as e:
+            logger.warning(f"GenAIRescuer: {e} Skipping the LLM until the backend recovers.")
+            return None
+        except Exception as e:
+            logger.error(f"LLM Query Failed: {e}")
+            return None
+        return self._parse_llm_json(response_text)
+
+    def _stream_llm(self, inputs, on_candidate):
+        """
+        Streams the answer and passes every complete item of its JSON array to on_candidate as soon as it
+        arrives. Stops reading, which cancels the request, once on_candidate returns True.
+        Returns the candidates received (or the parsed answer if it was not an array), or None on failure.
+        """
+        llm = self._get_llm()
+        parser = JsonArrayStream()
+        stream = None
+        stopped = False
+        first_ms = None
+        start = time.perf_counter()
+        try:
+            logger.info(f"Streaming from {llm.backend.name} ({llm.model_name}) now....")
+            stream = llm.stream(inputs)
+            self.metrics.incr('llm_calls')
+            for chunk in stream:
+                self.metrics.incr('llm_prompt_tokens', chunk.prompt_tokens or 0)
+                self.metrics.incr('llm_output_tokens', chunk.output_tokens or 0)
+                for candidate in parser.feed(chunk.text):
+                    if first_ms is None:
+                        first_ms = round((time.perf_counter() - start) * 1000, 1)
+                    if on_candidate(candidate):
+                        stopped = True
+                        break
+                if stopped:
+                    break
+        except CircuitOpenError as e:
+            logger.warning(f"GenAIRescuer: {e} Skipping the LLM until the backend recovers.")
+            return None
+        except Exception as e:
+            logger.error(f"LLM Query Failed: {e}")
+            if not parser.items:
+                return None
+        finally:
+            if stream is not None:
+                stream.close()
+
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+        if stopped:
+            self.metrics.incr('llm_streams_cancelled')
+        logger.info(f"LLM stream {'cancelled' if stopped else 'finished'} after {elapsed_ms} ms with {len(parser.items)} candidate(s)"
+                    + (f", first after {first_ms} ms" if first_ms is not None else "") + f": {parser.text.strip()}")
+        if parser.items:
+            return parser.items
+        return self._parse_llm_json(parser.text)
 
-            # Attempt to extract JSON array content
+    def _parse_llm_json(self, response_text):
+        """
+        Extracts the JSON from an LLM answer (array, or object for batch answers). Returns None if it is not valid JSON.
+        """
+        import re
+        response_text = (response_text or "").strip()
+        json_string = None
+        try:
+            # Attempt to extract JSON content (array, or object for batch answers)
             match = re.search(r'```json\s*([\s\S]*?)\s*```', response_text)
             if match:
                 json_string = match.group(1).strip()
             else:
-                start_index = response_text.find('[')
-                end_index = response_text.rfind(']')
+                # Whichever bracket opens first decides between array and object
+                starts = [i for i in (response_text.find('['), response_text.find('{')) if i != -1]
+                start_index = min(starts) if starts else -1
+                end_index = response_text.rfind(']' if start_index != -1 and response_text[start_index] == '[' else '}')
                 if start_index != -1 and end_index != -1 and end_index > start_index:
                     json_string = response_text[start_index : end_index + 1].strip()
                 else:
                     json_string = response_text
 
-            locators_json = json.loads(json_string)
-            return locators_json
+            return json.loads(json_string)
         except json.JSONDecodeError as e:
             logger.error(f"LLM response was not valid JSON. Attempted to parse: '{json_string}'. Full response: '{response_text}'. Error: {e}")
             return None
-        except Exception as e:
-            logger.error(f"LLM Query Failed: {e}")
-            return None
 
-    def _log_healing(self, page, name, old_type, old_value, new_type, new_value):
+    def _log_healing(self, page, name, old_type, old_value, new_type, new_value, source='GenAI', latency_ms=None):
         """
-        Logs the healing event to a JSON file for the Level 4 Feedback Loop.
+        Logs the healing event for the Level 4 Feedback Loop.
+        Events are appended to a JSONL file under a cross-process lock (see HealingLog);
+        consumers read the latest entry per element.
         """
-        log_file = "healing_log.json"
-        timestamp = datetime.now().isoformat()
-        
         entry = {
             "page": page,
             "name": name,
@@ -369,101 +1525,134 @@ class GenAIRescuer:
                 "type": new_type,
                 "value": new_value
             },
-            "source": "GenAI", 
-            "timestamp": timestamp
+            "source": source,
+            "tier": 1 if source == 'Local' else 2,
+            "latency_ms": latency_ms,
+            "timestamp": datetime.now().isoformat()
         }
+        HealingLog.append_event(entry)
+
+    # JavaScript to create a 'Vertical Slice' of the DOM (Target + 3 Parents) and measure the target.
+    # The slice isolates the structural path without including thousands of sibling nodes.
+    SNAPSHOT_CAPTURE_JS = LocatorMapper.STRUCTURAL_FINGERPRINT_JS + """
+        var el = arguments[0];
+        var depth = 3;
+        var current = el.cloneNode(true); // Deep clone the target to keep its inner text/structure
         
-        data = []
-        if os.path.exists(log_file):
-            try:
-                with open(log_file, 'r') as f:
-                    data = json.load(f)
-            except:
-                pass
-        
-        # Filter out any existing entry for this specific element (Upsert strategy)
-        data = [item for item in data if not (item.get('page') == page and item.get('name') == name)]
-        
-        data.append(entry)
-        
-        with open(log_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        var ptr = el.parentElement;
+        for (var i = 0; i < depth && ptr; i++) {
+            var wrapper = ptr.cloneNode(false); // Shallow clone parent (attributes only, no siblings)
+            wrapper.appendChild(current);
+            current = wrapper;
+            ptr = ptr.parentElement;
+        }
+        var rect = el.getBoundingClientRect();
+        return {
+            html: current.outerHTML,
+            rect: { x: Math.round(rect.left), y: Math.round(rect.top), width: Math.round(rect.width), height: Math.round(rect.height) },
+            dpr: window.devicePixelRatio || 1,
+            fingerprint: structuralFingerprint(el)
+        };
+    """
 
-    def _save_dom_snapshot(self, page_name, element_name, element):
+    def _save_dom_snapshot(self, page_name, element_name, element, match_count=1):
         """
-        Saves a minified DOM snippet including 3 levels of ancestry context 
-        to locators/snapshots/{page_name}/{element_name}.html
+        Saves a minified DOM snippet including 3 levels of ancestry context, plus a highlighted
+        screenshot, to the snapshot store (locators/dom_snapshots/{page_name}/ or the page's pack).
+        The number of elements the locator matched is stored with it (tier-1 healing only handles single matches).
+        Only the raw capture happens here; minification, highlighting and file writes run on
+        the background snapshot writer unless ${ASYNC_SNAPSHOTS} is disabled.
         """
         try:
-            # JavaScript to create a 'Vertical Slice' of the DOM (Target + 3 Parents)
-            # This isolates the structural path without including thousands of sibling nodes.
-            js_script = """
-                var el = arguments[0];
-                var depth = 3;
-                var current = el.cloneNode(true); // Deep clone the target to keep its inner text/structure
-                
-                var ptr = el.parentElement;
-                for (var i = 0; i < depth && ptr; i++) {
-                    var wrapper = ptr.cloneNode(false); // Shallow clone parent (attributes only, no siblings)
-                    wrapper.appendChild(current);
-                    current = wrapper;
-                    ptr = ptr.parentElement;
-                }
-                return current.outerHTML;
-            """
-            
-            # reliable way to get driver from the element itself
-            driver = element.parent 
-            context_html = driver.execute_script(js_script, element)
-            
-            minified_html = self._minify_html_snippet(context_html)
-            
-            snapshot_dir = os.path.join("locators", "dom_snapshots", page_name)
-            os.makedirs(snapshot_dir, exist_ok=True)
-            
-            file_path = os.path.join(snapshot_dir, f"{element_name}.html")
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(minified_html)
-            
-            # --- Visual Snapshot with Highlight ---
-            try:
-                # 1. Highlight Element
-                original_border = driver.execute_script("return arguments[0].style.border", element)
-                driver.execute_script("arguments[0].style.border='5px solid red'", element)
-                
-                # 2. Capture Screenshot
-                screenshot_path = os.path.join(snapshot_dir, f"{element_name}_success.png")
-                driver.save_screenshot(screenshot_path)
-                
-                # 3. Remove Highlight
-                driver.execute_script(f"arguments[0].style.border='{original_border}'", element)
-                
-                logger.debug(f"GenAIRescuer: Saved highlighted success screenshot to {screenshot_path}")
-            except Exception as viz_err:
-                 logger.warning(f"GenAIRescuer: Failed to save visual snapshot: {viz_err}")
+            with self.metrics.span('snapshot_save', page=page_name, element=element_name):
+                # reliable way to get driver from the element itself
+                driver = element.parent 
+                capture = driver.execute_script(self.SNAPSHOT_CAPTURE_JS, element)
+
+                # Viewport screenshot without touching the element's style; the highlight is drawn later
+                png_data = None
+                try:
+                    png_data = driver.get_screenshot_as_png()
+                except Exception as viz_err:
+                     logger.warning(f"GenAIRescuer: Failed to capture visual snapshot: {viz_err}")
 
-            logger.debug(f"GenAIRescuer: Saved DOM snapshot (w/ 3 parents) and metadata for {page_name}.{element_name}")
+            job = {
+                'page_name': page_name,
+                'element_name': element_name,
+                'html': capture['html'],
+                'rect': capture['rect'],
+                'dpr': capture.get('dpr', 1),
+                'fingerprint': capture.get('fingerprint'),
+                'match_count': match_count,
+                'png': png_data,
+                'store': self._get_snapshot_store(),
+                # Settings are resolved here: the writer thread must not call into Robot Framework
+                'image_format': self._get_setting('SNAPSHOT_IMAGE_FORMAT', 'webp'),
+                'image_quality': self._get_setting('SNAPSHOT_IMAGE_QUALITY', 80),
+                'crop_margin': self._get_setting('SNAPSHOT_CROP_MARGIN', 200),
+                'thumbnail_size': self._get_setting('SNAPSHOT_THUMBNAIL_SIZE', 160)
+            }
+
+            writer = self._get_snapshot_writer()
+            if writer:
+                writer.submit((page_name, element_name), job)
+            else:
+                self._write_snapshot(job)
         except Exception as e:
             logger.warning(f"GenAIRescuer: Failed to save DOM snapshot for {page_name}.{element_name}: {e}")
 
+    def _write_snapshot(self, job):
+        """
+        Minifies and writes a captured snapshot: HTML slice, highlighted screenshot and element rect.
+        Runs on the snapshot writer thread, so it must not touch the WebDriver.
+        """
+        page_name = job['page_name']
+        element_name = job['element_name']
+
+        with self.metrics.span('snapshot_write', page=page_name, element=element_name):
+            minified_html = self._minify_html_snippet(job['html'])
+            meta = dict(job['rect'])
+            if job.get('fingerprint'):
+                meta['fingerprint'] = job['fingerprint']
+            meta['matches'] = job.get('match_count', 1)
+            image = thumbnail = image_ext = None
+
+            # --- Visual Snapshot with Highlight (cropped around the element, plus a thumbnail) ---
+            if job.get('png'):
+                try:
+                    from PIL import Image, ImageDraw
+                    image = Image.open(io.BytesIO(job['png'])).convert("RGB")
+                    rect, dpr = job['rect'], job.get('dpr', 1)
+                    box = [rect['x'] * dpr, rect['y'] * dpr, (rect['x'] + rect['width']) * dpr, (rect['y'] + rect['height']) * dpr]
+                    ImageDraw.Draw(image).rectangle(box, outline=(255, 0, 0), width=max(1, int(5 * dpr)))
+
+                    image, thumbnail, image_ext, crop_box = SnapshotImages.encode_success_images(
+                        image, box,
+                        image_format=job.get('image_format', 'webp'),
+                        quality=job.get('image_quality', 80),
+                        margin=float(job.get('crop_margin', 200)) * dpr,
+                        thumbnail_size=job.get('thumbnail_size', 160)
+                    )
+                    meta['crop'] = list(crop_box)
+                except Exception as viz_err:
+                     image = thumbnail = image_ext = None
+                     logger.warning(f"GenAIRescuer: Failed to save visual snapshot: {viz_err}")
+
+            store = job.get('store') or self.snapshot_store
+            store.save(page_name, element_name, minified_html, meta, image, thumbnail, image_ext)
+
+            logger.debug(f"GenAIRescuer: Saved DOM snapshot (w/ 3 parents), screenshot and metadata for {page_name}.{element_name} ({store.kind} store)")
+
     def _load_dom_snapshot(self, page_name, element_name):
         """
         Loads the minified DOM snapshot for an element if it exists.
         Returns: html_content
         """
-        dir_path = os.path.join("locators", "dom_snapshots", page_name)
-        html_path = os.path.join(dir_path, f"{element_name}.html")
-        
-        html_content = None
-
-        if os.path.exists(html_path):
-            try:
-                with open(html_path, "r", encoding="utf-8") as f:
-                    html_content = f.read()
-            except Exception as e:
-                logger.warning(f"GenAIRescuer: Failed to load DOM snapshot for {page_name}.{element_name}: {e}")
-        
-        return html_content
+        try:
+            return self._get_snapshot_store().load_html(page_name, element_name)
+        except Exception as e:
+            logger.warning(f"GenAIRescuer: Failed to load DOM snapshot for {page_name}.{element_name}: {e}")
+            return None
 
     def _minify_html_snippet(self, html):
         """
@@ -471,6 +1660,7 @@ class GenAIRescuer:
         """
         if not html:
             return ""
+        from bs4 import BeautifulSoup, Comment
         soup = BeautifulSoup(html, 'html.parser')
         # Remove comments
         for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
@@ -483,10 +1673,48 @@ class GenAIRescuer:
 
     def _snapshot_exists(self, page_name, element_name):
         """
-        Checks if a DOM snapshot already exists for the given element.
+        Checks if a DOM snapshot already exists (or is being written) for the given element.
+        Answered from the store's in-memory manifest, without touching the disk.
+        """
+        if self.snapshot_writer and self.snapshot_writer.is_pending((page_name, element_name)):
+            return True
+        return self._get_snapshot_store().exists(page_name, element_name)
+
+    def _snapshot_refresh_enabled(self):
+        """
+        Whether successful finds compare structural fingerprints to refresh drifted snapshots
+        (${SNAPSHOT_REFRESH} 'fingerprint'), rather than only writing missing ones ('missing').
         """
-        dir_path = os.path.join("locators", "dom_snapshots", page_name)
-        # We check for the HTML file as the primary indicator
-        html_path = os.path.join(dir_path, f"{element_name}.html")
-        return os.path.exists(html_path)
+        return str(self._get_setting('SNAPSHOT_REFRESH', 'fingerprint')).lower() == 'fingerprint'
+
+    def _snapshot_needs_refresh(self, page_name, element_name, fingerprint=None):
+        """
+        Whether a successful find should (re)write the element's snapshot: it has none, or the
+        structural fingerprint of the element and its 3 parents differs from the one stored with it.
+        Snapshots written before fingerprints were recorded adopt the current fingerprint without being rewritten
+        (in their metadata if they have any, otherwise in memory only).
+        """
+        key = (page_name, element_name)
+        if not self._snapshot_exists(page_name, element_name):
+            return True
+        if not fingerprint or key in self.refreshed_snapshots:
+            return False
+        # A snapshot being written already carries the current fingerprint
+        if self.snapshot_writer and self.snapshot_writer.is_pending(key):
+            return False
+        store = self._get_snapshot_store()
+        stored = store.fingerprint(page_name, element_name)
+        if stored == fingerprint:
+            return False
+        if stored is None:
+            try:
+                store.record_fingerprint(page_name, element_name, fingerprint)
+                logger.debug(f"GenAIRescuer: Recorded the structural fingerprint of the existing snapshot of {page_name}.{element_name}.")
+            except Exception as e:
+                logger.warning(f"GenAIRescuer: Failed to record the fingerprint of {page_name}.{element_name}: {e}")
+            return False
 
+        logger.info(f"GenAIRescuer: Structure of {page_name}.{element_name} changed since its last snapshot. Refreshing it.")
+        self.refreshed_snapshots.add(key)
+        self.metrics.incr('snapshot_refreshes')
+        return True
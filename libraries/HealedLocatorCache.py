@@ -0,0 +1,172 @@
+"""
+HealedLocatorCache - Run-Scoped Healed Locator Overrides
+
+When a locator is healed but the Page Object JSON is not rewritten (AUTO_UPDATE_LOCATORS off),
+every later lookup of the same element would otherwise wait out the broken original locator and
+call the LLM again. This cache remembers the healed locator keyed by
+(page, element, original type, original value), so later lookups can try it first.
+
+Persistence modes:
+- 'memory': overrides live for the lifetime of the library instance (one Robot run)
+- 'file':   overrides are also written to a JSON sidecar so a later run can reuse them. The sidecar
+            is re-read and merged under a FileLock and replaced atomically, so parallel workers
+            (pabot) keep each other's overrides.
+- 'off':    caching disabled
+"""
+
+import os
+import json
+import logging
+from datetime import datetime
+
+try:
+    from libraries.FileLock import FileLock, write_json_atomic
+except ImportError:
+    from FileLock import FileLock, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_FILE = os.path.join(".healing_cache", "healed_locators.json")
+
+
+class HealedLocatorCache:
+    """
+    Maps an original (possibly broken) locator to the locator that healed it.
+    """
+
+    MODES = ('off', 'memory', 'file')
+
+    def __init__(self, persistence='memory', file_path=DEFAULT_CACHE_FILE):
+        persistence = str(persistence).lower()
+        if persistence not in self.MODES:
+            logger.warning(f"Unknown healed locator cache mode '{persistence}'. Using 'memory'.")
+            persistence = 'memory'
+
+        self.persistence = persistence
+        self.file_path = file_path
+        self._entries = {}
+
+        if self.persistence == 'file':
+            self._load()
+
+    @property
+    def enabled(self):
+        return self.persistence != 'off'
+
+    @staticmethod
+    def _key(page_name, element_name, orig_type, orig_value):
+        return (page_name, element_name, orig_type, orig_value)
+
+    def get(self, page_name, element_name, orig_type, orig_value):
+        """
+        Returns the healed locator {'type': ..., 'value': ...} for the original locator, or None.
+        """
+        if not self.enabled:
+            return None
+        entry = self._entries.get(self._key(page_name, element_name, orig_type, orig_value))
+        if entry is None:
+            return None
+        return {'type': entry['type'], 'value': entry['value']}
+
+    def put(self, page_name, element_name, orig_type, orig_value, new_type, new_value):
+        """
+        Records a healed locator for the original locator.
+        """
+        if not self.enabled:
+            return
+        key = self._key(page_name, element_name, orig_type, orig_value)
+        self._entries[key] = {
+            'type': new_type,
+            'value': new_value,
+            'timestamp': datetime.now().isoformat()
+        }
+        logger.debug(f"HealedLocatorCache: Stored override for {page_name}.{element_name} -> {new_type}: {new_value}")
+        self._save({key: self._entries[key]})
+
+    def evict(self, page_name, element_name, orig_type, orig_value):
+        """
+        Removes the override for the original locator (e.g. when the healed locator stopped matching).
+
+        Returns:
+            bool: True if an entry was removed.
+        """
+        key = self._key(page_name, element_name, orig_type, orig_value)
+        removed = self._entries.pop(key, None)
+        if removed is None:
+            return False
+        logger.debug(f"HealedLocatorCache: Evicted override for {page_name}.{element_name}")
+        self._save({key: None})
+        return True
+
+    def clear(self):
+        self._entries.clear()
+        self._save(None)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _load(self):
+        try:
+            self._entries.update(self._read_file())
+            if self._entries:
+                logger.info(f"HealedLocatorCache: Loaded {len(self._entries)} healed locator overrides from {self.file_path}")
+        except Exception as e:
+            logger.warning(f"HealedLocatorCache: Failed to load {self.file_path}: {e}")
+
+    def _read_file(self):
+        """
+        Returns the overrides stored in the sidecar, keyed like the in-memory entries.
+        """
+        if not os.path.exists(self.file_path):
+            return {}
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        entries = {}
+        for record in records:
+            key = self._key(record['page'], record['name'], record['old_locator']['type'], record['old_locator']['value'])
+            entries[key] = {
+                'type': record['new_locator']['type'],
+                'value': record['new_locator']['value'],
+                'timestamp': record.get('timestamp')
+            }
+        return entries
+
+    def _save(self, changes):
+        """
+        Applies changes ({key: entry, or None to remove}; None clears everything) to the sidecar.
+        The file is re-read under its lock so overrides written by other workers are kept,
+        and they are merged into this cache as well.
+        """
+        if self.persistence != 'file':
+            return
+
+        try:
+            with FileLock(self.file_path):
+                entries = {}
+                if changes is not None:
+                    try:
+                        entries = self._read_file()
+                    except Exception as e:
+                        logger.warning(f"HealedLocatorCache: Ignoring unreadable {self.file_path}: {e}")
+                    for key, entry in changes.items():
+                        if entry is None:
+                            entries.pop(key, None)
+                        else:
+                            entries[key] = entry
+                self._entries = entries
+                write_json_atomic(self.file_path, self._records())
+        except Exception as e:
+            logger.warning(f"HealedLocatorCache: Failed to write {self.file_path}: {e}")
+
+    def _records(self):
+        # Same record layout as healing_log.json so the sidecar is easy to inspect
+        return [
+            {
+                "page": page_name,
+                "name": element_name,
+                "old_locator": {"type": orig_type, "value": orig_value},
+                "new_locator": {"type": entry['type'], "value": entry['value']},
+                "timestamp": entry.get('timestamp')
+            }
+            for (page_name, element_name, orig_type, orig_value), entry in self._entries.items()
+        ]
@@ -0,0 +1,243 @@
+"""
+HealingCoordinator - Single-Flight Healing Across Parallel Robot Processes
+
+When many pabot workers hit the same broken locator at once, each of them would capture the DOM
+and send its own LLM request. The coordinator is a SQLite-backed lease table shared by all
+processes on the machine (no daemon, works fully offline):
+- the first worker to heal a (page, element, DOM hash) takes a lease and runs the LLM query
+- concurrent workers for the same key wait and receive the validated locator it found
+- if the leader fails, its waiters fail fast instead of repeating the same LLM call
+- the leader renews its lease from a heartbeat thread while it heals, so slow LLM calls, retries
+  and candidate validation never let the lease run out; expired leases (crashed leader) are
+  taken over by the next worker
+
+Rows are kept for `result_ttl` seconds so late arrivals still reuse a fresh result.
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import closing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_FILE = os.path.join(".healing_cache", "coordinator.db")
+
+LEADER = 'leader'
+SHARED = 'shared'
+FAILED = 'failed'
+TIMEOUT = 'timeout'
+
+
+class HealingCoordinator:
+    """
+    Collapses concurrent heals of the same (page, element, DOM hash) into one LLM call.
+
+    Usage:
+        role, payload = coordinator.acquire(page, element, dom_hash, wait_timeout)
+        if role == LEADER:
+            ... heal ...
+            coordinator.release(payload, result)   # result None marks the flight as failed
+        elif role == SHARED:
+            ... validate payload ({'type': ..., 'value': ...}) locally ...
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS heals (
+            key TEXT PRIMARY KEY,
+            page TEXT,
+            element TEXT,
+            dom_hash TEXT,
+            flight_id TEXT,
+            owner TEXT,
+            state TEXT,
+            lease_expires REAL,
+            waiters INTEGER DEFAULT 0,
+            result TEXT,
+            updated REAL
+        )
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_FILE, lease_seconds=120, result_ttl=300, poll_interval=0.2):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        # flight_id -> stop event of the heartbeat renewing its lease
+        self._heartbeats = {}
+        # Per-process counters
+        self.led = 0
+        self.shared = 0
+        self.failed = 0
+        self.timeouts = 0
+
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(self.SCHEMA)
+
+    @staticmethod
+    def dom_hash(dom):
+        """
+        Hashes a (whitespace-normalized) DOM so workers on the same page state share a key.
+        """
+        normalized = " ".join(str(dom or "").split())
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _key(page_name, element_name, dom_hash):
+        return f"{page_name}\x00{element_name}\x00{dom_hash}"
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def acquire(self, page_name, element_name, dom_hash, wait_timeout=60):
+        """
+        Takes the lease for a heal, or waits for the worker that holds it.
+
+        Returns:
+            tuple: (LEADER, flight) - caller must heal and call release(flight, result)
+                   (SHARED, result) - the validated locator found by another worker
+                   (FAILED, None)   - the worker we waited for could not heal
+                   (TIMEOUT, None)  - gave up waiting; caller heals on its own
+        """
+        key = self._key(page_name, element_name, dom_hash)
+        deadline = time.time() + wait_timeout
+        waiting_on = None
+
+        conn = self._connect()
+        try:
+            while True:
+                now = time.time()
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute("SELECT flight_id, state, lease_expires, result, updated FROM heals WHERE key = ?", (key,)).fetchone()
+
+                if row:
+                    flight_id, state, lease_expires, result, updated = row
+                    if state == 'done' and now - updated <= self.result_ttl:
+                        conn.execute("COMMIT")
+                        self._leave(conn, key, waiting_on)
+                        self.shared += 1
+                        logger.info(f"HealingCoordinator: Reusing locator healed by another worker for {page_name}.{element_name}.")
+                        return SHARED, json.loads(result)
+                    if state == 'failed' and flight_id == waiting_on:
+                        conn.execute("COMMIT")
+                        self._leave(conn, key, waiting_on)
+                        self.failed += 1
+                        return FAILED, None
+                    if state == 'inflight' and lease_expires > now:
+                        if waiting_on != flight_id:
+                            conn.execute("UPDATE heals SET waiters = waiters + 1 WHERE key = ?", (key,))
+                            if waiting_on is None:
+                                logger.info(f"HealingCoordinator: {page_name}.{element_name} is being healed by another worker. Waiting...")
+                            waiting_on = flight_id
+                        conn.execute("COMMIT")
+                        if time.time() >= deadline:
+                            self._leave(conn, key, waiting_on)
+                            self.timeouts += 1
+                            return TIMEOUT, None
+                        time.sleep(self.poll_interval)
+                        continue
+
+                # No row, stale result, failed flight we did not wait for, or expired lease: take over
+                flight_id = uuid.uuid4().hex
+                conn.execute(
+                    "INSERT OR REPLACE INTO heals (key, page, element, dom_hash, flight_id, owner, state, lease_expires, waiters, result, updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?, 'inflight', ?, 0, NULL, ?)",
+                    (key, page_name, element_name, dom_hash, flight_id, self.owner, now + self.lease_seconds, now)
+                )
+                conn.execute("COMMIT")
+                self.led += 1
+                flight = {'key': key, 'flight_id': flight_id}
+                self._start_heartbeat(flight)
+                return LEADER, flight
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _leave(conn, key, waiting_on):
+        if waiting_on is not None:
+            conn.execute("UPDATE heals SET waiters = MAX(waiters - 1, 0) WHERE key = ? AND flight_id = ?", (key, waiting_on))
+
+    def renew(self, flight):
+        """
+        Extends the lease of an in-flight heal by lease_seconds. Returns False if the flight no longer holds it.
+        """
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE heals SET lease_expires = ? WHERE key = ? AND flight_id = ? AND state = 'inflight'",
+                (time.time() + self.lease_seconds, flight['key'], flight['flight_id'])
+            )
+            return cursor.rowcount > 0
+
+    def _start_heartbeat(self, flight):
+        """
+        Renews the leader's lease every third of lease_seconds until release(). The thread dies with
+        the process, so a crashed leader's lease still expires.
+        """
+        stop = threading.Event()
+        self._heartbeats[flight['flight_id']] = stop
+
+        def beat():
+            while not stop.wait(self.lease_seconds / 3):
+                try:
+                    if not self.renew(flight):
+                        return
+                except Exception as e:
+                    logger.debug(f"HealingCoordinator: Could not renew the lease of {flight['flight_id']}: {e}")
+
+        threading.Thread(target=beat, name=f"healing-lease-{flight['flight_id'][:8]}", daemon=True).start()
+
+    def release(self, flight, result):
+        """
+        Publishes the leader's outcome: a JSON-serializable result, or None for a failed heal.
+        """
+        stop = self._heartbeats.pop(flight['flight_id'], None)
+        if stop:
+            stop.set()
+        state = 'done' if result is not None else 'failed'
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE heals SET state = ?, result = ?, updated = ? WHERE key = ? AND flight_id = ?",
+                (state, json.dumps(result) if result is not None else None, time.time(), flight['key'], flight['flight_id'])
+            )
+        self._prune()
+
+    def _prune(self):
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM heals WHERE state != 'inflight' AND updated < ?", (time.time() - self.result_ttl,))
+
+    def stats(self):
+        """
+        Returns shared and per-process coordination stats:
+        {'inflight', 'queue_depth', 'done', 'failed', 'led', 'shared', 'shared_failures', 'timeouts'}
+        """
+        now = time.time()
+        with closing(self._connect()) as conn:
+            inflight, queue_depth = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(waiters), 0) FROM heals WHERE state = 'inflight' AND lease_expires > ?", (now,)
+            ).fetchone()
+            done = conn.execute("SELECT COUNT(*) FROM heals WHERE state = 'done'").fetchone()[0]
+            failed = conn.execute("SELECT COUNT(*) FROM heals WHERE state = 'failed'").fetchone()[0]
+        return {
+            'inflight': inflight,
+            'queue_depth': queue_depth,
+            'done': done,
+            'failed': failed,
+            'led': self.led,
+            'shared': self.shared,
+            'shared_failures': self.failed,
+            'timeouts': self.timeouts
+        }
@@ -0,0 +1,110 @@
+"""
+HealingLog - Append-Only Healing Event Log
+
+Every heal is appended as one JSON line to `healing_log.jsonl` under a cross-process lock,
+so concurrent workers never lose entries and logging costs O(1) per event.
+Consumers (LocatorUpdater, CI scripts) read the "latest per element" view, which also
+includes entries from the legacy `healing_log.json` array format.
+"""
+
+import os
+import json
+import logging
+
+try:
+    from libraries.FileLock import FileLock
+except ImportError:
+    from FileLock import FileLock
+
+logger = logging.getLogger(__name__)
+
+HEALING_LOG = "healing_log.jsonl"
+LEGACY_HEALING_LOG = "healing_log.json"
+
+
+def append_event(entry, log_file=HEALING_LOG):
+    """
+    Appends a single healing event as one JSON line.
+    """
+    line = json.dumps(entry, ensure_ascii=False) + "\n"
+    with FileLock(log_file):
+        with open(log_file, 'a', encoding='utf-8') as f:
+            f.write(line)
+            f.flush()
+
+
+def _read_legacy(legacy_file):
+    if not legacy_file or not os.path.exists(legacy_file):
+        return []
+    try:
+        with open(legacy_file, 'r', encoding='utf-8-sig') as f:
+            content = f.read().strip()
+        data = json.loads(content) if content else []
+        return data if isinstance(data, list) else []
+    except Exception as e:
+        logger.warning(f"HealingLog: Could not read legacy log {legacy_file}: {e}")
+        return []
+
+
+def read_events(log_file=HEALING_LOG, legacy_file=LEGACY_HEALING_LOG):
+    """
+    Returns all healing events in write order: legacy JSON array entries first, then JSONL events.
+    Malformed lines (e.g. a partially written last line) are skipped.
+    """
+    events = _read_legacy(legacy_file)
+    if os.path.exists(log_file):
+        with open(log_file, 'r', encoding='utf-8-sig') as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    logger.warning(f"HealingLog: Skipping malformed line {line_no} in {log_file}")
+    return events
+
+
+def latest_per_element(events):
+    """
+    Collapses events to the most recent one per (page, name), keeping first-seen order.
+    """
+    latest = {}
+    for event in events:
+        key = (event.get('page'), event.get('name'))
+        if key in latest:
+            # Re-insert so the element moves to its latest position
+            del latest[key]
+        latest[key] = event
+    return list(latest.values())
+
+
+def read_latest(log_file=HEALING_LOG, legacy_file=LEGACY_HEALING_LOG):
+    """
+    The "latest per element" view consumed by LocatorUpdater and the CI scripts.
+    """
+    return latest_per_element(read_events(log_file, legacy_file))
+
+
+def compact(log_file=HEALING_LOG, legacy_file=LEGACY_HEALING_LOG, fold_legacy=False):
+    """
+    Rewrites the JSONL log so it only holds the latest event per element.
+    With fold_legacy, legacy JSON entries are merged in and the legacy file is removed.
+
+    Returns:
+        tuple: (events before, events after)
+    """
+    with FileLock(log_file):
+        events = read_events(log_file, legacy_file if fold_legacy else None)
+        latest = latest_per_element(events)
+
+        tmp_path = f"{log_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for event in latest:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, log_file)
+
+        if fold_legacy and legacy_file and os.path.exists(legacy_file):
+            os.remove(legacy_file)
+
+    return len(events), len(latest)
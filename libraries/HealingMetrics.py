@@ -0,0 +1,226 @@
+"""
+HealingMetrics - Per-Phase Healing Timings and Counters
+
+Records where healing time goes (original locator wait, DOM capture, DOM context building,
+LLM call, candidate validation, snapshot save, JSON update, ...) as timing spans, plus counters
+for heals, cache hits, LLM tokens and candidates tried versus accepted.
+
+    metrics = get_metrics()
+    with metrics.span('dom_capture', page=page_name, element=element_name):
+        ...
+    metrics.incr('heals', source='GenAI')
+
+One instance is shared by the whole process (the rescuer, LocatorUpdater and the snapshot
+writer thread). At the end of a run it is exported as:
+- JSON: phase summary, counters and every span event
+- CSV: one row per span event
+- Prometheus textfile (for node_exporter's textfile collector)
+"""
+
+import os
+import csv
+import json
+import time
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+CSV_FIELDS = ['timestamp', 'phase', 'duration_ms', 'page', 'element', 'source']
+
+
+class HealingMetrics:
+    """
+    Thread-safe span and counter registry. Span events are kept up to `max_events`;
+    phase aggregates and counters are always complete.
+    """
+
+    def __init__(self, max_events=10000):
+        self.max_events = int(max_events)
+        self.started = datetime.now().isoformat()
+        self.events = []
+        self.dropped_events = 0
+        self.phases = {}
+        self.counters = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, phase, **labels):
+        """
+        Times the enclosed block as one event of `phase`. Labels (page, element, source) are kept with the event.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, (time.perf_counter() - start) * 1000, **labels)
+
+    def record(self, phase, duration_ms, **labels):
+        """
+        Records a span measured by the caller.
+        """
+        duration_ms = round(duration_ms, 3)
+        with self._lock:
+            self._seq += 1
+            aggregate = self.phases.setdefault(phase, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            aggregate['count'] += 1
+            aggregate['total_ms'] += duration_ms
+            aggregate['max_ms'] = max(aggregate['max_ms'], duration_ms)
+            if len(self.events) >= self.max_events:
+                self.dropped_events += 1
+                return
+            event = {'seq': self._seq, 'thread': threading.get_ident(), 'timestamp': datetime.now().isoformat(),
+                     'phase': phase, 'duration_ms': duration_ms}
+            event.update({key: value for key, value in labels.items() if value is not None})
+            self.events.append(event)
+
+    def incr(self, name, value=1, **labels):
+        """
+        Increments a counter. Labels split it into series, e.g. incr('heals', source='Local').
+        """
+        if not value:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def mark(self):
+        """
+        Returns a position for events_since().
+        """
+        with self._lock:
+            return self._seq
+
+    def events_since(self, mark, this_thread=True):
+        """
+        Events recorded after mark(), by default only those of the calling thread.
+        """
+        thread = threading.get_ident()
+        with self._lock:
+            return [event for event in self.events
+                    if event['seq'] > mark and (not this_thread or event['thread'] == thread)]
+
+    @staticmethod
+    def format_events(events):
+        """
+        One-line phase breakdown, e.g. "dom_capture 12.0 ms, llm_call 840.5 ms".
+        """
+        return ", ".join(f"{event['phase']} {event['duration_ms']:.1f} ms" for event in events)
+
+    def summary(self):
+        """
+        Returns {'phases': {phase: {count, total_ms, mean_ms, max_ms}}, 'counters': {'name{label=value}': count}}.
+        """
+        with self._lock:
+            phases = {
+                phase: {
+                    'count': aggregate['count'],
+                    'total_ms': round(aggregate['total_ms'], 3),
+                    'mean_ms': round(aggregate['total_ms'] / aggregate['count'], 3),
+                    'max_ms': aggregate['max_ms']
+                }
+                for phase, aggregate in self.phases.items()
+            }
+            counters = {
+                name + ("{" + ",".join(f"{key}={value}" for key, value in labels) + "}" if labels else ""): count
+                for (name, labels), count in sorted(self.counters.items())
+            }
+        return {'phases': phases, 'counters': counters}
+
+    def _exported_events(self):
+        with self._lock:
+            return [{key: value for key, value in event.items() if key not in ('seq', 'thread')} for event in self.events]
+
+    def write_json(self, path):
+        data = {
+            'started': self.started,
+            'finished': datetime.now().isoformat(),
+            'pid': os.getpid(),
+            **self.summary(),
+            'dropped_events': self.dropped_events,
+            'events': self._exported_events()
+        }
+        _write_atomic(path, lambda f: json.dump(data, f, indent=2))
+
+    def write_csv(self, path):
+        events = self._exported_events()
+
+        def write(f):
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(events)
+
+        _write_atomic(path, write, newline='')
+
+    def write_prometheus(self, path):
+        """
+        Writes the counters and phase aggregates in the Prometheus text exposition format.
+        """
+        summary = self.summary()
+        lines = [
+            "# HELP healing_phase_seconds Time spent per healing phase.",
+            "# TYPE healing_phase_seconds summary"
+        ]
+        for phase, aggregate in sorted(summary['phases'].items()):
+            lines.append(f'healing_phase_seconds_sum{{phase="{phase}"}} {aggregate["total_ms"] / 1000:.6f}')
+            lines.append(f'healing_phase_seconds_count{{phase="{phase}"}} {aggregate["count"]}')
+        lines += [
+            "# HELP healing_phase_max_seconds Slowest single span per healing phase.",
+            "# TYPE healing_phase_max_seconds gauge"
+        ]
+        for phase, aggregate in sorted(summary['phases'].items()):
+            lines.append(f'healing_phase_max_seconds{{phase="{phase}"}} {aggregate["max_ms"] / 1000:.6f}')
+
+        with self._lock:
+            counters = sorted(self.counters.items())
+        typed = set()
+        for (name, labels), value in counters:
+            metric = f"healing_{name}_total"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            label_text = ",".join(f'{key}="{_escape_label(value_)}"' for key, value_ in labels)
+            lines.append(f"{metric}{{{label_text}}} {value}" if label_text else f"{metric} {value}")
+
+        _write_atomic(path, lambda f: f.write("\n".join(lines) + "\n"))
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _write_atomic(path, write, newline=None):
+    """
+    Writes through a temp file and rename, so collectors never read a partial file.
+    """
+    dir_name = os.path.dirname(path) or "."
+    os.makedirs(dir_name, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=dir_name)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline=newline) as f:
+            write(f)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """
+    Returns the process-wide HealingMetrics instance.
+    """
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = HealingMetrics()
+        return _metrics
@@ -0,0 +1,118 @@
+"""
+JsonArrayStream - Incremental Parser for Streamed JSON Array Answers
+
+The LLM answers with a JSON array of locator candidates, usually wrapped in prose or a
+```json fence. When the answer is streamed, each candidate is complete long before the whole
+response is. JsonArrayStream is fed text chunks as they arrive and returns every top-level
+array item as soon as its closing bracket (or separating comma) has been seen:
+
+    parser = JsonArrayStream()
+    for chunk in stream:
+        for item in parser.feed(chunk):
+            ...
+
+Text before the first '[' is skipped. An answer whose first bracket is '{' is not an array:
+nothing is returned and the full text (`text`) is left to a regular JSON parse. Items that are
+not valid JSON are skipped and counted in `errors`.
+"""
+
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class JsonArrayStream:
+
+    def __init__(self):
+        self.items = []
+        self.errors = 0
+        self.done = False
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._item_start = None
+
+    def feed(self, text):
+        """
+        Consumes the next chunk and returns the list of items completed by it.
+        """
+        if not text:
+            return []
+        self._buffer += text
+        if self.done:
+            return []
+        completed = []
+        buffer = self._buffer
+
+        while self._pos < len(buffer) and not self.done:
+            i = self._pos
+            c = buffer[i]
+            self._pos += 1
+
+            if self._depth == 0:
+                if c == '[':
+                    self._depth = 1
+                elif c == '{':
+                    # Object answer, not an array of candidates
+                    self.done = True
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._mark_item(i)
+            elif c in '[{':
+                self._mark_item(i)
+                self._depth += 1
+            elif c in ']}':
+                self._depth -= 1
+                if self._depth == 0:
+                    # End of the top-level array; a trailing scalar item ends here too
+                    self._emit(i, completed)
+                    self.done = True
+                elif self._depth == 1:
+                    self._emit(i + 1, completed)
+            elif c == ',' and self._depth == 1:
+                self._emit(i, completed)
+            elif not c.isspace():
+                self._mark_item(i)
+
+        return completed
+
+    def _mark_item(self, index):
+        if self._depth == 1 and self._item_start is None:
+            self._item_start = index
+
+    def _emit(self, end, completed):
+        if self._item_start is None:
+            return
+        fragment = self._buffer[self._item_start:end].strip()
+        self._item_start = None
+        if not fragment:
+            return
+        try:
+            item = json.loads(fragment)
+        except json.JSONDecodeError:
+            self.errors += 1
+            logger.debug(f"JsonArrayStream: Skipping malformed item: {fragment[:200]}")
+            return
+        self.items.append(item)
+        completed.append(item)
+
+    @property
+    def text(self):
+        """
+        Everything fed so far.
+        """
+        return self._buffer
@@ -0,0 +1,545 @@
+"""
+LLMBackend - Pluggable LLM Backends with Timeouts, Retries, Rate Limiting and a Circuit Breaker
+
+The rescuer talks to the LLM through a backend interface instead of a hardwired Gemini model:
+- GeminiBackend: google-generativeai (default)
+- HttpBackend:   local OpenAI-compatible HTTP server (e.g. Ollama, llama.cpp), text only
+- StubBackend:   offline canned answers for tests and benchmarks
+
+Backends can also stream(): the answer arrives as LLMResponse chunks so callers can act on the
+first candidates before the response is complete, and stop reading (cancel) early.
+
+ResilientBackend wraps any backend with:
+- a per-call timeout
+- a token bucket limiting requests per minute
+- retries with full-jitter exponential backoff for transient errors (timeouts, 429, 5xx)
+- a circuit breaker that fails fast once the recent error rate crosses a threshold
+
+Configuration (environment or .env):
+    LLM_BACKEND=gemini|http|stub          LLM_MODEL=gemini-2.5-flash
+    LLM_TIMEOUT=60                        LLM_MAX_RETRIES=3
+    LLM_RATE_LIMIT=60 (requests/minute, 0 = unlimited)
+    LLM_BREAKER_THRESHOLD=0.5             LLM_BREAKER_COOLDOWN=60
+    LLM_HTTP_URL=http://localhost:11434/v1/chat/completions
+    LLM_STUB_RESPONSE='[{"type": "id", "value": "submit"}]'   LLM_STUB_DELAY=0
+"""
+
+import os
+import json
+import time
+import random
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = 'gemini-2.5-flash'
+DEFAULT_HTTP_URL = 'http://localhost:11434/v1/chat/completions'
+
+
+class LLMError(Exception):
+    """
+    Base class for backend errors. `retryable` marks transient failures.
+    """
+
+    def __init__(self, message, retryable=False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class LLMTimeoutError(LLMError):
+    def __init__(self, message):
+        super().__init__(message, retryable=True)
+
+
+class CircuitOpenError(LLMError):
+    pass
+
+
+class LLMResponse:
+    """
+    Text of an LLM answer plus token usage (None when the backend does not report it).
+    """
+
+    def __init__(self, text, prompt_tokens=None, output_tokens=None, backend=None):
+        self.text = text
+        self.prompt_tokens = prompt_tokens
+        self.output_tokens = output_tokens
+        self.backend = backend
+
+    def __repr__(self):
+        return f"LLMResponse(backend={self.backend}, prompt_tokens={self.prompt_tokens}, output_tokens={self.output_tokens}, chars={len(self.text or '')})"
+
+
+class LLMBackend:
+    """
+    Backend interface: generate(inputs, timeout) -> LLMResponse.
+    `inputs` is a list of prompt strings and PIL images, as accepted by Gemini.
+    """
+
+    name = 'base'
+
+    def __init__(self, model_name=DEFAULT_MODEL):
+        self.model_name = model_name
+
+    @property
+    def available(self):
+        return True
+
+    def generate(self, inputs, timeout=None):
+        raise NotImplementedError
+
+    def stream(self, inputs, timeout=None):
+        """
+        Yields the answer as LLMResponse chunks (text deltas; token usage on the chunk that reports it).
+        Closing the generator cancels the request. Backends without streaming yield one chunk.
+        """
+        yield self.generate(inputs, timeout=timeout)
+
+
+class GeminiBackend(LLMBackend):
+
+    name = 'gemini'
+
+    # google.api_core exception names that are worth retrying
+    RETRYABLE_ERRORS = ('ResourceExhausted', 'TooManyRequests', 'ServiceUnavailable', 'DeadlineExceeded',
+                        'InternalServerError', 'GatewayTimeout', 'Aborted')
+
+    def __init__(self, model_name=DEFAULT_MODEL, api_key=None):
+        super().__init__(model_name)
+        self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        self._model = None
+        if not self.api_key:
+            logger.warning("GEMINI_API_KEY not found. Level 3 healing will fail.")
+
+    @property
+    def available(self):
+        return bool(self.api_key)
+
+    def _get_model(self):
+        if self._model is None:
+            import google.generativeai as genai
+            genai.configure(api_key=self.api_key)
+            self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def _wrap_error(self, e, timeout):
+        retryable = type(e).__name__ in self.RETRYABLE_ERRORS or isinstance(e, (TimeoutError, ConnectionError))
+        if type(e).__name__ == 'DeadlineExceeded' or isinstance(e, TimeoutError):
+            return LLMTimeoutError(f"Gemini call timed out after {timeout}s: {e}")
+        return LLMError(f"Gemini call failed: {type(e).__name__}: {e}", retryable=retryable)
+
+    def _to_response(self, response, text):
+        usage = getattr(response, 'usage_metadata', None)
+        return LLMResponse(
+            text,
+            prompt_tokens=getattr(usage, 'prompt_token_count', None) or None,
+            output_tokens=getattr(usage, 'candidates_token_count', None) or None,
+            backend=self.name
+        )
+
+    def generate(self, inputs, timeout=None):
+        request_options = {'timeout': timeout} if timeout else None
+        try:
+            response = self._get_model().generate_content(inputs, request_options=request_options)
+            text = response.text
+        except Exception as e:
+            raise self._wrap_error(e, timeout) from e
+        return self._to_response(response, text)
+
+    def stream(self, inputs, timeout=None):
+        request_options = {'timeout': timeout} if timeout else None
+        response = None
+        try:
+            response = self._get_model().generate_content(inputs, stream=True, request_options=request_options)
+            for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunks without text parts (e.g. the final usage/finish chunk)
+                    text = ""
+                yield self._to_response(chunk, text)
+        except GeneratorExit:
+            # Caller stopped reading: cancel the underlying gRPC stream if the transport exposes it
+            cancel = getattr(getattr(response, '_iterator', None), 'cancel', None)
+            if callable(cancel):
+                cancel()
+            raise
+        except Exception as e:
+            raise self._wrap_error(e, timeout) from e
+
+
+class HttpBackend(LLMBackend):
+    """
+    OpenAI-compatible chat completions endpoint. Images are not sent.
+    """
+
+    name = 'http'
+
+    def __init__(self, model_name=DEFAULT_MODEL, url=DEFAULT_HTTP_URL, api_key=None):
+        super().__init__(model_name)
+        self.url = url
+        self.api_key = api_key
+
+    def _post(self, inputs, timeout, stream=False):
+        import requests
+
+        prompt = "\n".join(part for part in inputs if isinstance(part, str))
+        images = len(inputs) - sum(1 for part in inputs if isinstance(part, str))
+        if images:
+            logger.debug(f"HttpBackend: Ignoring {images} image input(s).")
+        headers = {'Authorization': f"Bearer {self.api_key}"} if self.api_key else {}
+        payload = {'model': self.model_name, 'messages': [{'role': 'user', 'content': prompt}]}
+        if stream:
+            payload['stream'] = True
+
+        try:
+            response = requests.post(self.url, json=payload, headers=headers, timeout=timeout, stream=stream)
+        except requests.Timeout as e:
+            raise LLMTimeoutError(f"HTTP LLM call timed out after {timeout}s") from e
+        except requests.ConnectionError as e:
+            raise LLMError(f"HTTP LLM backend unreachable at {self.url}: {e}", retryable=True) from e
+
+        if response.status_code == 429 or response.status_code >= 500:
+            response.close()
+            raise LLMError(f"HTTP LLM backend returned {response.status_code}", retryable=True)
+        if response.status_code >= 400:
+            message = f"HTTP LLM backend returned {response.status_code}: {response.text[:200]}"
+            response.close()
+            raise LLMError(message)
+        return response
+
+    def generate(self, inputs, timeout=None):
+        data = self._post(inputs, timeout).json()
+        usage = data.get('usage') or {}
+        return LLMResponse(
+            data['choices'][0]['message']['content'],
+            prompt_tokens=usage.get('prompt_tokens'),
+            output_tokens=usage.get('completion_tokens'),
+            backend=self.name
+        )
+
+    def stream(self, inputs, timeout=None):
+        """
+        Reads the server-sent events of a streamed chat completion; closing the generator closes the connection.
+        """
+        import requests
+
+        response = self._post(inputs, timeout, stream=True)
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
+                data = line[len('data:'):].strip()
+                if data == '[DONE]':
+                    break
+                event = json.loads(data)
+                usage = event.get('usage') or {}
+                choices = event.get('choices') or [{}]
+                yield LLMResponse(
+                    (choices[0].get('delta') or {}).get('content') or "",
+                    prompt_tokens=usage.get('prompt_tokens'),
+                    output_tokens=usage.get('completion_tokens'),
+                    backend=self.name
+                )
+        except requests.Timeout as e:
+            raise LLMTimeoutError(f"HTTP LLM stream timed out after {timeout}s") from e
+        except (requests.RequestException, ValueError) as e:
+            raise LLMError(f"HTTP LLM stream failed: {e}", retryable=True) from e
+        finally:
+            response.close()
+
+
+class StubBackend(LLMBackend):
+    """
+    Offline backend returning canned answers. `responder` may be a string, a list of strings
+    (returned in turn) or a callable taking the inputs. When streaming, the answer is split into
+    `chunk_size` character chunks and `delay` is spread evenly over them.
+    """
+
+    name = 'stub'
+
+    def __init__(self, model_name='stub', responder='[]', delay=0.0, chunk_size=16):
+        super().__init__(model_name)
+        self.responder = responder
+        self.delay = float(delay)
+        self.chunk_size = max(1, int(chunk_size))
+        self.calls = 0
+
+    def _answer(self, inputs):
+        self.calls += 1
+        if callable(self.responder):
+            return self.responder(inputs)
+        if isinstance(self.responder, (list, tuple)):
+            return self.responder[(self.calls - 1) % len(self.responder)]
+        return self.responder
+
+    @staticmethod
+    def _usage(inputs, text):
+        prompt_chars = sum(len(part) for part in inputs if isinstance(part, str))
+        # Rough token estimate (4 characters per token) so usage reporting works offline
+        return prompt_chars // 4, len(text) // 4
+
+    def generate(self, inputs, timeout=None):
+        if self.delay:
+            if timeout and self.delay > timeout:
+                time.sleep(timeout)
+                raise LLMTimeoutError(f"Stub call timed out after {timeout}s")
+            time.sleep(self.delay)
+
+        text = self._answer(inputs)
+        prompt_tokens, output_tokens = self._usage(inputs, text)
+        return LLMResponse(text, prompt_tokens=prompt_tokens, output_tokens=output_tokens, backend=self.name)
+
+    def stream(self, inputs, timeout=None):
+        text = self._answer(inputs)
+        chunks = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)] or [""]
+        pause = self.delay / len(chunks)
+        started = time.monotonic()
+        for chunk in chunks:
+            if pause:
+                if timeout and time.monotonic() - started + pause > timeout:
+                    raise LLMTimeoutError(f"Stub stream timed out after {timeout}s")
+                time.sleep(pause)
+            yield LLMResponse(chunk, backend=self.name)
+        prompt_tokens, output_tokens = self._usage(inputs, text)
+        yield LLMResponse("", prompt_tokens=prompt_tokens, output_tokens=output_tokens, backend=self.name)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate_per_minute` tokens refill continuously up to `burst`.
+    """
+
+    def __init__(self, rate_per_minute, burst=None):
+        self.rate = float(rate_per_minute) / 60.0
+        self.capacity = float(burst or max(1.0, min(float(rate_per_minute), 5.0)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """
+        Takes one token, waiting for a refill if needed. Returns False if it would wait past timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Opens when at least `min_calls` of the last `window` calls were made and the error rate
+    reaches `threshold`. After `cooldown` seconds one trial call is let through (half-open);
+    its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, threshold=0.5, window=10, min_calls=4, cooldown=60.0):
+        self.threshold = float(threshold)
+        self.min_calls = int(min_calls)
+        self.cooldown = float(cooldown)
+        self._outcomes = deque(maxlen=int(window))
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return 'closed'
+        return 'half-open' if time.monotonic() - self._opened_at >= self.cooldown else 'open'
+
+    def allow(self):
+        """
+        Returns True for a normal call, 'trial' for the half-open trial call, or False to fail fast.
+        """
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return 'trial'
+            return False
+
+    def release(self):
+        """
+        Gives back a trial slot that was granted but never used for a call, so the next call can be the trial.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record(self, success):
+        with self._lock:
+            if self._opened_at is not None and self._trial_in_flight:
+                self._trial_in_flight = False
+                if success:
+                    self._opened_at = None
+                    self._outcomes.clear()
+                    logger.info("CircuitBreaker: Trial call succeeded. Circuit closed.")
+                else:
+                    self._opened_at = time.monotonic()
+                    logger.warning("CircuitBreaker: Trial call failed. Circuit re-opened.")
+                return
+
+            self._outcomes.append(bool(success))
+            errors = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and errors / len(self._outcomes) >= self.threshold:
+                if self._opened_at is None:
+                    logger.warning(f"CircuitBreaker: {errors}/{len(self._outcomes)} recent LLM calls failed. Opening circuit for {self.cooldown}s.")
+                self._opened_at = time.monotonic()
+
+
+class ResilientBackend:
+    """
+    Wraps a backend with timeout, rate limiting, jittered retries and a circuit breaker.
+    """
+
+    def __init__(self, backend, timeout=60.0, max_retries=3, base_delay=1.0, max_delay=20.0,
+                 rate_limiter=None, breaker=None):
+        self.backend = backend
+        self.timeout = timeout
+        self.max_retries = int(max_retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rate_limiter = rate_limiter
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = {'calls': 0, 'retries': 0, 'failures': 0, 'rejected': 0, 'cancelled': 0, 'prompt_tokens': 0, 'output_tokens': 0}
+
+    @property
+    def model_name(self):
+        return self.backend.model_name
+
+    @property
+    def available(self):
+        return self.backend.available
+
+    def _admit(self):
+        """
+        Asks the circuit breaker, then the rate limiter, for permission to make one call.
+        A trial slot is given back if no request slot is free, so the breaker is never left half-open.
+        """
+        allowed = self.breaker.allow()
+        if not allowed:
+            self.stats['rejected'] += 1
+            raise CircuitOpenError(f"LLM circuit is {self.breaker.state}; failing fast.")
+        if self.rate_limiter and not self.rate_limiter.acquire(timeout=self.timeout):
+            if allowed == 'trial':
+                self.breaker.release()
+            raise LLMError("LLM rate limit: no request slot within the call timeout.")
+
+    def generate(self, inputs):
+        """
+        Returns an LLMResponse. Raises CircuitOpenError while the circuit is open and
+        LLMError once retries are exhausted.
+        """
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            self._admit()
+
+            self.stats['calls'] += 1
+            try:
+                response = self.backend.generate(inputs, timeout=self.timeout)
+            except LLMError as e:
+                last_error = e
+            except Exception as e:
+                last_error = LLMError(f"{type(e).__name__}: {e}")
+            else:
+                self.breaker.record(True)
+                self.stats['prompt_tokens'] += response.prompt_tokens or 0
+                self.stats['output_tokens'] += response.output_tokens or 0
+                return response
+
+            self.breaker.record(False)
+            if not last_error.retryable or attempt == self.max_retries:
+                break
+            # Full jitter keeps parallel workers from retrying in lockstep
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+            self.stats['retries'] += 1
+            logger.info(f"LLMBackend: {last_error}. Retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})...")
+            time.sleep(delay)
+
+        self.stats['failures'] += 1
+        raise last_error
+
+    def stream(self, inputs):
+        """
+        Streaming counterpart of generate(): yields LLMResponse chunks. A failed attempt is retried only
+        if it had not produced any text yet. Closing the generator cancels the request; a cancelled
+        stream counts as a successful call for the circuit breaker.
+        """
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            self._admit()
+
+            self.stats['calls'] += 1
+            started = False
+            chunks = self.backend.stream(inputs, timeout=self.timeout)
+            try:
+                for chunk in chunks:
+                    started = started or bool(chunk.text)
+                    self.stats['prompt_tokens'] += chunk.prompt_tokens or 0
+                    self.stats['output_tokens'] += chunk.output_tokens or 0
+                    yield chunk
+            except GeneratorExit:
+                self.stats['cancelled'] += 1
+                self.breaker.record(True)
+                raise
+            except LLMError as e:
+                last_error = e
+            except Exception as e:
+                last_error = LLMError(f"{type(e).__name__}: {e}")
+            else:
+                self.breaker.record(True)
+                return
+            finally:
+                chunks.close()
+
+            self.breaker.record(False)
+            if started or not last_error.retryable or attempt == self.max_retries:
+                break
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+            self.stats['retries'] += 1
+            logger.info(f"LLMBackend: {last_error}. Retrying stream in {delay:.1f}s ({attempt + 1}/{self.max_retries})...")
+            time.sleep(delay)
+
+        self.stats['failures'] += 1
+        raise last_error
+
+
+def create_backend(name=None, model_name=None):
+    """
+    Builds the configured backend wrapped in ResilientBackend (see module docstring for variables).
+    """
+    name = (name or os.getenv('LLM_BACKEND', 'gemini')).lower()
+    model_name = model_name or os.getenv('LLM_MODEL', DEFAULT_MODEL)
+
+    if name == 'stub':
+        backend = StubBackend(responder=os.getenv('LLM_STUB_RESPONSE', '[]'), delay=os.getenv('LLM_STUB_DELAY', 0))
+    elif name == 'http':
+        backend = HttpBackend(model_name, url=os.getenv('LLM_HTTP_URL', DEFAULT_HTTP_URL), api_key=os.getenv('LLM_HTTP_API_KEY'))
+    else:
+        if name != 'gemini':
+            logger.warning(f"Unknown LLM backend '{name}'. Using 'gemini'.")
+        backend = GeminiBackend(model_name)
+
+    rate = float(os.getenv('LLM_RATE_LIMIT', 60))
+    return ResilientBackend(
+        backend,
+        timeout=float(os.getenv('LLM_TIMEOUT', 60)),
+        max_retries=int(os.getenv('LLM_MAX_RETRIES', 3)),
+        rate_limiter=TokenBucket(rate) if rate > 0 else None,
+        breaker=CircuitBreaker(threshold=float(os.getenv('LLM_BREAKER_THRESHOLD', 0.5)),
+                               cooldown=float(os.getenv('LLM_BREAKER_COOLDOWN', 60)))
+    )
@@ -0,0 +1,165 @@
+"""
+LLMResponseCache - Persistent Content-Addressed Cache of LLM Healing Responses
+
+Until a locator fix is merged, CI hits the same broken locator against the same DOM on every run.
+This cache stores the parsed locator candidates returned by the LLM under a SHA-256 hash of
+everything that shaped the prompt:
+- the failed locator
+- the normalized (whitespace-collapsed) minified DOM
+- the last known good snapshot
+- the model name and prompt version
+
+A hit skips the network call entirely and goes straight to candidate validation.
+Entries expire after a TTL and the least recently used ones are evicted beyond a size limit.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(".healing_cache", "llm_responses")
+
+
+class LLMResponseCache:
+    """
+    On-disk cache of LLM locator candidates with TTL and LRU eviction.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_entries=500, max_bytes=50 * 1024 * 1024, ttl=7 * 24 * 3600):
+        self.cache_dir = cache_dir
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_bytes)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def normalize_dom(html):
+        """
+        Collapses whitespace so formatting-only differences map to the same key.
+        """
+        if not html:
+            return ""
+        return re.sub(r'\s+', ' ', html).strip()
+
+    def make_key(self, old_locator, dom, last_known_good, model_name, prompt_version):
+        """
+        Returns the content hash identifying a healing request.
+        """
+        digest = hashlib.sha256()
+        for part in (old_locator, self.normalize_dom(dom), self.normalize_dom(last_known_good), model_name, prompt_version):
+            digest.update(str(part or "").encode('utf-8'))
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """
+        Returns the cached candidates for the key, or None on a miss/expired entry.
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        if self.ttl and time.time() - entry.get('created', 0) > self.ttl:
+            self.invalidate(key)
+            self.misses += 1
+            return None
+
+        try:
+            # Touch the file so eviction sees it as recently used
+            os.utime(path, None)
+        except OSError:
+            pass
+        self.hits += 1
+        return entry.get('candidates')
+
+    def put(self, key, candidates, model_name=None):
+        """
+        Stores the parsed candidates for the key and evicts old entries if needed.
+        """
+        entry = {
+            'created': time.time(),
+            'model': model_name,
+            'candidates': candidates
+        }
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._entry_path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"LLMResponseCache: Failed to store entry {key}: {e}")
+            return
+        self._evict()
+
+    def invalidate(self, key):
+        """
+        Removes a single entry (e.g. when its candidates no longer match the page).
+        """
+        try:
+            os.remove(self._entry_path(key))
+            return True
+        except OSError:
+            return False
+
+    def _evict(self):
+        """
+        Removes expired entries, then least recently used ones until within count/size limits.
+        """
+        now = time.time()
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for dir_entry in it:
+                    if not dir_entry.name.endswith('.json'):
+                        continue
+                    try:
+                        stat = dir_entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+        except OSError:
+            return
+
+        entries.sort()
+        total_bytes = sum(size for _, size, _ in entries)
+        remaining = len(entries)
+        for mtime, size, path in entries:
+            # mtime is refreshed on every hit, so it is a safe lower bound for TTL expiry too
+            expired = self.ttl and now - mtime > self.ttl
+            if not expired and remaining <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+                remaining -= 1
+                total_bytes -= size
+            except OSError:
+                pass
+
+    def stats(self):
+        """
+        Returns hit/miss/eviction counters for reporting.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+        }
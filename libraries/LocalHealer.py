@@ -0,0 +1,335 @@
+"""
+LocalHealer - Deterministic Tier-1 Healing by Similarity to the Last Known Good Snapshot
+
+Most breakages are trivial renames (`submit-btn` -> `submit-v3-btn`) that do not need an LLM.
+This healer builds a profile of the target from its stored ancestry slice
+(`locators/dom_snapshots/{page}/{element}.html`) and scores every visible node of the live page
+against it in a single execute_script pass:
+- attribute similarity (character bigram Dice for ids/names/values, token overlap for classes)
+- text similarity
+- tag equality
+- parent path similarity (tag and classes of up to 3 ancestors)
+
+A node that contains another top-ranked node with an equal or better tag match is penalised:
+its textContent includes the inner node's, so wrapper ancestors otherwise score almost as high
+as the element itself.
+
+If the best node's score reaches the threshold and is clearly ahead of the runner-up, the browser
+builds locators that uniquely match it (id, name, test ids, aria-label, classes, link text, XPath).
+Otherwise the caller falls back to the LLM.
+"""
+
+import re
+import logging
+
+try:
+    from libraries.DomContextBuilder import DomContextBuilder
+except ImportError:
+    from DomContextBuilder import DomContextBuilder
+
+logger = logging.getLogger(__name__)
+
+# Attributes compared between the snapshot target and live nodes (class is compared separately)
+PROFILE_ATTRIBUTES = (
+    'id', 'name', 'type', 'role', 'placeholder', 'aria-label', 'title', 'alt', 'href', 'value', 'for',
+    'data-testid', 'data-test', 'data-qa', 'data-cy', 'data-action'
+)
+
+
+class LocalHealer:
+    """
+    Scores live DOM nodes against a snapshot profile and returns a ranked locator list.
+    """
+
+    # Weights of the similarity components (normalized over the components the profile has)
+    WEIGHTS = {'attributes': 0.45, 'text': 0.2, 'tag': 0.1, 'parents': 0.25}
+
+    # Score multiplier for a ranked node that wraps another ranked node
+    CONTAINER_PENALTY = 0.8
+
+    SCORE_NODES_JS = """
+        var profile = arguments[0], weights = arguments[1], topN = arguments[2], containerPenalty = arguments[3];
+
+        var bigrams = function (s) {
+            var grams = {}, total = 0;
+            s = (s || '').toLowerCase();
+            for (var i = 0; i < s.length - 1; i++) {
+                var g = s.substr(i, 2);
+                grams[g] = (grams[g] || 0) + 1;
+                total++;
+            }
+            return { grams: grams, total: total, raw: s };
+        };
+        // Sorensen-Dice coefficient over character bigrams
+        var dice = function (a, b) {
+            if (a.raw === b.raw) { return a.raw ? 1 : 0; }
+            if (!a.total || !b.total) { return 0; }
+            var overlap = 0;
+            for (var g in a.grams) {
+                if (b.grams[g]) { overlap += Math.min(a.grams[g], b.grams[g]); }
+            }
+            return 2 * overlap / (a.total + b.total);
+        };
+        var jaccard = function (a, b) {
+            if (!a.length && !b.length) { return 1; }
+            var setB = {}, inter = 0, union = b.length;
+            b.forEach(function (t) { setB[t] = true; });
+            a.forEach(function (t) { if (setB[t]) { inter++; } else { union++; } });
+            return union ? inter / union : 0;
+        };
+        var classesOf = function (el) {
+            var cls = el.getAttribute('class');
+            return cls ? cls.trim().split(/\\s+/) : [];
+        };
+        var textOf = function (el) {
+            return (el.textContent || '').replace(/\\s+/g, ' ').trim().substring(0, 100);
+        };
+        var isVisible = function (el) {
+            return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+        };
+
+        var attrNames = Object.keys(profile.attrs);
+        var attrGrams = {};
+        attrNames.forEach(function (name) { attrGrams[name] = bigrams(profile.attrs[name]); });
+        var textGrams = bigrams(profile.text);
+        var profileTag = profile.tag.toUpperCase();
+
+        var scoreParents = function (el) {
+            var total = 0, node = el.parentElement;
+            for (var i = 0; i < profile.parents.length; i++) {
+                var expected = profile.parents[i];
+                if (node) {
+                    var sim = (node.tagName.toLowerCase() === expected.tag ? 0.5 : 0)
+                            + 0.5 * jaccard(classesOf(node).concat(node.id ? ['#' + node.id] : []), expected.tokens);
+                    total += sim;
+                    node = node.parentElement;
+                }
+            }
+            return total / profile.parents.length;
+        };
+
+        var scoreNode = function (el) {
+            var parts = {}, sum = 0, weightSum = 0;
+            parts.tag = el.tagName.toUpperCase() === profileTag ? 1 : 0;
+
+            if (attrNames.length || profile.classes.length) {
+                var attrTotal = 0, attrCount = 0;
+                attrNames.forEach(function (name) {
+                    var value = el.getAttribute(name);
+                    attrTotal += value === null ? 0 : dice(attrGrams[name], bigrams(value));
+                    attrCount++;
+                });
+                if (profile.classes.length) {
+                    attrTotal += jaccard(classesOf(el), profile.classes);
+                    attrCount++;
+                }
+                parts.attributes = attrTotal / attrCount;
+            }
+            if (profile.text) { parts.text = dice(textGrams, bigrams(textOf(el))); }
+            if (profile.parents.length) { parts.parents = scoreParents(el); }
+
+            for (var key in parts) {
+                sum += weights[key] * parts[key];
+                weightSum += weights[key];
+            }
+            return { score: weightSum ? sum / weightSum : 0, parts: parts };
+        };
+
+        var ranked = [];
+        var nodes = document.body ? document.body.getElementsByTagName('*') : [];
+        for (var i = 0; i < nodes.length; i++) {
+            var el = nodes[i];
+            if (!isVisible(el)) { continue; }
+            var result = scoreNode(el);
+            if (ranked.length < topN || result.score > ranked[ranked.length - 1].score) {
+                ranked.push({ element: el, score: result.score, parts: result.parts });
+                ranked.sort(function (a, b) { return b.score - a.score; });
+                if (ranked.length > topN) { ranked.pop(); }
+            }
+        }
+        // Prefer the innermost match over wrappers that inherit its text
+        ranked.forEach(function (outer) {
+            var wraps = ranked.some(function (inner) {
+                return inner !== outer && outer.element.contains(inner.element) && inner.parts.tag >= outer.parts.tag;
+            });
+            if (wraps) {
+                outer.score *= containerPenalty;
+                outer.parts.container = 1;
+            }
+        });
+        ranked.sort(function (a, b) { return b.score - a.score; });
+        return { scanned: nodes.length, ranked: ranked };
+    """
+
+    BUILD_LOCATORS_JS = """
+        var el = arguments[0], knownClasses = arguments[1] || [];
+        var locators = [];
+        var quote = function (value) { return '"' + value.replace(/\\\\/g, '\\\\\\\\').replace(/"/g, '\\\\"') + '"'; };
+        var uniqueCss = function (css) {
+            try {
+                var found = document.querySelectorAll(css);
+                return found.length === 1 && found[0] === el;
+            } catch (e) { return false; }
+        };
+        var uniqueXpath = function (xpath) {
+            try {
+                var result = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                return result.snapshotLength === 1 && result.snapshotItem(0) === el;
+            } catch (e) { return false; }
+        };
+        var tag = el.tagName.toLowerCase();
+
+        if (el.id && uniqueCss('#' + CSS.escape(el.id))) { locators.push({ type: 'id', value: el.id }); }
+        var name = el.getAttribute('name');
+        if (name && uniqueCss('[name=' + quote(name) + ']')) { locators.push({ type: 'name', value: name }); }
+        ['data-testid', 'data-test', 'data-qa', 'data-cy', 'aria-label', 'placeholder', 'title', 'alt', 'href'].forEach(function (attr) {
+            var value = el.getAttribute(attr);
+            if (value && uniqueCss(tag + '[' + attr + '=' + quote(value) + ']')) {
+                locators.push({ type: 'css', value: tag + '[' + attr + '=' + quote(value) + ']' });
+            }
+        });
+        var text = (el.textContent || '').replace(/\\s+/g, ' ').trim();
+        if (tag === 'a' && text && text.length <= 80) {
+            var links = Array.prototype.filter.call(document.getElementsByTagName('a'), function (a) {
+                return (a.textContent || '').replace(/\\s+/g, ' ').trim() === text;
+            });
+            if (links.length === 1) { locators.push({ type: 'link_text', value: text }); }
+        }
+        var classes = (el.getAttribute('class') || '').trim().split(/\\s+/).filter(Boolean);
+        var classCss = function (list) { return tag + list.map(function (c) { return '.' + CSS.escape(c); }).join(''); };
+        // Classes the element already had in the snapshot first, then all current classes
+        var stableClasses = classes.filter(function (c) { return knownClasses.indexOf(c) !== -1; });
+        if (stableClasses.length && stableClasses.length < classes.length && uniqueCss(classCss(stableClasses))) {
+            locators.push({ type: 'css', value: classCss(stableClasses) });
+        }
+        if (classes.length && uniqueCss(classCss(classes))) { locators.push({ type: 'css', value: classCss(classes) }); }
+        if (text && text.length <= 80 && text.indexOf("'") === -1) {
+            var xpath = '//' + tag + "[normalize-space()='" + text + "']";
+            if (uniqueXpath(xpath)) { locators.push({ type: 'xpath', value: xpath }); }
+        }
+
+        // Last resort: structural path from the nearest ancestor with a unique id
+        var steps = [], node = el;
+        while (node && node.nodeType === 1 && node !== document.documentElement) {
+            if (node !== el && node.id && uniqueCss('#' + CSS.escape(node.id))) {
+                steps.unshift('#' + CSS.escape(node.id));
+                break;
+            }
+            var index = 1, sibling = node;
+            while ((sibling = sibling.previousElementSibling)) {
+                if (sibling.tagName === node.tagName) { index++; }
+            }
+            steps.unshift(node.tagName.toLowerCase() + ':nth-of-type(' + index + ')');
+            node = node.parentElement;
+        }
+        var path = steps.join(' > ');
+        if (uniqueCss(path)) { locators.push({ type: 'css', value: path }); }
+        return locators;
+    """
+
+    def __init__(self, threshold=0.75, min_margin=0.05, top_n=5):
+        """
+        Args:
+            threshold (float): Minimum similarity score (0..1) of the best node.
+            min_margin (float): Minimum lead of the best node over the runner-up.
+            top_n (int): Number of ranked nodes returned by the browser.
+        """
+        self.threshold = float(threshold)
+        self.min_margin = float(min_margin)
+        self.top_n = int(top_n)
+
+    @staticmethod
+    def profile(snapshot_html):
+        """
+        Extracts the target profile from a stored ancestry slice, or None if it has no element.
+        """
+        if not snapshot_html:
+            return None
+        from bs4 import BeautifulSoup, Tag
+        target = DomContextBuilder._snapshot_target(BeautifulSoup(snapshot_html, 'html.parser'))
+        if target is None:
+            return None
+
+        attrs = {}
+        for name in PROFILE_ATTRIBUTES:
+            value = target.get(name)
+            if value:
+                attrs[name] = " ".join(value) if isinstance(value, list) else str(value)
+
+        parents = []
+        for parent in target.parents:
+            if not isinstance(parent, Tag) or parent.name in ('[document]', 'body', 'html') or len(parents) == 3:
+                break
+            tokens = list(parent.get('class') or [])
+            if parent.get('id'):
+                tokens.append(f"#{parent.get('id')}")
+            parents.append({'tag': parent.name, 'tokens': tokens})
+
+        return {
+            'tag': target.name,
+            'attrs': attrs,
+            'classes': list(target.get('class') or []),
+            'text': " ".join(target.get_text(" ", strip=True).split())[:100],
+            'parents': parents
+        }
+
+    def heal(self, driver, snapshot_html):
+        """
+        Finds the live node most similar to the snapshot target.
+
+        Returns:
+            dict: {'locators': [{'type', 'value'}, ...], 'element', 'score', 'margin', 'parts', 'scanned'}
+                  if the match is confident, otherwise None.
+        """
+        profile = self.profile(snapshot_html)
+        if profile is None:
+            logger.debug("LocalHealer: No usable last known good snapshot.")
+            return None
+
+        result = driver.execute_script(self.SCORE_NODES_JS, profile, self.WEIGHTS, self.top_n, self.CONTAINER_PENALTY)
+        ranked = result.get('ranked') or []
+        if not ranked:
+            return None
+
+        best = ranked[0]
+        margin = best['score'] - (ranked[1]['score'] if len(ranked) > 1 else 0)
+        summary = f"score {best['score']:.2f}, margin {margin:.2f}, {result.get('scanned')} nodes scanned"
+        if best['score'] < self.threshold or margin < self.min_margin:
+            logger.info(f"LocalHealer: No confident match ({summary}; threshold {self.threshold}).")
+            return None
+
+        locators = driver.execute_script(self.BUILD_LOCATORS_JS, best['element'], profile['classes'])
+        if not locators:
+            logger.info(f"LocalHealer: Best match ({summary}) has no unique locator.")
+            return None
+
+        # Locators built from values that survived the change are the least likely to break again
+        locators.sort(key=lambda loc: 0 if self._is_stable(loc, profile) else 1)
+        logger.info(f"LocalHealer: Confident match ({summary}) -> {locators[0]}")
+        return {
+            'locators': locators,
+            'element': best['element'],
+            'score': best['score'],
+            'margin': margin,
+            'parts': best.get('parts'),
+            'scanned': result.get('scanned')
+        }
+
+    @staticmethod
+    def _is_stable(locator, profile):
+        """
+        True if every value the locator relies on was already present in the snapshot target.
+        """
+        loc_type, value = locator['type'], locator['value']
+        known_values = set(profile['attrs'].values())
+        if loc_type in ('id', 'name'):
+            return profile['attrs'].get(loc_type) == value
+        if loc_type == 'link_text':
+            return value == profile['text']
+        if loc_type == 'xpath':
+            return bool(profile['text']) and f"'{profile['text']}'" in value
+        if ':nth-of-type' in value:
+            return False
+        quoted = re.findall(r'="((?:[^"\\]|\\.)*)"', value)
+        classes = re.findall(r'\.((?:[^.\s\\]|\\.)+)', value.split('[', 1)[0])
+        return all(q in known_values for q in quoted) and all(c.replace('\\', '') in profile['classes'] for c in classes)
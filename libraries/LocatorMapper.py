@@ -81,7 +81,210 @@ class LocatorMapper:
         'xpath': 70,
         'relative': 80
     }
+
+    # Longest time a single injected async script may block. Kept below SeleniumLibrary's
+    # default script timeout (5s); ensure_script_timeout() raises a session timeout set lower.
+    ASYNC_SCRIPT_SLICE = 2.0
+    # Headroom between a slice and the session script timeout for the WebDriver round trip
+    SCRIPT_TIMEOUT_MARGIN = 1.0
+
+    # Installs (once per document) a probe that records the time of the last DOM mutation or
+    # finished network request. Requests are observed through PerformanceObserver resource entries,
+    # so the page's own fetch/XMLHttpRequest are never wrapped; a request still in flight is not
+    # seen until it completes. Evaluates to the probe object.
+    DOM_ACTIVITY_PROBE_JS = """
+        (function () {
+            if (window.__selfHealingProbe) { return window.__selfHealingProbe; }
+            var probe = { lastActivity: Date.now(), listeners: [] };
+            var touch = function () {
+                probe.lastActivity = Date.now();
+                var listeners = probe.listeners;
+                probe.listeners = [];
+                for (var i = 0; i < listeners.length; i++) { listeners[i](); }
+            };
+            new MutationObserver(touch).observe(document.documentElement || document, {
+                childList: true, subtree: true, attributes: true, characterData: true
+            });
+            if (window.PerformanceObserver && (PerformanceObserver.supportedEntryTypes || []).indexOf('resource') !== -1) {
+                new PerformanceObserver(touch).observe({ type: 'resource' });
+            }
+            window.__selfHealingProbe = probe;
+            return probe;
+        })()
+    """
+
+    # Async script: resolves once the page is loaded and neither the DOM nor the network has been
+    # active for arguments[0] ms, or early when the DOM changes, or after arguments[1] ms at most.
+    WAIT_FOR_DOM_QUIET_JS = """
+        var quietMs = arguments[0], maxMs = arguments[1], done = arguments[arguments.length - 1];
+        var probe = """ + DOM_ACTIVITY_PROBE_JS + """;
+        var start = Date.now(), finished = false, timer = null;
+        var finish = function (result) {
+            if (finished) { return; }
+            finished = true;
+            clearTimeout(timer);
+            result.quietFor = Date.now() - probe.lastActivity;
+            done(result);
+        };
+        var check = function () {
+            var now = Date.now(), quietFor = now - probe.lastActivity;
+            if (document.readyState === 'complete' && quietFor >= quietMs) {
+                return finish({ quiet: true, mutated: false });
+            }
+            if (now - start >= maxMs) { return finish({ quiet: false, mutated: false }); }
+            timer = setTimeout(check, Math.max(50, Math.min(quietMs - quietFor, maxMs - (now - start))));
+        };
+        probe.listeners.push(function () {
+            // Coalesce bursts of mutations before handing control back to the caller
+            setTimeout(function () { finish({ quiet: false, mutated: true }); }, 50);
+        });
+        check();
+    """
+
+    # Defines resolveLocator(type, value) -> Array<Element> for every JSON locator type and
+    # isElementVisible(el), an approximation of WebDriver's isDisplayed(). Shared by the batch scripts.
+    LOCATOR_RESOLVER_JS = """
+        var isElementVisible = function (el) {
+            var tag = el.tagName.toLowerCase();
+            if (tag === 'option' || tag === 'optgroup') {
+                var select = el.closest('select');
+                return select ? isElementVisible(select) : false;
+            }
+            if (!el.getClientRects().length) { return false; }
+            var rect = el.getBoundingClientRect();
+            if (rect.width === 0 && rect.height === 0) { return false; }
+            var style = window.getComputedStyle(el);
+            if (style.visibility === 'hidden' || style.visibility === 'collapse') { return false; }
+            for (var node = el; node && node.nodeType === 1; node = node.parentElement) {
+                if (window.getComputedStyle(node).opacity === '0') { return false; }
+            }
+            return true;
+        };
+        var linkText = function (a) { return (a.innerText || a.textContent || '').replace(/\\s+/g, ' ').trim(); };
+        var resolveLocator = function (type, value) {
+            switch (type) {
+                case 'id': return Array.prototype.slice.call(document.querySelectorAll('[id="' + CSS.escape(value) + '"]'));
+                case 'name': return Array.prototype.slice.call(document.getElementsByName(value));
+                case 'css': return Array.prototype.slice.call(document.querySelectorAll(value));
+                case 'class_name':
+                    // Like Selenium's By.CLASS_NAME, which rejects compound class names
+                    if (/\\s/.test(value.trim())) { throw new Error('Compound class names not permitted: ' + value); }
+                    return Array.prototype.slice.call(document.getElementsByClassName(value));
+                case 'tag_name': return Array.prototype.slice.call(document.getElementsByTagName(value));
+                case 'link_text':
+                    return Array.prototype.filter.call(document.getElementsByTagName('a'), function (a) { return linkText(a) === value; });
+                case 'partial_link_text':
+                    return Array.prototype.filter.call(document.getElementsByTagName('a'), function (a) { return linkText(a).indexOf(value) !== -1; });
+                case 'xpath':
+                    var snapshot = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                    var found = [];
+                    for (var i = 0; i < snapshot.snapshotLength; i++) {
+                        if (snapshot.snapshotItem(i).nodeType === 1) { found.push(snapshot.snapshotItem(i)); }
+                    }
+                    return found;
+                default: throw new Error('Unsupported locator type: ' + type);
+            }
+        };
+    """
+
+    # Defines structuralFingerprint(el): an 8 hex digit FNV-1a hash of the tag and identifying
+    # attributes of the element and its 3 parents (the ancestry kept in snapshots). Text, styles
+    # and siblings are left out, so only structural drift changes it.
+    STRUCTURAL_FINGERPRINT_JS = """
+        var structuralFingerprint = function (el) {
+            var attrs = ['id', 'name', 'class', 'type', 'role', 'aria-label', 'data-testid', 'placeholder'];
+            var parts = [];
+            for (var node = el, depth = 0; node && node.nodeType === 1 && depth < 4; node = node.parentElement, depth++) {
+                var part = node.tagName.toLowerCase();
+                for (var i = 0; i < attrs.length; i++) {
+                    var attr = node.getAttribute(attrs[i]);
+                    if (attr !== null) { part += '[' + attrs[i] + '=' + attr.replace(/\\s+/g, ' ').trim() + ']'; }
+                }
+                parts.push(part);
+            }
+            var text = parts.join('>'), hash = 0x811c9dc5;
+            for (var j = 0; j < text.length; j++) {
+                hash = Math.imul(hash ^ text.charCodeAt(j), 0x01000193) >>> 0;
+            }
+            return ('0000000' + hash.toString(16)).slice(-8);
+        };
+    """
+
+    FINGERPRINT_JS = STRUCTURAL_FINGERPRINT_JS + "return structuralFingerprint(arguments[0]);"
+
+    # Evaluates every [type, value] pair in arguments[0] in a single call. Elements (and the
+    # first one's structural fingerprint) are only returned for candidates whose matches are
+    # all visible, to keep the response small.
+    EVALUATE_CANDIDATES_JS = LOCATOR_RESOLVER_JS + STRUCTURAL_FINGERPRINT_JS + """
+        return arguments[0].map(function (candidate) {
+            var result = { count: 0, visibleCount: 0, unique: false, allVisible: false, elements: [], error: null };
+            try {
+                var matches = resolveLocator(candidate[0], candidate[1]);
+                var visible = matches.filter(isElementVisible);
+                result.count = matches.length;
+                result.visibleCount = visible.length;
+                result.unique = matches.length === 1;
+                result.allVisible = matches.length > 0 && visible.length === matches.length;
+                if (result.allVisible) {
+                    result.elements = matches;
+                    result.fingerprint = structuralFingerprint(matches[0]);
+                }
+            } catch (e) {
+                result.error = String(e && e.message || e);
+            }
+            return result;
+        });
+    """
+
+    # Async script: polls resolveLocator(arguments[0], arguments[1]) inside the browser for up to
+    # arguments[2] ms. Once all matches are visible, scrolls the first one into view instantly and
+    # returns them with its structural fingerprint. With a quiet window (arguments[3] ms, 0 = none), zero matches on a loaded page
+    # without DOM or network activity for that long count as broken.
+    RESOLVE_VISIBLE_JS = LOCATOR_RESOLVER_JS + STRUCTURAL_FINGERPRINT_JS + """
+        var type = arguments[0], value = arguments[1], maxMs = arguments[2], quietMs = arguments[3];
+        var done = arguments[arguments.length - 1];
+        var probe = quietMs > 0 ? """ + DOM_ACTIVITY_PROBE_JS + """ : null;
+        var start = Date.now();
+        var check = function () {
+            var matches;
+            try {
+                matches = resolveLocator(type, value);
+            } catch (e) {
+                return done({ status: 'error', error: String(e && e.message || e), count: 0, elements: [] });
+            }
+            if (matches.length && matches.every(isElementVisible)) {
+                matches[0].scrollIntoView({ block: 'center', inline: 'nearest' });
+                return done({ status: 'visible', count: matches.length, elements: matches,
+                              fingerprint: structuralFingerprint(matches[0]) });
+            }
+            var now = Date.now();
+            if (!matches.length && probe && document.readyState === 'complete' && now - probe.lastActivity >= quietMs) {
+                return done({ status: 'broken', count: 0, elements: [], quietFor: now - probe.lastActivity });
+            }
+            if (now - start >= maxMs) { return done({ status: 'pending', count: matches.length, elements: [] }); }
+            setTimeout(check, 100);
+        };
+        check();
+    """
+
+    # Async script: resolves when document.readyState becomes 'complete' or after arguments[0] ms.
+    WAIT_FOR_READY_STATE_JS = """
+        var maxMs = arguments[0], done = arguments[arguments.length - 1];
+        if (document.readyState === 'complete') { return done(true); }
+        var timer = setTimeout(function () { done(document.readyState === 'complete'); }, maxMs);
+        var onChange = function () {
+            if (document.readyState !== 'complete') { return; }
+            clearTimeout(timer);
+            document.removeEventListener('readystatechange', onChange);
+            done(true);
+        };
+        document.addEventListener('readystatechange', onChange);
+    """
     
+    def __init__(self):
+        # Sessions whose script timeout was checked by ensure_script_timeout()
+        self._script_timeout_sessions = set()
+
     def normalize_genai_type(self, genai_type):
         """
         Normalize GenAI response locator type to standard JSON format.
@@ -117,9 +320,49 @@ class LocatorMapper:
             logger.warning(f"Unknown locator type '{loc_type}' for RF conversion. Returning value as-is.")
             return loc_value
     
+    def ensure_script_timeout(self, driver):
+        """
+        Make sure the session's script timeout leaves room for an ASYNC_SCRIPT_SLICE, raising it if needed.
+        Checked once per session; call forget_script_timeout() after a script timeout to check again.
+        """
+        session_id = getattr(driver, 'session_id', None)
+        if session_id in self._script_timeout_sessions:
+            return
+        required = self.ASYNC_SCRIPT_SLICE + self.SCRIPT_TIMEOUT_MARGIN
+        try:
+            current = driver.timeouts.script
+        except Exception as e:
+            logger.debug(f"Could not read the session script timeout ({e}).")
+            current = None
+        if current is None or current < required:
+            logger.info(f"Session script timeout is {current}s; raising it to {required}s for injected async scripts.")
+            driver.set_script_timeout(required)
+        self._script_timeout_sessions.add(session_id)
+
+    def forget_script_timeout(self, driver):
+        """
+        Re-check the session's script timeout on the next ensure_script_timeout() call.
+        """
+        self._script_timeout_sessions.discard(getattr(driver, 'session_id', None))
+
+    def _execute_async_slice(self, driver, script, *args):
+        """
+        Runs an async script bounded by ASYNC_SCRIPT_SLICE once the session script timeout allows it.
+        """
+        from selenium.common.exceptions import TimeoutException
+        self.ensure_script_timeout(driver)
+        try:
+            return driver.execute_async_script(script, *args)
+        except TimeoutException:
+            # The timeout may have been lowered since it was checked (e.g. Set Selenium Timeout)
+            self.forget_script_timeout(driver)
+            raise
+
     def wait_for_page_to_load(self, driver, timeout=10):
         """
         Wait for the browser document.readyState to be 'complete'.
+        Listens for 'readystatechange' inside the browser instead of polling from Python,
+        falling back to polling if async scripts are unavailable.
         
         Args:
             driver: Selenium WebDriver instance
@@ -128,9 +371,16 @@ class LocatorMapper:
         import time
         start_time = time.time()
         while time.time() - start_time < timeout:
+            remaining = timeout - (time.time() - start_time)
+            slice_ms = int(min(remaining, self.ASYNC_SCRIPT_SLICE) * 1000)
             try:
-                state = driver.execute_script("return document.readyState")
-                if state == "complete":
+                if self._execute_async_slice(driver, self.WAIT_FOR_READY_STATE_JS, slice_ms):
+                    return True
+                continue
+            except Exception:
+                pass
+            try:
+                if driver.execute_script("return document.readyState") == "complete":
                     return True
             except Exception:
                 pass
@@ -138,6 +388,22 @@ class LocatorMapper:
         logger.warning(f"Page did not reach 'complete' state within {timeout}s. Proceeding anyway.")
         return False
 
+    def wait_for_dom_quiet(self, driver, quiet_window, max_wait):
+        """
+        Wait until the page is loaded and neither the DOM nor the network (finished requests)
+        has been active for `quiet_window` seconds. Returns early if the DOM changes.
+        
+        Args:
+            driver: Selenium WebDriver instance
+            quiet_window (float): Required quiet period in seconds
+            max_wait (float): Maximum time to block in seconds (capped to ASYNC_SCRIPT_SLICE)
+            
+        Returns:
+            dict: {'quiet': bool, 'mutated': bool, 'quietFor': ms since the last DOM activity}
+        """
+        slice_ms = int(max(0, min(max_wait, self.ASYNC_SCRIPT_SLICE)) * 1000)
+        return self._execute_async_slice(driver, self.WAIT_FOR_DOM_QUIET_JS, int(quiet_window * 1000), slice_ms)
+
     def wait_for_visibility(self, driver, loc_type, loc_value, timeout=60):
         """
         Wait for an element to be visible on the page.
@@ -164,20 +430,228 @@ class LocatorMapper:
         wait = WebDriverWait(driver, timeout)
         return wait.until(EC.visibility_of_element_located((selenium_by, loc_value)))
 
-    def wait_for_all_visible(self, driver, loc_type, loc_value, timeout=60):
+    def wait_for_all_visible(self, driver, loc_type, loc_value, timeout=60, selenium_by=None):
         """
         Wait for all elements matching locator to be visible.
+        `selenium_by` is the precompiled By strategy of the locator (LocatorRepository.compile_entry).
         """
         from selenium.webdriver.support.ui import WebDriverWait
         from selenium.webdriver.support   import expected_conditions as EC
         
-        selenium_by = self.json_to_selenium_by(loc_type)
+        selenium_by = selenium_by or self.json_to_selenium_by(loc_type)
         if not selenium_by:
             raise ValueError(f"Unsupported locator type for visibility wait: {loc_type}")
             
         wait = WebDriverWait(driver, timeout)
         return wait.until(EC.visibility_of_all_elements_located((selenium_by, loc_value)))
 
+    def wait_for_all_visible_or_broken(self, driver, loc_type, loc_value, timeout=60, quiet_window=2, selenium_by=None):
+        """
+        Wait for all elements matching locator to be visible, but give up early once the
+        locator is considered broken: zero matches while the DOM has been quiet for
+        `quiet_window` seconds (no mutations, no finished requests). This is a heuristic:
+        content revealed by a timer after a quiet period is reported as broken.
+        
+        Args:
+            driver: Selenium WebDriver instance
+            loc_type (str): Locator type (JSON format)
+            loc_value (str): Locator value
+            timeout (int): Timeout in seconds
+            quiet_window (float): Quiet period after which zero matches count as broken
+            selenium_by (str): Precompiled By strategy of the locator, if known
+            
+        Returns:
+            list[WebElement]: The visible elements, or an empty list if the locator is broken
+            
+        Raises:
+            TimeoutException: If elements exist but do not become visible within timeout
+        """
+        import time
+        from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+        
+        selenium_by = selenium_by or self.json_to_selenium_by(loc_type)
+        if not selenium_by:
+            raise ValueError(f"Unsupported locator type for visibility wait: {loc_type}")
+
+        deadline = time.time() + timeout
+        while True:
+            elements = driver.find_elements(selenium_by, loc_value)
+            try:
+                if elements and all(el.is_displayed() for el in elements):
+                    return elements
+            except StaleElementReferenceException:
+                elements = []
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise TimeoutException(f"Elements for '{loc_type}:{loc_value}' not visible within {timeout}s")
+
+            try:
+                activity = self.wait_for_dom_quiet(driver, quiet_window, remaining)
+            except Exception as e:
+                logger.debug(f"DOM quiet probe unavailable ({e}). Falling back to polling.")
+                time.sleep(min(0.5, max(0, deadline - time.time())))
+                continue
+
+            if not elements and activity and activity.get('quiet'):
+                logger.info(f"Locator '{loc_type}:{loc_value}' matches nothing and the DOM has been quiet for "
+                            f"{activity.get('quietFor')}ms. Treating it as broken.")
+                return []
+
+    def resolve_visible(self, driver, loc_type, loc_value, timeout=60, quiet_window=None, with_fingerprint=False, selenium_by=None):
+        """
+        Single-script counterpart of wait_for_all_visible_or_broken() plus scroll_into_view():
+        finding the elements, checking their visibility and scrolling the first one into view
+        (instantly) all happen in one injected async script, which polls inside the browser.
+        Each lookup costs one round trip per ASYNC_SCRIPT_SLICE regardless of the match count.
+        Falls back to the WebDriver waits if async scripts are unavailable.
+
+        Args:
+            driver: Selenium WebDriver instance
+            loc_type (str): Locator type (JSON format)
+            loc_value (str): Locator value
+            timeout (int): Timeout in seconds
+            quiet_window (float): Quiet period after which zero matches count as broken (None = wait until timeout)
+            with_fingerprint (bool): Also return the first element's structural fingerprint
+            selenium_by (str): Precompiled By strategy of the locator, if known
+
+        Returns:
+            list[WebElement]: The visible elements, or an empty list if the locator is broken.
+            With with_fingerprint, a tuple (elements, fingerprint); the fingerprint is None if the
+            WebDriver fallback was used or nothing was found.
+
+        Raises:
+            TimeoutException: If the elements do not become visible within timeout
+        """
+        import time
+        from selenium.common.exceptions import TimeoutException, InvalidSelectorException
+
+        selenium_by = selenium_by or self.json_to_selenium_by(loc_type)
+        if not selenium_by:
+            raise ValueError(f"Unsupported locator type for visibility wait: {loc_type}")
+
+        quiet_ms = int(quiet_window * 1000) if quiet_window else 0
+        deadline = time.time() + timeout
+        while True:
+            slice_ms = int(max(0, min(deadline - time.time(), self.ASYNC_SCRIPT_SLICE)) * 1000)
+            try:
+                result = self._execute_async_slice(driver, self.RESOLVE_VISIBLE_JS, loc_type, loc_value, slice_ms, quiet_ms) or {}
+            except Exception as e:
+                logger.debug(f"Single-script resolution unavailable ({e}). Falling back to WebDriver waits.")
+                remaining = max(0, deadline - time.time())
+                if quiet_window:
+                    elements = self.wait_for_all_visible_or_broken(driver, loc_type, loc_value, timeout=remaining, quiet_window=quiet_window,
+                                                                   selenium_by=selenium_by)
+                else:
+                    elements = self.wait_for_all_visible(driver, loc_type, loc_value, timeout=remaining, selenium_by=selenium_by)
+                if elements:
+                    self.scroll_into_view(driver, elements[0])
+                return (elements, None) if with_fingerprint else elements
+
+            status = result.get('status')
+            if status == 'visible':
+                return (result['elements'], result.get('fingerprint')) if with_fingerprint else result['elements']
+            if status == 'broken':
+                logger.info(f"Locator '{loc_type}:{loc_value}' matches nothing and the DOM has been quiet for "
+                            f"{result.get('quietFor')}ms. Treating it as broken.")
+                return ([], None) if with_fingerprint else []
+            if status == 'error':
+                raise InvalidSelectorException(f"Invalid locator '{loc_type}:{loc_value}': {result.get('error')}")
+            if time.time() >= deadline:
+                raise TimeoutException(f"Elements for '{loc_type}:{loc_value}' not visible within {timeout}s "
+                                       f"({result.get('count', 0)} match(es))")
+
+    def structural_fingerprint(self, driver, element):
+        """
+        Returns the structural fingerprint of an element and its 3 parents (see STRUCTURAL_FINGERPRINT_JS),
+        or None if it cannot be computed.
+        """
+        try:
+            return driver.execute_script(self.FINGERPRINT_JS, element)
+        except Exception as e:
+            logger.debug(f"Could not compute the structural fingerprint: {e}")
+            return None
+
+    def evaluate_candidates(self, driver, candidates):
+        """
+        Evaluate many locator candidates against the live page in a single execute_script call.
+        
+        Args:
+            driver: Selenium WebDriver instance
+            candidates (list): List of dicts with 'type' (JSON format) and 'value' keys
+            
+        Returns:
+            list[dict]: One result per candidate, in the same order:
+                {'count': int, 'visibleCount': int, 'unique': bool, 'allVisible': bool,
+                 'elements': list[WebElement] (only when allVisible), 'fingerprint': str (only when allVisible),
+                 'error': str or None}
+        """
+        if not candidates:
+            return []
+        pairs = [[cand.get('type', 'xpath'), cand.get('value')] for cand in candidates]
+        return driver.execute_script(self.EVALUATE_CANDIDATES_JS, pairs)
+
+    def wait_for_locators(self, driver, locators, timeout=60, quiet_window=None):
+        """
+        Batch counterpart of wait_for_all_visible_or_broken(): re-evaluates all locators in one
+        execute_script call per poll until every one of them has all matches visible.
+        Gives up early on locators that match nothing once the DOM has been quiet for `quiet_window`
+        seconds (None = keep polling until timeout). Never raises on timeout.
+
+        Args:
+            driver: Selenium WebDriver instance
+            locators (list): List of dicts with 'type' (JSON format) and 'value' keys
+            timeout (int): Timeout in seconds
+            quiet_window (float): Quiet period after which zero matches count as broken
+
+        Returns:
+            list[dict]: The last evaluate_candidates() result per locator, in the same order
+        """
+        import time
+
+        deadline = time.time() + timeout
+        results = [None] * len(locators)
+        pending = list(range(len(locators)))
+        while pending:
+            for i, res in zip(pending, self.evaluate_candidates(driver, [locators[i] for i in pending])):
+                results[i] = res or {}
+            pending = [i for i in pending if not results[i].get('allVisible') and not results[i].get('error')]
+
+            remaining = deadline - time.time()
+            if not pending or remaining <= 0:
+                break
+
+            if not quiet_window:
+                time.sleep(min(0.5, remaining))
+                continue
+            try:
+                activity = self.wait_for_dom_quiet(driver, quiet_window, remaining)
+            except Exception as e:
+                logger.debug(f"DOM quiet probe unavailable ({e}). Falling back to polling.")
+                time.sleep(min(0.5, max(0, deadline - time.time())))
+                continue
+
+            if activity and activity.get('quiet') and all(results[i].get('count', 0) == 0 for i in pending):
+                logger.info(f"{len(pending)} locator(s) match nothing and the DOM has been quiet for "
+                            f"{activity.get('quietFor')}ms. Treating them as broken.")
+                break
+        return results
+
+    def select_best_candidate(self, candidates, results):
+        """
+        Pick the best candidate from evaluate_candidates() results.
+        Candidates are expected in priority order; a unique visible match wins over a
+        visible multi-match of higher priority.
+        
+        Returns:
+            tuple: (candidate, result) or None if no candidate has all matches visible
+        """
+        visible = [(cand, res) for cand, res in zip(candidates, results) if res and res.get('allVisible')]
+        for cand, res in visible:
+            if res.get('unique'):
+                return cand, res
+        return visible[0] if visible else None
+
     def scroll_into_view(self, driver, element):
         """
         Scroll the element into the viewport using JavaScript.
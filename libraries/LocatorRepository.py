@@ -0,0 +1,138 @@
+"""
+LocatorRepository - In-Memory Page Object Cache
+
+Loads each `locators/{page}.json` file once and keeps the parsed entries in memory,
+precompiled into every format the healing pipeline needs:
+- the raw JSON entry (type, value)
+- the Robot Framework locator string
+- the Selenium (By, value) tuple
+
+A page file is only re-read when its mtime or size changes on disk (e.g. after
+LocatorUpdater rewrote it), so repeated Smart keyword calls cost a single os.stat().
+"""
+
+import os
+import json
+import glob
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LocatorRepository:
+    """
+    Caches compiled page object locators and invalidates them when the file changes.
+    """
+
+    def __init__(self, mapper, locators_dir="locators"):
+        self.mapper = mapper
+        self.locators_dir = locators_dir
+        # page_name -> {'stamp': (mtime_ns, size), 'entries': {element_name: compiled_entry}}
+        self._pages = {}
+
+    def _page_path(self, page_name):
+        return os.path.join(self.locators_dir, f"{page_name}.json")
+
+    def _file_stamp(self, file_path):
+        """
+        Returns a cheap change indicator for a file, or None if it does not exist.
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def compile_entry(self, entry):
+        """
+        Precompute the RF locator string and Selenium By tuple for a JSON entry.
+
+        Args:
+            entry (dict): Raw JSON entry, e.g. {'type': 'id', 'value': 'submit-btn'}
+
+        Returns:
+            dict: Copy of the entry with additional 'rf_locator' and 'selenium_by' keys.
+                  'selenium_by' is None for types WebDriver cannot resolve directly (e.g. 'relative').
+        """
+        compiled = dict(entry)
+        loc_type = compiled.get('type', 'xpath')
+        loc_value = compiled.get('value')
+        compiled['type'] = loc_type
+        compiled['rf_locator'] = self.mapper.json_to_robot_framework(loc_type, loc_value)
+
+        # Read the map directly: json_to_selenium_by() warns for every unsupported type,
+        # which would be noisy during an eager preload.
+        selenium_by = self.mapper.JSON_TO_SELENIUM_BY.get(loc_type)
+        compiled['selenium_by'] = (selenium_by, loc_value) if selenium_by else None
+        return compiled
+
+    def _load_page(self, page_name, file_path, stamp):
+        with open(file_path, 'r') as f:
+            data = json.load(f)
+
+        entries = {}
+        for element_name, entry in data.items():
+            if isinstance(entry, dict):
+                entries[element_name] = self.compile_entry(entry)
+
+        self._pages[page_name] = {'stamp': stamp, 'entries': entries}
+        logger.debug(f"LocatorRepository: Loaded {len(entries)} locators from {file_path}")
+        return entries
+
+    def get_page(self, page_name):
+        """
+        Returns all compiled entries of a page object, reloading the file only if it changed.
+
+        Returns:
+            dict: {element_name: compiled_entry}, or None if the file is missing/unreadable.
+        """
+        file_path = self._page_path(page_name)
+        stamp = self._file_stamp(file_path)
+        if stamp is None:
+            self._pages.pop(page_name, None)
+            logger.error(f"Locator file {file_path} not found.")
+            return None
+
+        cached = self._pages.get(page_name)
+        if cached and cached['stamp'] == stamp:
+            return cached['entries']
+
+        try:
+            return self._load_page(page_name, file_path, stamp)
+        except Exception as e:
+            self._pages.pop(page_name, None)
+            logger.error(f"Failed to load locator file {file_path}: {e}")
+            return None
+
+    def get(self, page_name, element_name):
+        """
+        Returns the compiled entry for a single element, or None if it does not exist.
+        """
+        entries = self.get_page(page_name)
+        if entries is None:
+            return None
+        return entries.get(element_name)
+
+    def invalidate(self, page_name=None):
+        """
+        Drops a cached page (or all pages) so the next lookup re-reads it from disk.
+        """
+        if page_name is None:
+            self._pages.clear()
+        else:
+            self._pages.pop(page_name, None)
+
+    def preload(self):
+        """
+        Eagerly loads and compiles every `locators/*.json` page object.
+
+        Returns:
+            int: Number of page files loaded.
+        """
+        loaded = 0
+        for file_path in sorted(glob.glob(os.path.join(self.locators_dir, "*.json"))):
+            page_name = os.path.splitext(os.path.basename(file_path))[0]
+            if self.get_page(page_name) is not None:
+                loaded += 1
+        logger.info(f"LocatorRepository: Preloaded {loaded} page object files from '{self.locators_dir}'.")
+        return loaded
@@ -1,56 +1,85 @@
 import json
 import os
 from datetime import datetime
+
 try:
-    from git import Repo
+    from libraries.HealingLog import HEALING_LOG, LEGACY_HEALING_LOG, read_latest
+    from libraries.FileLock import FileLock, write_json_atomic
+    from libraries.HealingMetrics import get_metrics
 except ImportError:
-    Repo = None
+    from HealingLog import HEALING_LOG, LEGACY_HEALING_LOG, read_latest
+    from FileLock import FileLock, write_json_atomic
+    from HealingMetrics import get_metrics
 
-HEALING_LOG = "healing_log.json"
 LOCATORS_DIR = "locators"
 
-def update_json_locator(page_name, element_name, new_locator_type, new_locator_value):
+def update_json_locators(page_name, updates):
     """
-    Updates a single locator in the JSON file. 
-    Can be called by GenAIRescuer for live updates.
+    Applies many element updates to a page file in a single write.
+    The file is re-read under a per-file lock and only the given elements are changed,
+    so concurrent workers updating other elements of the same page are merged, not clobbered.
+
+    Args:
+        page_name (str): Page Object file name (without .json)
+        updates (dict): {element_name: (new_locator_type, new_locator_value)}
+
+    Returns:
+        list: Names of the elements that were updated
     """
     json_file_path = os.path.join(LOCATORS_DIR, f"{page_name}.json")
     
     if not os.path.exists(json_file_path):
         print(f"Locator file {json_file_path} not found. Skipping.")
-        return False
+        return []
         
     try:
-        # Read existing
-        with open(json_file_path, 'r') as f:
-            data = json.load(f)
-        
-        # Update
-        if element_name in data:
-            print(f"Updating {page_name}.{element_name} -> {new_locator_type}: {new_locator_value}")
-            data[element_name]['type'] = new_locator_type # Ensure we update the 'type' field
-            data[element_name]['value'] = new_locator_value # Ensure we update the 'value' field
+        # Timed including the wait for the lock
+        with get_metrics().span('json_update', page=page_name), FileLock(json_file_path):
+            # Read the latest content under the lock (merge-on-write)
+            with open(json_file_path, 'r') as f:
+                data = json.load(f)
+            
+            updated = []
+            changed = False
+            for element_name, (new_locator_type, new_locator_value) in updates.items():
+                if element_name not in data:
+                    print(f"Element {element_name} not found in {json_file_path}. Skipping.")
+                    continue
+                entry = data[element_name]
+                if entry.get('type') == new_locator_type and entry.get('value') == new_locator_value:
+                    print(f"{page_name}.{element_name} already up to date.")
+                    updated.append(element_name)
+                    continue
+                print(f"Updating {page_name}.{element_name} -> {new_locator_type}: {new_locator_value}")
+                entry['type'] = new_locator_type # Ensure we update the 'type' field
+                entry['value'] = new_locator_value # Ensure we update the 'value' field
+                updated.append(element_name)
+                changed = True
             
-            # Write back
-            with open(json_file_path, 'w') as f:
-                json.dump(data, f, indent=2)
-            return True
-        else:
-                print(f"Element {element_name} not found in {json_file_path}. Skipping.")
-                return False
+            # Write back once for the whole batch
+            if changed:
+                write_json_atomic(json_file_path, data)
+            return updated
 
     except Exception as e:
         print(f"Error updating file {json_file_path}: {e}")
-        return False
+        return []
+
+def update_json_locator(page_name, element_name, new_locator_type, new_locator_value):
+    """
+    Updates a single locator in the JSON file. 
+    Can be called by GenAIRescuer for live updates.
+    """
+    return element_name in update_json_locators(page_name, {element_name: (new_locator_type, new_locator_value)})
 
 def update_locators():
-    if not os.path.exists(HEALING_LOG):
+    if not os.path.exists(HEALING_LOG) and not os.path.exists(LEGACY_HEALING_LOG):
         print(f"No healing log found at {HEALING_LOG}. Nothing to update.")
         return
 
     try:
-        with open(HEALING_LOG, 'r', encoding='utf-8-sig') as f:
-            changes = json.load(f)
+        # Latest event per element (also reads the legacy JSON array log)
+        changes = read_latest()
     except Exception as e:
         print(f"Error reading healing log: {e}")
         return
@@ -61,8 +90,8 @@ def update_locators():
 
     print(f"Found {len(changes)} locators to update.")
 
-    modified_files = []
-
+    # Group by page so every page file is written once
+    updates_by_page = {}
     for change in changes:
         page_name = change.get('page')
         element_name = change.get('name')
@@ -73,10 +102,13 @@ def update_locators():
             print(f"Skipping invalid entry: {change}")
             continue
         
-        if update_json_locator(page_name, element_name, new_loc_type, new_loc_val):
-             json_file_path = os.path.join(LOCATORS_DIR, f"{page_name}.json")
-             if json_file_path not in modified_files:
-                modified_files.append(json_file_path)
+        updates_by_page.setdefault(page_name, {})[element_name] = (new_loc_type, new_loc_val)
+
+    modified_files = []
+
+    for page_name, updates in updates_by_page.items():
+        if update_json_locators(page_name, updates):
+            modified_files.append(os.path.join(LOCATORS_DIR, f"{page_name}.json"))
 
     # if modified_files:
     #     create_pr(modified_files)
@@ -86,7 +118,10 @@ def update_locators():
     return modified_files
 
 def create_pr(files):
-    if Repo is None:
+    # GitPython is slow to import and only needed here
+    try:
+        from git import Repo
+    except ImportError:
         print("GitPython not installed. Skipping Git operations.")
         return
 
@@ -0,0 +1,239 @@
+"""
+SnapshotImages - Compact Visual Snapshots and LLM Image Payloads
+
+Full-page success screenshots (~500KB PNG each) bloat the repository and the vision
+prompt. This module provides the image handling used by the snapshot writer and the
+vision healing path:
+- crop a region around the highlighted element and store it as WebP/JPEG/PNG
+- store a small thumbnail next to it
+- cap the resolution of every image sent to the LLM
+- recompress an existing `locators/dom_snapshots` tree (see scripts/recompress_snapshots.py)
+"""
+
+import os
+import io
+import glob
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# File extension per supported encoding
+FORMAT_EXTENSIONS = {'png': 'png', 'webp': 'webp', 'jpeg': 'jpg', 'jpg': 'jpg'}
+
+SUCCESS_SUFFIX = "_success"
+THUMBNAIL_SUFFIX = "_thumb"
+
+
+def normalize_format(image_format):
+    image_format = str(image_format or 'png').lower()
+    if image_format not in FORMAT_EXTENSIONS:
+        logger.warning(f"Unsupported snapshot image format '{image_format}'. Using 'png'.")
+        return 'png'
+    return 'jpeg' if image_format == 'jpg' else image_format
+
+
+def encode_image(image, image_format='webp', quality=80):
+    """
+    Encodes a PIL image. Returns (bytes, extension).
+    """
+    image_format = normalize_format(image_format)
+    buffer = io.BytesIO()
+    if image_format == 'png':
+        image.save(buffer, format='PNG', optimize=True)
+    elif image_format == 'jpeg':
+        image.convert("RGB").save(buffer, format='JPEG', quality=int(quality), optimize=True)
+    else:
+        image.save(buffer, format='WEBP', quality=int(quality), method=4)
+    return buffer.getvalue(), FORMAT_EXTENSIONS[image_format]
+
+
+def crop_around(image, box, margin):
+    """
+    Crops `image` to `box` (left, top, right, bottom) grown by `margin` pixels on each side.
+    """
+    left, top, right, bottom = box
+    crop_box = (
+        max(0, int(left - margin)),
+        max(0, int(top - margin)),
+        min(image.width, int(right + margin)),
+        min(image.height, int(bottom + margin))
+    )
+    if crop_box[2] <= crop_box[0] or crop_box[3] <= crop_box[1]:
+        return image, (0, 0, image.width, image.height)
+    return image.crop(crop_box), crop_box
+
+
+def thumbnail(image, max_side=160):
+    thumb = image.copy()
+    thumb.thumbnail((int(max_side), int(max_side)))
+    return thumb
+
+
+def limit_resolution(image, max_side):
+    """
+    Downscales an image so that its longest side is at most `max_side` pixels.
+    """
+    if not max_side or max(image.size) <= int(max_side):
+        return image
+    scaled = image.copy()
+    scaled.thumbnail((int(max_side), int(max_side)))
+    return scaled
+
+
+def find_highlight_box(image):
+    """
+    Locates the red highlight border drawn around the target element.
+    Returns (left, top, right, bottom) or None.
+    """
+    from PIL import ImageChops
+    r, g, b = image.convert("RGB").split()
+    mask = ImageChops.multiply(
+        r.point(lambda v: 255 if v > 200 else 0),
+        ImageChops.multiply(g.point(lambda v: 255 if v < 60 else 0), b.point(lambda v: 255 if v < 60 else 0))
+    )
+    return mask.getbbox()
+
+
+def find_success_image(snapshot_dir, element_name):
+    """
+    Returns the path of the newest success image for an element (any supported format), or None.
+    """
+    candidates = glob.glob(os.path.join(snapshot_dir, f"{glob.escape(element_name)}{SUCCESS_SUFFIX}.*"))
+    candidates = [c for c in candidates if c.rsplit('.', 1)[-1].lower() in FORMAT_EXTENSIONS.values()]
+    if not candidates:
+        return None
+    return max(candidates, key=os.path.getmtime)
+
+
+def encode_success_images(image, box=None, image_format='webp', quality=80, margin=200, thumbnail_size=160):
+    """
+    Crops the success image around the element and encodes it together with its thumbnail.
+
+    Args:
+        image: PIL image of the viewport (highlight already drawn)
+        box: (left, top, right, bottom) of the element in image pixels, or None to keep the full image
+        margin: Pixels kept around the element when cropping
+
+    Returns:
+        tuple: (image bytes, thumbnail bytes, extension, crop box)
+    """
+    crop_box = (0, 0, image.width, image.height)
+    if box is not None:
+        image, crop_box = crop_around(image, box, margin)
+
+    data, extension = encode_image(image, image_format, quality)
+    thumb_data, _ = encode_image(thumbnail(image, thumbnail_size), image_format, quality)
+    return data, thumb_data, extension, crop_box
+
+
+def write_success_images(snapshot_dir, element_name, data, thumb_data, extension):
+    """
+    Writes an encoded success image and thumbnail, removing stale files in other formats.
+    Returns the success image path.
+    """
+    success_path = os.path.join(snapshot_dir, f"{element_name}{SUCCESS_SUFFIX}.{extension}")
+    with open(success_path, "wb") as f:
+        f.write(data)
+    if thumb_data is not None:
+        with open(os.path.join(snapshot_dir, f"{element_name}{THUMBNAIL_SUFFIX}.{extension}"), "wb") as f:
+            f.write(thumb_data)
+
+    # Drop images left over from a previous format so loaders never pick a stale one
+    for suffix in (SUCCESS_SUFFIX, THUMBNAIL_SUFFIX):
+        for other in set(FORMAT_EXTENSIONS.values()) - {extension}:
+            stale = os.path.join(snapshot_dir, f"{element_name}{suffix}.{other}")
+            if os.path.exists(stale):
+                os.remove(stale)
+
+    return success_path
+
+
+def save_success_images(image, snapshot_dir, element_name, box=None, image_format='webp', quality=80, margin=200, thumbnail_size=160):
+    """
+    Saves the cropped success image and its thumbnail, removing stale files in other formats.
+
+    Returns:
+        tuple: (success image path, crop box)
+    """
+    data, thumb_data, extension, crop_box = encode_success_images(image, box, image_format, quality, margin, thumbnail_size)
+    return write_success_images(snapshot_dir, element_name, data, thumb_data, extension), crop_box
+
+
+def recompress_tree(root, image_format='webp', quality=80, margin=200, thumbnail_size=160, dry_run=False):
+    """
+    Crops and recompresses every success image under `root` (locators/dom_snapshots layout).
+    The element box comes from the red highlight, or from `{element}_meta.json` if none is found.
+    Images already cropped (meta has 'crop') or already in the target format are skipped, so the
+    tree can be recompressed again safely.
+
+    Returns:
+        dict: {'files': n, 'skipped': n, 'bytes_before': n, 'bytes_after': n,
+               'entries': [{'path', 'status', 'bytes_before', 'bytes_after', 'box', 'output'}]}
+               with status 'recompressed', 'dry-run', 'cropped' or 'same-format'
+    """
+    stats = {'files': 0, 'skipped': 0, 'bytes_before': 0, 'bytes_after': 0, 'entries': []}
+    image_format = normalize_format(image_format)
+    target_extension = FORMAT_EXTENSIONS[image_format]
+    extensions = set(FORMAT_EXTENSIONS.values())
+
+    for path in sorted(glob.glob(os.path.join(root, "*", f"*{SUCCESS_SUFFIX}.*"))):
+        extension = path.rsplit('.', 1)[-1].lower()
+        if extension not in extensions:
+            continue
+        snapshot_dir = os.path.dirname(path)
+        element_name = os.path.basename(path).rsplit(SUCCESS_SUFFIX, 1)[0]
+        size_before = os.path.getsize(path)
+        entry = {'path': path, 'bytes_before': size_before, 'bytes_after': size_before, 'box': None, 'output': path}
+
+        meta = None
+        meta_path = os.path.join(snapshot_dir, f"{element_name}_meta.json")
+        if os.path.exists(meta_path):
+            try:
+                with open(meta_path) as f:
+                    meta = json.load(f)
+            except Exception as e:
+                logger.warning(f"Could not read {meta_path}: {e}")
+
+        if meta and 'crop' in meta:
+            entry['status'] = 'cropped'
+        elif extension == target_extension:
+            entry['status'] = 'same-format'
+        if entry.get('status'):
+            stats['skipped'] += 1
+            stats['entries'].append(entry)
+            continue
+
+        from PIL import Image
+        with Image.open(path) as source:
+            image = source.convert("RGB")
+
+        box = find_highlight_box(image)
+        # Metadata written for legacy snapshots may only carry a fingerprint
+        if box is None and meta and all(key in meta for key in ('x', 'y', 'width', 'height')):
+            box = (meta['x'], meta['y'], meta['x'] + meta['width'], meta['y'] + meta['height'])
+        entry['box'] = box
+
+        if dry_run:
+            entry['status'] = 'dry-run'
+            stats['files'] += 1
+            stats['bytes_before'] += size_before
+            stats['entries'].append(entry)
+            continue
+
+        success_path, crop_box = save_success_images(image, snapshot_dir, element_name, box, image_format, quality, margin, thumbnail_size)
+        if os.path.abspath(success_path) != os.path.abspath(path) and os.path.exists(path):
+            os.remove(path)
+        if meta is not None:
+            meta['crop'] = list(crop_box)
+            with open(meta_path, "w") as f:
+                json.dump(meta, f)
+
+        size_after = os.path.getsize(success_path)
+        entry.update(status='recompressed', bytes_after=size_after, output=success_path)
+        stats['files'] += 1
+        stats['bytes_before'] += size_before
+        stats['bytes_after'] += size_after
+        stats['entries'].append(entry)
+
+    return stats
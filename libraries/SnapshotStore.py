@@ -0,0 +1,437 @@
+"""
+SnapshotStore - Storage Backends for Last Known Good Snapshots
+
+An element's last known good state is a minified HTML slice, a small metadata dict (element
+rect, crop box) and optionally a cropped success screenshot with a thumbnail. Two backends,
+selected with ${SNAPSHOT_STORE}:
+
+- 'files' (DirectorySnapshotStore): loose files under locators/dom_snapshots/{page}/
+  ({element}.html, {element}_meta.json, {element}_success.{ext}, {element}_thumb.{ext}).
+- 'packed' (PackedSnapshotStore): one SQLite file per page, locators/dom_snapshots/{page}.snapshots.db,
+  with a manifest table and content-addressed blobs. Identical snippets and images are stored
+  once, and a suite produces one file per page instead of thousands of small ones.
+
+Both load a page's manifest (the elements that have a snapshot) once and answer existence
+checks from memory. The manifest also holds each snapshot's structural fingerprint (stored in
+its metadata), so a lookup can tell whether the element drifted without reading the snapshot.
+Convert between the layouts with scripts/pack_snapshots.py.
+The stores are used from the main thread and the snapshot writer thread.
+"""
+
+import os
+import json
+import glob
+import zlib
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import closing
+from datetime import datetime
+
+try:
+    from libraries import SnapshotImages
+except ImportError:
+    import SnapshotImages
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_ROOT = os.path.join("locators", "dom_snapshots")
+
+PACK_SUFFIX = ".snapshots.db"
+
+# Manifest value of a snapshot whose metadata (and fingerprint) has not been read yet
+_UNREAD = object()
+
+
+class SnapshotStore:
+    """
+    Common manifest handling. Backends implement _load_manifest, save, delete and the readers.
+    """
+
+    kind = None
+
+    def __init__(self, root=DEFAULT_SNAPSHOT_ROOT):
+        self.root = root
+        self._manifests = {}
+        self._lock = threading.Lock()
+
+    def _manifest(self, page_name):
+        with self._lock:
+            manifest = self._manifests.get(page_name)
+            if manifest is None:
+                manifest = self._manifests[page_name] = self._load_manifest(page_name)
+            return manifest
+
+    def _remember(self, page_name, element_name, present=True, meta=None):
+        manifest = self._manifest(page_name)
+        with self._lock:
+            if present:
+                manifest[element_name] = (meta or {}).get('fingerprint')
+            else:
+                manifest.pop(element_name, None)
+
+    def exists(self, page_name, element_name):
+        """
+        Whether the element has a snapshot. Answered from the page manifest loaded on first use.
+        """
+        return element_name in self._manifest(page_name)
+
+    def elements(self, page_name):
+        return sorted(self._manifest(page_name))
+
+    def fingerprint(self, page_name, element_name):
+        """
+        Returns the structural fingerprint stored with the element's snapshot, or None
+        (no snapshot, or one written before fingerprints were recorded).
+        """
+        manifest = self._manifest(page_name)
+        fingerprint = manifest.get(element_name)
+        if fingerprint is _UNREAD:
+            fingerprint = (self.load_meta(page_name, element_name) or {}).get('fingerprint')
+            with self._lock:
+                if manifest.get(element_name) is _UNREAD:
+                    manifest[element_name] = fingerprint
+        return fingerprint
+
+    def record_fingerprint(self, page_name, element_name, fingerprint):
+        """
+        Adopts a fingerprint for an existing snapshot without rewriting the snapshot. It is added to the
+        snapshot's stored metadata; a snapshot saved without metadata gets none created and only keeps
+        the fingerprint in the manifest for the rest of the run.
+        """
+        meta = self.load_meta(page_name, element_name)
+        if meta is not None:
+            self._save_meta(page_name, element_name, dict(meta, fingerprint=fingerprint))
+        self._remember(page_name, element_name, meta={'fingerprint': fingerprint})
+
+    def read(self, page_name, element_name):
+        """
+        Returns the full snapshot {'html', 'meta', 'image', 'thumbnail', 'image_ext'}, or None.
+        'meta' is None when none was stored.
+        """
+        html = self.load_html(page_name, element_name)
+        if html is None:
+            return None
+        image, thumbnail, image_ext = self._load_images(page_name, element_name)
+        return {'html': html, 'meta': self.load_meta(page_name, element_name), 'image': image,
+                'thumbnail': thumbnail, 'image_ext': image_ext}
+
+    def load_image(self, page_name, element_name):
+        """
+        Returns the encoded success screenshot (bytes), or None.
+        """
+        return self._load_images(page_name, element_name)[0]
+
+
+class DirectorySnapshotStore(SnapshotStore):
+    """
+    Loose files, one directory per page. Each directory is listed once instead of probing a file per check;
+    a snapshot's metadata is read for its fingerprint on first request.
+    """
+
+    kind = 'files'
+
+    def _page_dir(self, page_name):
+        return os.path.join(self.root, page_name)
+
+    def _load_manifest(self, page_name):
+        try:
+            names = os.listdir(self._page_dir(page_name))
+        except OSError:
+            return {}
+        return {name[:-len(".html")]: _UNREAD for name in names if name.endswith(".html")}
+
+    def pages(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+
+    def save(self, page_name, element_name, html, meta, image=None, thumbnail=None, image_ext=None):
+        """
+        Writes the snapshot. Without an image, a previously stored screenshot is kept.
+        """
+        snapshot_dir = self._page_dir(page_name)
+        os.makedirs(snapshot_dir, exist_ok=True)
+        with open(os.path.join(snapshot_dir, f"{element_name}.html"), "w", encoding="utf-8") as f:
+            f.write(html)
+        if image is not None:
+            SnapshotImages.write_success_images(snapshot_dir, element_name, image, thumbnail, image_ext)
+        if meta is not None:
+            with open(os.path.join(snapshot_dir, f"{element_name}_meta.json"), "w") as f:
+                json.dump(meta, f)
+        self._remember(page_name, element_name, meta=meta)
+
+    def delete(self, page_name, element_name):
+        snapshot_dir = self._page_dir(page_name)
+        paths = [os.path.join(snapshot_dir, f"{element_name}.html"), os.path.join(snapshot_dir, f"{element_name}_meta.json")]
+        for suffix in (SnapshotImages.SUCCESS_SUFFIX, SnapshotImages.THUMBNAIL_SUFFIX):
+            paths += [os.path.join(snapshot_dir, f"{element_name}{suffix}.{ext}") for ext in set(SnapshotImages.FORMAT_EXTENSIONS.values())]
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+        self._remember(page_name, element_name, present=False)
+        if os.path.isdir(snapshot_dir) and not os.listdir(snapshot_dir):
+            os.rmdir(snapshot_dir)
+
+    def load_html(self, page_name, element_name):
+        html_path = os.path.join(self._page_dir(page_name), f"{element_name}.html")
+        if not os.path.exists(html_path):
+            return None
+        with open(html_path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def load_meta(self, page_name, element_name):
+        meta_path = os.path.join(self._page_dir(page_name), f"{element_name}_meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            return json.load(f)
+
+    def _save_meta(self, page_name, element_name, meta):
+        with open(os.path.join(self._page_dir(page_name), f"{element_name}_meta.json"), "w") as f:
+            json.dump(meta, f)
+
+    def _load_images(self, page_name, element_name):
+        snapshot_dir = self._page_dir(page_name)
+        image_path = SnapshotImages.find_success_image(snapshot_dir, element_name)
+        if not image_path:
+            return None, None, None
+        image_ext = image_path.rsplit('.', 1)[-1]
+        with open(image_path, "rb") as f:
+            image = f.read()
+        thumbnail = None
+        thumb_path = os.path.join(snapshot_dir, f"{element_name}{SnapshotImages.THUMBNAIL_SUFFIX}.{image_ext}")
+        if os.path.exists(thumb_path):
+            with open(thumb_path, "rb") as f:
+                thumbnail = f.read()
+        return image, thumbnail, image_ext
+
+
+class PackedSnapshotStore(SnapshotStore):
+    """
+    One SQLite file per page: a `snapshots` manifest row per element pointing at content-addressed
+    `blobs` (HTML is zlib-compressed, images are stored as encoded). Blobs no longer referenced
+    after an overwrite are removed in the same transaction.
+    """
+
+    kind = 'packed'
+
+    SCHEMA = [
+        """
+        CREATE TABLE IF NOT EXISTS blobs (
+            hash TEXT PRIMARY KEY,
+            data BLOB NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS snapshots (
+            element TEXT PRIMARY KEY,
+            html_hash TEXT NOT NULL,
+            meta TEXT,
+            image_hash TEXT,
+            thumb_hash TEXT,
+            image_ext TEXT,
+            updated TEXT
+        )
+        """
+    ]
+
+    def __init__(self, root=DEFAULT_SNAPSHOT_ROOT):
+        super().__init__(root)
+        self._initialized = set()
+
+    def _pack_path(self, page_name):
+        return os.path.join(self.root, f"{page_name}{PACK_SUFFIX}")
+
+    def _connect(self, page_name, create=False):
+        """
+        Opens the page's pack, or returns None if it does not exist and create is False.
+        """
+        path = self._pack_path(page_name)
+        if not create and not os.path.exists(path):
+            return None
+        os.makedirs(self.root, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        if page_name not in self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+            self._initialized.add(page_name)
+        return conn
+
+    def _load_manifest(self, page_name):
+        conn = self._connect(page_name)
+        if conn is None:
+            return {}
+        with closing(conn):
+            rows = conn.execute("SELECT element, meta FROM snapshots").fetchall()
+        return {element: (json.loads(meta) if meta else {}).get('fingerprint') for element, meta in rows}
+
+    def pages(self):
+        return sorted(os.path.basename(path)[:-len(PACK_SUFFIX)] for path in glob.glob(os.path.join(glob.escape(self.root), f"*{PACK_SUFFIX}")))
+
+    @staticmethod
+    def _put_blob(conn, data):
+        if data is None:
+            return None
+        digest = hashlib.sha256(data).hexdigest()
+        conn.execute("INSERT OR IGNORE INTO blobs (hash, data) VALUES (?, ?)", (digest, data))
+        return digest
+
+    @staticmethod
+    def _drop_orphans(conn, hashes):
+        for digest in set(h for h in hashes if h):
+            conn.execute("""
+                DELETE FROM blobs WHERE hash = ? AND NOT EXISTS (
+                    SELECT 1 FROM snapshots WHERE html_hash = ? OR image_hash = ? OR thumb_hash = ?
+                )
+            """, (digest, digest, digest, digest))
+
+    def save(self, page_name, element_name, html, meta, image=None, thumbnail=None, image_ext=None):
+        """
+        Writes the snapshot. Without an image, a previously stored screenshot is kept.
+        """
+        with closing(self._connect(page_name, create=True)) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                old = conn.execute("SELECT html_hash, image_hash, thumb_hash, image_ext FROM snapshots WHERE element = ?",
+                                   (element_name,)).fetchone()
+                html_hash = self._put_blob(conn, zlib.compress(html.encode('utf-8')))
+                if image is not None:
+                    image_hash, thumb_hash = self._put_blob(conn, image), self._put_blob(conn, thumbnail)
+                elif old:
+                    image_hash, thumb_hash, image_ext = old[1], old[2], old[3]
+                else:
+                    image_hash = thumb_hash = image_ext = None
+                conn.execute("INSERT OR REPLACE INTO snapshots (element, html_hash, meta, image_hash, thumb_hash, image_ext, updated) "
+                             "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (element_name, html_hash, json.dumps(meta) if meta is not None else None, image_hash, thumb_hash, image_ext, datetime.now().isoformat()))
+                if old:
+                    self._drop_orphans(conn, old[:3])
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        self._remember(page_name, element_name, meta=meta)
+
+    def delete(self, page_name, element_name):
+        conn = self._connect(page_name)
+        if conn is None:
+            return
+        with closing(conn):
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                old = conn.execute("SELECT html_hash, image_hash, thumb_hash FROM snapshots WHERE element = ?", (element_name,)).fetchone()
+                conn.execute("DELETE FROM snapshots WHERE element = ?", (element_name,))
+                if old:
+                    self._drop_orphans(conn, old)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            remaining = conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+        self._remember(page_name, element_name, present=False)
+        if not remaining:
+            # An empty pack is removed like an empty page directory
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(self._pack_path(page_name) + suffix):
+                    os.remove(self._pack_path(page_name) + suffix)
+            self._initialized.discard(page_name)
+
+    def _row(self, page_name, element_name, columns):
+        conn = self._connect(page_name)
+        if conn is None:
+            return None
+        with closing(conn):
+            return conn.execute(f"SELECT {columns} FROM snapshots WHERE element = ?", (element_name,)).fetchone()
+
+    def _blob(self, page_name, digest):
+        conn = self._connect(page_name) if digest else None
+        if conn is None:
+            return None
+        with closing(conn):
+            row = conn.execute("SELECT data FROM blobs WHERE hash = ?", (digest,)).fetchone()
+        return row[0] if row else None
+
+    def load_html(self, page_name, element_name):
+        row = self._row(page_name, element_name, "html_hash")
+        if not row:
+            return None
+        data = self._blob(page_name, row[0])
+        return zlib.decompress(data).decode('utf-8') if data is not None else None
+
+    def load_meta(self, page_name, element_name):
+        row = self._row(page_name, element_name, "meta")
+        return json.loads(row[0]) if row and row[0] else None
+
+    def _save_meta(self, page_name, element_name, meta):
+        with closing(self._connect(page_name, create=True)) as conn:
+            conn.execute("UPDATE snapshots SET meta = ? WHERE element = ?", (json.dumps(meta), element_name))
+
+    def _load_images(self, page_name, element_name):
+        row = self._row(page_name, element_name, "image_hash, thumb_hash, image_ext")
+        if not row or not row[0]:
+            return None, None, None
+        return self._blob(page_name, row[0]), self._blob(page_name, row[1]), row[2]
+
+    def compact(self, page_name):
+        """
+        Rewrites the page's pack without free pages (after bulk conversions or deletes).
+        """
+        conn = self._connect(page_name)
+        if conn is None:
+            return
+        with closing(conn):
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("VACUUM")
+
+    def stats(self, page_name):
+        """
+        Returns {'snapshots', 'blobs', 'bytes'} for a page's pack.
+        """
+        conn = self._connect(page_name)
+        if conn is None:
+            return {'snapshots': 0, 'blobs': 0, 'bytes': 0}
+        with closing(conn):
+            snapshots = conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+            blobs, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM blobs").fetchone()
+        return {'snapshots': snapshots, 'blobs': blobs, 'bytes': size}
+
+
+STORES = {'files': DirectorySnapshotStore, 'packed': PackedSnapshotStore}
+
+
+def create_store(kind='files', root=DEFAULT_SNAPSHOT_ROOT):
+    """
+    Returns the snapshot store for ${SNAPSHOT_STORE} ('files' or 'packed').
+    """
+    kind = str(kind or 'files').lower()
+    if kind not in STORES:
+        logger.warning(f"Unknown snapshot store '{kind}'. Using 'files'.")
+        kind = 'files'
+    return STORES[kind](root)
+
+
+def convert(source, target, pages=None, delete_source=False):
+    """
+    Copies every snapshot from one store to another (e.g. loose files into page packs).
+
+    Returns:
+        dict: {'pages': n, 'snapshots': n}
+    """
+    stats = {'pages': 0, 'snapshots': 0}
+    for page_name in (pages or source.pages()):
+        elements = source.elements(page_name)
+        if not elements:
+            continue
+        stats['pages'] += 1
+        for element_name in elements:
+            record = source.read(page_name, element_name)
+            if record is None:
+                continue
+            target.save(page_name, element_name, record['html'], record['meta'], record['image'], record['thumbnail'], record['image_ext'])
+            stats['snapshots'] += 1
+            if delete_source:
+                source.delete(page_name, element_name)
+    return stats
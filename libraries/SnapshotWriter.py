@@ -0,0 +1,104 @@
+"""
+SnapshotWriter - Background Worker for DOM/Visual Snapshot Persistence
+
+Saving a "last known good" snapshot used to run inline on the success path of every
+Smart keyword: HTML minification, PNG encoding and file writes all happened before the
+keyword returned. The rescuer now captures only the raw data synchronously (ancestry HTML,
+element rect and viewport screenshot bytes) and hands it to this worker, which runs the
+expensive part on a background thread.
+
+The queue is bounded so memory stays capped; when it is full, submit() waits briefly and
+then drops the job (the snapshot is simply captured again on a later successful find).
+"""
+
+import atexit
+import queue
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotWriter:
+    """
+    Runs snapshot write jobs on a single daemon thread with a bounded queue.
+    """
+
+    def __init__(self, handler, max_queue=32, put_timeout=1.0):
+        """
+        Args:
+            handler (callable): Called with each job dict on the worker thread.
+            max_queue (int): Maximum number of pending jobs.
+            put_timeout (float): Seconds submit() waits for a free slot before dropping a job.
+        """
+        self.handler = handler
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._atexit_registered = False
+        self.dropped = 0
+        self.written = 0
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="SnapshotWriter", daemon=True)
+            self._thread.start()
+            if not self._atexit_registered:
+                # Never lose queued snapshots when the interpreter exits without an explicit flush()
+                atexit.register(self.flush)
+                self._atexit_registered = True
+
+    def submit(self, key, job):
+        """
+        Queues a job identified by `key` (e.g. (page, element)).
+
+        Returns:
+            bool: False if the job was dropped because the queue stayed full.
+        """
+        self._ensure_started()
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + 1
+        try:
+            self._queue.put((key, job), timeout=self.put_timeout)
+            return True
+        except queue.Full:
+            self._release(key)
+            self.dropped += 1
+            logger.warning(f"SnapshotWriter: Queue full, dropped snapshot job for {key}.")
+            return False
+
+    def is_pending(self, key):
+        """
+        True if a job for `key` is queued or being written.
+        """
+        with self._lock:
+            return key in self._pending
+
+    def _release(self, key):
+        with self._lock:
+            remaining = self._pending.get(key, 0) - 1
+            if remaining > 0:
+                self._pending[key] = remaining
+            else:
+                self._pending.pop(key, None)
+
+    def flush(self):
+        """
+        Blocks until every queued job has been written.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def _run(self):
+        while True:
+            key, job = self._queue.get()
+            try:
+                self.handler(job)
+                self.written += 1
+            except Exception as e:
+                logger.warning(f"SnapshotWriter: Failed to write snapshot for {key}: {e}")
+            finally:
+                self._release(key)
+                self._queue.task_done()
@@ -0,0 +1,22 @@
+import os
+import sys
+import argparse
+
+# Ensure libraries path is in sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'libraries'))
+from HealingLog import HEALING_LOG, LEGACY_HEALING_LOG, compact
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact the healing log to the latest event per element")
+    parser.add_argument("--log", default=HEALING_LOG, help=f"JSONL healing log (default: {HEALING_LOG})")
+    parser.add_argument("--legacy", default=LEGACY_HEALING_LOG, help=f"Legacy JSON array log (default: {LEGACY_HEALING_LOG})")
+    parser.add_argument("--fold-legacy", action="store_true", help="Merge the legacy JSON log into the JSONL log and remove it")
+    args = parser.parse_args()
+
+    before, after = compact(args.log, args.legacy, fold_legacy=args.fold_legacy)
+    print(f"Compacted {args.log}: {before} events -> {after} elements.")
+
+
+if __name__ == "__main__":
+    main()
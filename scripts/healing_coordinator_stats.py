@@ -0,0 +1,26 @@
+import os
+import sys
+import json
+import argparse
+
+# Ensure libraries path is in sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'libraries'))
+from HealingCoordinator import HealingCoordinator, DEFAULT_DB_FILE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show inflight heals and queue depth of the shared healing coordinator")
+    parser.add_argument("--db", default=DEFAULT_DB_FILE, help=f"Coordinator database (default: {DEFAULT_DB_FILE})")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"No coordinator database found at {args.db}.")
+        return
+
+    stats = HealingCoordinator(db_path=args.db).stats()
+    # Per-process counters are meaningless for this one-off reader
+    print(json.dumps({k: stats[k] for k in ('inflight', 'queue_depth', 'done', 'failed')}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import os
+import sys
+import argparse
+
+# Ensure libraries path is in sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'libraries'))
+import SnapshotStore
+
+SNAPSHOT_ROOT = SnapshotStore.DEFAULT_SNAPSHOT_ROOT
+
+
+def tree_size(root, packed):
+    """
+    Returns (files, bytes) of one snapshot layout under root.
+    """
+    files, size = 0, 0
+    if not os.path.isdir(root):
+        return files, size
+    for dir_path, _, names in os.walk(root):
+        for name in names:
+            if name.endswith(SnapshotStore.PACK_SUFFIX) != packed:
+                continue
+            files += 1
+            size += os.path.getsize(os.path.join(dir_path, name))
+    return files, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert DOM snapshots between loose files (locators/dom_snapshots/{page}/) and one packed SQLite file per page")
+    parser.add_argument("--root", type=str, default=SNAPSHOT_ROOT, help="Snapshot directory (default: locators/dom_snapshots)")
+    parser.add_argument("--pages", nargs="*", help="Only convert these pages")
+    parser.add_argument("--unpack", action="store_true", help="Convert packed pages back to loose files")
+    parser.add_argument("--delete", action="store_true", help="Remove the source files once a snapshot is converted")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be converted")
+    args = parser.parse_args()
+
+    files_store = SnapshotStore.DirectorySnapshotStore(args.root)
+    packed_store = SnapshotStore.PackedSnapshotStore(args.root)
+    source, target = (packed_store, files_store) if args.unpack else (files_store, packed_store)
+
+    pages = args.pages or source.pages()
+    if not pages:
+        print(f"No {source.kind} snapshots found under {args.root}. Nothing to do.")
+        return
+
+    if args.dry_run:
+        for page_name in pages:
+            print(f"[dry-run] {page_name}: {len(source.elements(page_name))} snapshots")
+        files, size = tree_size(args.root, packed=args.unpack)
+        print(f"{files} file(s) ({size} bytes) would be converted from {source.kind} to {target.kind}.")
+        return
+
+    files_before, bytes_before = tree_size(args.root, packed=args.unpack)
+    print(f"Converting {len(pages)} page(s) under {args.root} from {source.kind} to {target.kind}...")
+    stats = SnapshotStore.convert(source, target, pages=pages, delete_source=args.delete)
+
+    if not args.unpack:
+        for page_name in pages:
+            packed_store.compact(page_name)
+            pack = packed_store.stats(page_name)
+            print(f"  {page_name}: {pack['snapshots']} snapshots in {pack['blobs']} unique blobs ({pack['bytes']} bytes)")
+    files_after, bytes_after = tree_size(args.root, packed=not args.unpack)
+    print(f"Converted {stats['snapshots']} snapshots of {stats['pages']} page(s): "
+          f"{files_before} file(s), {bytes_before} bytes -> {files_after} file(s), {bytes_after} bytes.")
+    if not args.delete:
+        print("Source files were kept; re-run with --delete to remove them.")
+
+
+if __name__ == "__main__":
+    main()
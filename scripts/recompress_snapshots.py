@@ -0,0 +1,51 @@
+import os
+import sys
+import argparse
+
+# Ensure libraries path is in sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'libraries'))
+import SnapshotImages
+
+SNAPSHOT_ROOT = os.path.join("locators", "dom_snapshots")
+
+def main():
+    parser = argparse.ArgumentParser(description="Crop and recompress existing success screenshots in the snapshot tree")
+    parser.add_argument("--root", type=str, default=SNAPSHOT_ROOT, help="Snapshot directory (default: locators/dom_snapshots)")
+    parser.add_argument("--format", type=str, default="webp", choices=["webp", "jpeg", "png"], help="Target image format")
+    parser.add_argument("--quality", type=int, default=80, help="Encoder quality for webp/jpeg")
+    parser.add_argument("--margin", type=int, default=200, help="Pixels kept around the highlighted element")
+    parser.add_argument("--thumbnail-size", type=int, default=160, help="Longest side of the thumbnail in pixels")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be converted")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print(f"Snapshot directory {args.root} not found. Nothing to do.")
+        return
+
+    print(f"Recompressing snapshots under {args.root} to {args.format} (quality {args.quality})...")
+    stats = SnapshotImages.recompress_tree(
+        args.root,
+        image_format=args.format,
+        quality=args.quality,
+        margin=args.margin,
+        thumbnail_size=args.thumbnail_size,
+        dry_run=args.dry_run
+    )
+
+    for entry in stats['entries']:
+        if entry['status'] == 'dry-run':
+            print(f"[dry-run] {entry['path']}: {entry['bytes_before']} bytes, element box {entry['box']}")
+        elif entry['status'] == 'recompressed':
+            print(f"{entry['path']} -> {entry['output']}: {entry['bytes_before']} -> {entry['bytes_after']} bytes")
+        else:
+            print(f"Skipped {entry['path']} ({'already cropped' if entry['status'] == 'cropped' else 'already ' + args.format})")
+    if stats['skipped']:
+        print(f"{stats['skipped']} images were already recompressed.")
+
+    if args.dry_run:
+        print(f"{stats['files']} images ({stats['bytes_before']} bytes) would be recompressed.")
+    else:
+        print(f"Recompressed {stats['files']} images: {stats['bytes_before']} -> {stats['bytes_after']} bytes.")
+
+if __name__ == "__main__":
+    main()
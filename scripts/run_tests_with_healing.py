@@ -3,10 +3,13 @@ import sys
 import subprocess
 import xml.etree.ElementTree as ET
 
+# Ensure libraries path is in sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'libraries'))
+from HealingLog import HEALING_LOG, LEGACY_HEALING_LOG, read_latest
+
 # Configuration
 TEST_COMMAND = ["robot", "--outputdir", "results", "tests"]
 OUTPUT_XML = os.path.join("results", "output.xml")
-HEALING_LOG = "healing_log.json"
 CREATE_PR_SCRIPT = os.path.join(os.path.dirname(__file__), "create_pr.py")
 
 def run_tests():
@@ -35,16 +38,14 @@ def main():
     run_tests()
     
     # 2. Check for Healing Log
-    if not os.path.exists(HEALING_LOG):
+    if not os.path.exists(HEALING_LOG) and not os.path.exists(LEGACY_HEALING_LOG):
         print("No healing log found. No self-healing actions to process.")
         return
 
-    # Check if log is empty or just "[]"
-    with open(HEALING_LOG, 'r') as f:
-        content = f.read().strip()
-        if not content or content == "[]":
-            print("Healing log is empty. No changes to PR.")
-            return
+    # Check if the log holds any healed element
+    if not read_latest():
+        print("Healing log is empty. No changes to PR.")
+        return
 
     # 3. Get Suite Name
     suite_name = get_suite_name_from_xml(OUTPUT_XML)
@@ -0,0 +1,77 @@
+import json
+import os
+import sys
+
+# Ensure libraries path is in sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'libraries'))
+
+from DomContextBuilder import DEFAULT_BUDGET_CHARS, DomContextBuilder
+
+
+def _html_rows(count, target_at=None):
+    rows = []
+    for i in range(count):
+        if i == target_at:
+            rows.append('<tr><td><button id="submit-order" class="btn primary">Submit order</button></td></tr>')
+        rows.append(f'<tr class="row"><td>item {i} lorem ipsum</td><td><a href="/item/{i}">details</a></td></tr>')
+    return f'<body><div id="app"><table>{"".join(rows)}</table></div></body>'
+
+
+def _json_tree(count, target_at=None):
+    rows = []
+    for i in range(count):
+        if i == target_at:
+            rows.append({"t": "tr", "c": [{"t": "td", "c": [{"t": "button", "a": {"id": "submit-order", "class": "btn primary"}, "c": ["Submit order"]}]}]})
+        rows.append({"t": "tr", "a": {"class": "row"}, "c": [{"t": "td", "c": [f"item {i} lorem ipsum"]}]})
+    return json.dumps({"t": "body", "c": [{"t": "div", "a": {"id": "app"}, "c": [{"t": "table", "c": rows}]}]}, separators=(',', ':'))
+
+
+def test_dom_within_budget_is_returned_unchanged():
+    html = _html_rows(5)
+    assert DomContextBuilder(budget_chars=len(html)).build(html, 'id:submit-order') is html
+
+
+def test_target_deep_in_a_large_dom_is_packed_within_budget():
+    html = _html_rows(2000, target_at=1500)
+    context = DomContextBuilder(budget_chars=3000).build(html, 'id:submit-order', element_name='submit_order')
+
+    assert len(context) <= 3000
+    assert 'id="submit-order"' in context
+    assert 'path: body > div#app > table' in context
+
+
+def test_build_many_keeps_every_target():
+    html = _html_rows(2000, target_at=1500).replace('item 10 lorem', '<span id="cancel-order">Cancel</span>')
+    targets = [{'old_locator': 'id:submit-order', 'last_known_good': None, 'element_name': 'submit_order'},
+               {'old_locator': 'id:cancel-order', 'last_known_good': None, 'element_name': 'cancel_order'}]
+    context = DomContextBuilder(budget_chars=3000).build_many(html, targets)
+
+    assert 'submit-order' in context and 'cancel-order' in context
+
+
+def test_json_dom_is_packed_into_valid_json():
+    text = _json_tree(2000, target_at=1500)
+    for budget in (600, 3000):
+        context = DomContextBuilder(budget_chars=budget).build(text, 'id:submit-order', element_name='submit_order', dom_format='json')
+
+        assert len(context) <= budget
+        excerpt = json.loads(context)
+        assert excerpt['excerpt_of'] == len(text)
+        assert 'submit-order' in json.dumps(excerpt['blocks'][0]['node'])
+
+
+def test_json_dom_without_relevant_nodes_keeps_whole_nodes_from_the_top():
+    text = _json_tree(2000)
+    context = DomContextBuilder(budget_chars=1000).build(text, 'id:nothing-like-this', dom_format='json')
+
+    assert len(context) <= 1000
+    block = json.loads(context)['blocks'][0]
+    assert block['path'] == 'body'
+    assert block['node']['c'][0]['a'] == {'id': 'app'}
+
+
+def test_malformed_budget_falls_back_to_default():
+    for budget in ('8k', '', None, 'many tokens', 0):
+        assert DomContextBuilder.from_budget(budget).budget_chars == DEFAULT_BUDGET_CHARS
+    assert DomContextBuilder.from_budget('4000 tokens').budget_chars == 16000
+    assert DomContextBuilder.from_budget(' 9000 ').budget_chars == 9000
@@ -0,0 +1,114 @@
+import os
+import sys
+
+# Ensure libraries path is in sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'libraries'))
+
+from ElementHandleCache import ElementHandleCache
+
+
+class _FakePage:
+    """Driver double that evaluates the cache's scripts against a locator -> elements map."""
+
+    session_id = 'session-1'
+
+    def __init__(self, dom):
+        self.dom = dom
+        self.doc = 'doc-1'
+        self.gen = 0
+        self.hidden = set()
+
+    def execute_script(self, script, *args):
+        if script == ElementHandleCache.STATE_JS:
+            return {'doc': self.doc, 'gen': self.gen}
+        assert script == ElementHandleCache.CONFIRM_JS
+        elements, doc, gen, loc_type, loc_value = args
+        if doc != self.doc:
+            return {'status': 'navigated'}
+        if gen != self.gen:
+            return {'status': 'mutated'}
+        if self.dom.get((loc_type, loc_value), []) != elements:
+            return {'status': 'changed'}
+        if any(element in self.hidden for element in elements):
+            return {'status': 'hidden'}
+        return {'status': 'ok'}
+
+
+def test_healed_element_is_served_from_cache_while_original_locator_stays_broken():
+    page = _FakePage({('css', '#save-v2'): ['save']})
+    cache = ElementHandleCache()
+    cache.put(page, 'Form', 'save', 'id', 'save', ['save'], found_by=('css', '#save-v2'))
+
+    assert cache.get(page, 'Form', 'save', 'id', 'save') == ['save']
+    assert cache.get(page, 'Form', 'save', 'id', 'save') == ['save']
+    assert cache.stats['hits'] == 2
+
+
+def test_entry_without_found_by_is_confirmed_with_its_own_locator():
+    page = _FakePage({('id', 'save'): ['save']})
+    cache = ElementHandleCache()
+    cache.put(page, 'Form', 'save', 'id', 'save', ['save'])
+
+    assert cache.get(page, 'Form', 'save', 'id', 'save') == ['save']
+    page.dom[('id', 'save')] = ['other']
+    assert cache.get(page, 'Form', 'save', 'id', 'save') is None
+    assert cache.stats['changed'] == 1
+
+
+def test_structural_change_drops_the_entry():
+    page = _FakePage({('id', 'save'): ['save']})
+    cache = ElementHandleCache()
+    cache.put(page, 'Form', 'save', 'id', 'save', ['save'])
+
+    page.gen += 1
+    assert cache.get(page, 'Form', 'save', 'id', 'save') is None
+    assert cache.stats['mutated'] == 1
+    page.gen -= 1
+    assert cache.get(page, 'Form', 'save', 'id', 'save') is None
+
+
+def test_navigation_drops_every_entry_of_the_old_document():
+    page = _FakePage({('id', 'save'): ['save'], ('id', 'cancel'): ['cancel']})
+    cache = ElementHandleCache()
+    cache.put_many(page, [('Form', 'save', 'id', 'save', ['save']), ('Form', 'cancel', 'id', 'cancel', ['cancel'])])
+
+    page.doc = 'doc-2'
+    assert cache.get(page, 'Form', 'save', 'id', 'save') is None
+    assert cache.stats['navigated'] == 1
+    page.doc = 'doc-1'
+    assert cache.get(page, 'Form', 'cancel', 'id', 'cancel') is None
+
+
+def test_hidden_element_is_not_served():
+    page = _FakePage({('id', 'save'): ['save']})
+    cache = ElementHandleCache()
+    cache.put(page, 'Form', 'save', 'id', 'save', ['save'])
+
+    page.hidden.add('save')
+    assert cache.get(page, 'Form', 'save', 'id', 'save') is None
+    assert cache.stats['stale'] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    page = _FakePage({('id', 'a'): ['a'], ('id', 'b'): ['b'], ('id', 'c'): ['c']})
+    cache = ElementHandleCache(max_entries=2)
+    cache.put(page, 'Form', 'a', 'id', 'a', ['a'])
+    cache.put(page, 'Form', 'b', 'id', 'b', ['b'])
+    assert cache.get(page, 'Form', 'a', 'id', 'a') == ['a']
+    cache.put(page, 'Form', 'c', 'id', 'c', ['c'])
+
+    assert cache.get(page, 'Form', 'b', 'id', 'b') is None
+    assert cache.get(page, 'Form', 'a', 'id', 'a') == ['a']
+
+
+def test_invalidate_drops_one_page_or_everything():
+    page = _FakePage({('id', 'save'): ['save'], ('id', 'menu'): ['menu']})
+    cache = ElementHandleCache()
+    cache.put_many(page, [('Form', 'save', 'id', 'save', ['save']), ('Home', 'menu', 'id', 'menu', ['menu'])])
+
+    cache.invalidate('Form')
+    assert cache.get(page, 'Form', 'save', 'id', 'save') is None
+    assert cache.get(page, 'Home', 'menu', 'id', 'menu') == ['menu']
+
+    cache.invalidate()
+    assert cache.get(page, 'Home', 'menu', 'id', 'menu') is None
@@ -0,0 +1,40 @@
+import os
+import sys
+import threading
+import time
+
+# Ensure libraries path is in sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'libraries'))
+
+from HealingCoordinator import LEADER, SHARED, HealingCoordinator
+
+
+def test_leader_keeps_lease_while_healing_longer_than_lease_seconds(tmp_path):
+    db_path = str(tmp_path / "coordinator.db")
+    leader = HealingCoordinator(db_path, lease_seconds=0.6, poll_interval=0.05)
+    waiter = HealingCoordinator(db_path, lease_seconds=0.6, poll_interval=0.05)
+
+    role, flight = leader.acquire('Login', 'submit', 'dom')
+    assert role == LEADER
+
+    outcome = {}
+    thread = threading.Thread(target=lambda: outcome.update(result=waiter.acquire('Login', 'submit', 'dom', wait_timeout=5)))
+    thread.start()
+    time.sleep(2)
+    leader.release(flight, {'type': 'id', 'value': 'submit-v2'})
+    thread.join()
+
+    assert outcome['result'] == (SHARED, {'type': 'id', 'value': 'submit-v2'})
+    assert waiter.led == 0
+
+
+def test_expired_lease_without_heartbeat_is_taken_over(tmp_path):
+    db_path = str(tmp_path / "coordinator.db")
+    crashed = HealingCoordinator(db_path, lease_seconds=0.3, poll_interval=0.05)
+    role, flight = crashed.acquire('Login', 'submit', 'dom')
+    assert role == LEADER
+    # A crashed leader's heartbeat dies with it
+    crashed._heartbeats.pop(flight['flight_id']).set()
+
+    role, _ = HealingCoordinator(db_path, lease_seconds=0.3, poll_interval=0.05).acquire('Login', 'submit', 'dom', wait_timeout=5)
+    assert role == LEADER
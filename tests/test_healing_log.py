@@ -0,0 +1,51 @@
+import json
+import os
+import sys
+
+# Ensure libraries path is in sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'libraries'))
+
+import HealingLog
+
+
+def _event(page, name, value):
+    return {'page': page, 'name': name, 'new_type': 'id', 'new_value': value}
+
+
+def test_compaction_keeps_the_latest_event_per_element_in_order(tmp_path):
+    log_file = str(tmp_path / "healing_log.jsonl")
+    for event in [_event('Login', 'user', 'u1'), _event('Login', 'pass', 'p1'), _event('Login', 'user', 'u2')]:
+        HealingLog.append_event(event, log_file=log_file)
+
+    assert HealingLog.compact(log_file=log_file, legacy_file=None) == (3, 2)
+    assert HealingLog.read_events(log_file, legacy_file=None) == [_event('Login', 'pass', 'p1'), _event('Login', 'user', 'u2')]
+    assert not os.path.exists(f"{log_file}.tmp")
+
+
+def test_partially_written_line_is_skipped_and_dropped_by_compaction(tmp_path):
+    log_file = str(tmp_path / "healing_log.jsonl")
+    HealingLog.append_event(_event('Login', 'user', 'u1'), log_file=log_file)
+    with open(log_file, 'a', encoding='utf-8') as f:
+        f.write('{"page": "Login", "na')
+
+    assert HealingLog.read_events(log_file, legacy_file=None) == [_event('Login', 'user', 'u1')]
+    assert HealingLog.compact(log_file=log_file, legacy_file=None) == (1, 1)
+    with open(log_file, encoding='utf-8') as f:
+        assert f.read() == json.dumps(_event('Login', 'user', 'u1')) + "\n"
+
+
+def test_legacy_entries_are_read_first_and_folded_on_request(tmp_path):
+    log_file = str(tmp_path / "healing_log.jsonl")
+    legacy_file = str(tmp_path / "healing_log.json")
+    with open(legacy_file, 'w', encoding='utf-8') as f:
+        json.dump([_event('Login', 'user', 'legacy'), _event('Home', 'menu', 'm1')], f)
+    HealingLog.append_event(_event('Login', 'user', 'u2'), log_file=log_file)
+
+    assert HealingLog.read_latest(log_file, legacy_file) == [_event('Home', 'menu', 'm1'), _event('Login', 'user', 'u2')]
+    # Without fold_legacy the legacy file is left alone
+    assert HealingLog.compact(log_file=log_file, legacy_file=legacy_file) == (1, 1)
+    assert os.path.exists(legacy_file)
+
+    assert HealingLog.compact(log_file=log_file, legacy_file=legacy_file, fold_legacy=True) == (3, 2)
+    assert not os.path.exists(legacy_file)
+    assert HealingLog.read_events(log_file, legacy_file) == [_event('Home', 'menu', 'm1'), _event('Login', 'user', 'u2')]
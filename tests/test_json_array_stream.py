@@ -0,0 +1,50 @@
+import os
+import sys
+
+# Ensure libraries path is in sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'libraries'))
+
+from JsonArrayStream import JsonArrayStream
+
+
+def test_items_are_returned_as_soon_as_they_are_complete():
+    parser = JsonArrayStream()
+    chunks = ['Here you go:\n```json\n[{"type": "id", ', '"value": "a"}, {"type": "css",', ' "value": "b"}]\n```']
+    per_chunk = [parser.feed(chunk) for chunk in chunks]
+
+    assert per_chunk == [[], [{'type': 'id', 'value': 'a'}], [{'type': 'css', 'value': 'b'}]]
+    assert parser.done
+
+
+def test_brackets_and_escapes_inside_strings_do_not_end_items():
+    parser = JsonArrayStream()
+    answer = '[{"type": "xpath", "value": "//a[text()=\\"Next ]\\"]"}, {"type": "css", "value": "a[href$=\'}\']"}]'
+    items = [item for char in answer for item in parser.feed(char)]
+
+    assert items == [{'type': 'xpath', 'value': '//a[text()="Next ]"]'}, {'type': 'css', 'value': "a[href$='}']"}]
+    assert parser.errors == 0
+
+
+def test_malformed_item_is_skipped_and_counted():
+    parser = JsonArrayStream()
+    items = parser.feed("[{'type': 'id'}, {\"type\": \"id\", \"value\": \"ok\"}]")
+
+    assert items == [{'type': 'id', 'value': 'ok'}]
+    assert parser.errors == 1
+
+
+def test_object_answer_is_left_to_a_regular_parse():
+    parser = JsonArrayStream()
+    answer = '{"candidates": [{"type": "id", "value": "a"}]}'
+
+    assert parser.feed(answer) == []
+    assert parser.done
+    assert parser.text == answer
+
+
+def test_scalar_items_and_text_after_the_array():
+    parser = JsonArrayStream()
+
+    assert parser.feed('[1, "two", null]') == [1, 'two', None]
+    assert parser.feed(' trailing [3]') == []
+    assert parser.items == [1, 'two', None]
@@ -0,0 +1,111 @@
+import os
+import sys
+
+import pytest
+
+# Ensure libraries path is in sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'libraries'))
+
+from LLMBackend import CircuitBreaker, CircuitOpenError, LLMError, ResilientBackend, StubBackend, TokenBucket
+
+
+class _DenyOnce:
+    """Rate limiter that has no free slot for the first call only."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def acquire(self, timeout=None):
+        self.calls += 1
+        return self.calls > 1
+
+
+def _failing(inputs):
+    raise LLMError("backend down")
+
+
+def _open_breaker(backend, breaker):
+    for _ in range(breaker.min_calls):
+        with pytest.raises(LLMError):
+            ResilientBackend(backend, max_retries=0, breaker=breaker).generate(["prompt"])
+    assert breaker.state != 'closed'
+
+
+@pytest.mark.parametrize('call', ['generate', 'stream'])
+def test_rate_limited_trial_does_not_leave_breaker_half_open(call):
+    breaker = CircuitBreaker(min_calls=2, cooldown=0)
+    _open_breaker(StubBackend(responder=_failing), breaker)
+
+    llm = ResilientBackend(StubBackend(responder='[]'), max_retries=0, rate_limiter=_DenyOnce(), breaker=breaker)
+    run = (lambda: llm.generate(["prompt"])) if call == 'generate' else (lambda: list(llm.stream(["prompt"])))
+
+    with pytest.raises(LLMError) as rejected:
+        run()
+    assert not isinstance(rejected.value, CircuitOpenError)
+
+    # The next call gets the trial slot, succeeds and closes the circuit
+    run()
+    assert breaker.state == 'closed'
+    for _ in range(3):
+        run()
+    assert llm.stats['rejected'] == 0
+
+
+def test_open_circuit_fails_fast_without_waiting_for_rate_limit():
+    breaker = CircuitBreaker(min_calls=2, cooldown=60)
+    _open_breaker(StubBackend(responder=_failing), breaker)
+    limiter = _DenyOnce()
+
+    with pytest.raises(CircuitOpenError):
+        ResilientBackend(StubBackend(), max_retries=0, rate_limiter=limiter, breaker=breaker).generate(["prompt"])
+    assert limiter.calls == 0
+
+
+def test_token_bucket_allows_a_burst_then_waits_for_refill():
+    bucket = TokenBucket(rate_per_minute=600, burst=2)
+
+    assert bucket.acquire(timeout=0) and bucket.acquire(timeout=0)
+    # One token takes 0.1s to refill
+    assert not bucket.acquire(timeout=0.01)
+    assert bucket.acquire(timeout=0.5)
+
+
+def test_token_bucket_burst_defaults_to_rate_capped_at_five():
+    assert TokenBucket(rate_per_minute=2).capacity == 2
+    assert TokenBucket(rate_per_minute=60).capacity == 5
+    assert TokenBucket(rate_per_minute=0.5).capacity == 1
+
+
+def test_breaker_needs_min_calls_before_opening():
+    breaker = CircuitBreaker(threshold=0.5, min_calls=4, cooldown=60)
+    for _ in range(3):
+        breaker.record(False)
+    assert breaker.state == 'closed'
+
+    breaker.record(False)
+    assert breaker.state == 'open'
+    assert breaker.allow() is False
+
+
+def test_breaker_error_rate_is_measured_over_the_window():
+    breaker = CircuitBreaker(threshold=0.5, window=4, min_calls=4, cooldown=60)
+    for success in (False, True, True, True, False, True):
+        breaker.record(success)
+    assert breaker.state == 'closed'
+
+    breaker.record(False)
+    assert breaker.state == 'open'
+
+
+def test_half_open_breaker_grants_a_single_trial():
+    breaker = CircuitBreaker(min_calls=1, cooldown=0)
+    breaker.record(False)
+
+    assert breaker.allow() == 'trial'
+    assert breaker.allow() is False
+    breaker.record(False)
+    # The failed trial re-opens the circuit; after the cooldown the next call is the trial again
+    assert breaker.allow() == 'trial'
+    breaker.record(True)
+    assert breaker.state == 'closed'
+    assert breaker.allow() is True
@@ -0,0 +1,67 @@
+import json
+import multiprocessing
+import os
+import sys
+
+# Ensure libraries path is in sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'libraries'))
+
+import LocatorUpdater
+
+
+def _write_page(locators_dir, page_name, data):
+    os.makedirs(locators_dir, exist_ok=True)
+    with open(os.path.join(locators_dir, f"{page_name}.json"), 'w') as f:
+        json.dump(data, f)
+
+
+def _read_page(locators_dir, page_name):
+    with open(os.path.join(locators_dir, f"{page_name}.json")) as f:
+        return json.load(f)
+
+
+def _update_in_worker(locators_dir, element_name):
+    LocatorUpdater.LOCATORS_DIR = locators_dir
+    LocatorUpdater.update_json_locator('Form', element_name, 'css', f"#{element_name}-v2")
+
+
+def test_update_changes_only_the_given_elements(tmp_path, monkeypatch):
+    locators_dir = str(tmp_path / "locators")
+    monkeypatch.setattr(LocatorUpdater, 'LOCATORS_DIR', locators_dir)
+    _write_page(locators_dir, 'Form', {'save': {'type': 'id', 'value': 'save', 'description': 'Save'},
+                                       'cancel': {'type': 'id', 'value': 'cancel'}})
+
+    updated = LocatorUpdater.update_json_locators('Form', {'save': ('css', '#save-v2'), 'missing': ('id', 'x')})
+
+    assert updated == ['save']
+    assert _read_page(locators_dir, 'Form') == {'save': {'type': 'css', 'value': '#save-v2', 'description': 'Save'},
+                                                'cancel': {'type': 'id', 'value': 'cancel'}}
+
+
+def test_update_merges_with_changes_written_since_the_caller_loaded_the_page(tmp_path, monkeypatch):
+    locators_dir = str(tmp_path / "locators")
+    monkeypatch.setattr(LocatorUpdater, 'LOCATORS_DIR', locators_dir)
+    _write_page(locators_dir, 'Form', {'save': {'type': 'id', 'value': 'save'}, 'cancel': {'type': 'id', 'value': 'cancel'}})
+    # Another worker heals 'cancel' after this one read the page
+    _write_page(locators_dir, 'Form', {'save': {'type': 'id', 'value': 'save'}, 'cancel': {'type': 'css', 'value': '#cancel-v2'},
+                                       'help': {'type': 'id', 'value': 'help'}})
+
+    LocatorUpdater.update_json_locator('Form', 'save', 'css', '#save-v2')
+
+    assert _read_page(locators_dir, 'Form') == {'save': {'type': 'css', 'value': '#save-v2'},
+                                                'cancel': {'type': 'css', 'value': '#cancel-v2'},
+                                                'help': {'type': 'id', 'value': 'help'}}
+
+
+def test_concurrent_workers_updating_one_page_lose_no_update(tmp_path):
+    locators_dir = str(tmp_path / "locators")
+    names = [f"field{i}" for i in range(8)]
+    _write_page(locators_dir, 'Form', {name: {'type': 'id', 'value': name} for name in names})
+
+    workers = [multiprocessing.Process(target=_update_in_worker, args=(locators_dir, name)) for name in names]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert _read_page(locators_dir, 'Form') == {name: {'type': 'css', 'value': f"#{name}-v2"} for name in names}
@@ -0,0 +1,75 @@
+import os
+import sys
+
+import pytest
+
+# Ensure libraries path is in sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'libraries'))
+
+from SnapshotStore import DirectorySnapshotStore, PackedSnapshotStore, convert
+
+
+@pytest.fixture(params=['files', 'packed'])
+def store(request, tmp_path):
+    return (DirectorySnapshotStore if request.param == 'files' else PackedSnapshotStore)(str(tmp_path))
+
+
+def test_legacy_snapshot_adopts_fingerprint_without_new_metadata(store, tmp_path):
+    store.save('Login', 'submit', '<button id="submit"></button>', None)
+
+    store.record_fingerprint('Login', 'submit', 'abcd1234')
+
+    assert store.fingerprint('Login', 'submit') == 'abcd1234'
+    assert store.load_meta('Login', 'submit') is None
+    assert not (tmp_path / 'Login' / 'submit_meta.json').exists()
+
+
+def test_fingerprint_is_added_to_existing_metadata(store):
+    store.save('Login', 'submit', '<button id="submit"></button>', {'x': 1, 'y': 2, 'width': 3, 'height': 4})
+
+    store.record_fingerprint('Login', 'submit', 'abcd1234')
+
+    assert store.load_meta('Login', 'submit') == {'x': 1, 'y': 2, 'width': 3, 'height': 4, 'fingerprint': 'abcd1234'}
+    reopened = type(store)(store.root)
+    assert reopened.fingerprint('Login', 'submit') == 'abcd1234'
+
+
+def test_snapshot_round_trip_and_overwrite_without_image_keeps_the_screenshot(store):
+    store.save('Login', 'submit', '<button id="submit">Go</button>', {'x': 1, 'matches': 1}, b'image', b'thumb', 'webp')
+
+    assert store.exists('Login', 'submit')
+    assert store.read('Login', 'submit') == {'html': '<button id="submit">Go</button>', 'meta': {'x': 1, 'matches': 1},
+                                             'image': b'image', 'thumbnail': b'thumb', 'image_ext': 'webp'}
+
+    store.save('Login', 'submit', '<button id="submit">Send</button>', {'x': 2, 'matches': 1})
+    reopened = type(store)(store.root)
+    assert reopened.elements('Login') == ['submit']
+    assert reopened.load_html('Login', 'submit') == '<button id="submit">Send</button>'
+    assert reopened.load_meta('Login', 'submit') == {'x': 2, 'matches': 1}
+    assert reopened.load_image('Login', 'submit') == b'image'
+
+
+def test_delete_removes_the_snapshot_and_the_empty_page(store):
+    store.save('Login', 'submit', '<button id="submit"></button>', {'x': 1}, b'image', b'thumb', 'png')
+
+    store.delete('Login', 'submit')
+
+    assert not store.exists('Login', 'submit')
+    assert store.read('Login', 'submit') is None
+    assert type(store)(store.root).pages() == []
+
+
+def test_convert_loose_files_into_page_packs(tmp_path):
+    source = DirectorySnapshotStore(str(tmp_path / "files"))
+    source.save('Login', 'user', '<input id="user">', {'fingerprint': 'aaaa0000'}, b'same', b'thumb', 'webp')
+    source.save('Login', 'pass', '<input id="pass">', None, b'same', b'thumb', 'webp')
+    target = PackedSnapshotStore(str(tmp_path / "packed"))
+
+    assert convert(source, target, delete_source=True) == {'pages': 1, 'snapshots': 2}
+
+    assert source.pages() == []
+    assert target.elements('Login') == ['pass', 'user']
+    assert target.fingerprint('Login', 'user') == 'aaaa0000'
+    assert target.read('Login', 'pass')['meta'] is None
+    # Two HTML blobs; the identical image and thumbnail are stored once
+    assert target.stats('Login')['blobs'] == 4